@@ -0,0 +1,103 @@
+"""
+Compara cómo leen `full_dataset` las tareas de entrenamiento:
+- parquet: `read_parquet` completo + dropna + `astype(str)` (implementación
+  original)
+- arrow: `read_dataset` sobre la copia Arrow mapeada en memoria, solo con
+  las columnas del modelo + dropna
+
+Mide el tiempo de lectura y la memoria anónima (privada) que retiene el
+DataFrame resultante, en un proceso nuevo por lectura (Linux,
+/proc/self/smaps_rollup). Las páginas del archivo mapeado no cuentan: son
+page cache compartida entre las tareas del worker.
+
+Uso:
+    python -m benchmarks.bench_dataset_store --scales 1 5 10
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import make_full_dataset
+from orchestration.tasks.dataset_store import feather_path, read_dataset, write_feather
+from orchestration.tasks.feature_encoder import CATEGORICAL, NUMERICAL
+from orchestration.tasks.prepare_full_dataset_s3 import (
+    GROUP_COLS,
+    _add_date_features,
+    _add_lag_features,
+)
+
+DROPNA = ["Precio", "Precio_lag1", "Precio_mean7"]
+
+
+def _read_parquet(path):
+    df = pd.read_parquet(path)
+    df = df.dropna(subset=DROPNA)
+    df[CATEGORICAL] = df[CATEGORICAL].astype(str)
+    return df
+
+
+def _read_arrow(path):
+    df = read_dataset(path, columns=CATEGORICAL + NUMERICAL + ["Precio"])
+    return df.dropna(subset=DROPNA)
+
+
+def _anonymous_mib() -> float:
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Anonymous:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _run(fn, path):
+    before = _anonymous_mib()
+    start = time.perf_counter()
+    df = fn(path)
+    elapsed = time.perf_counter() - start
+    retained = _anonymous_mib() - before
+    del df
+    return elapsed, retained
+
+
+def _measure(fn, path):
+    # Proceso nuevo (spawn): el allocator no reutiliza memoria ya liberada
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+        pool.submit(_run, fn, path).result()  # calienta el page cache
+    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+        return pool.submit(_run, fn, path).result()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 5, 10])
+    args = parser.parse_args()
+
+    print(
+        f"{'scale':>5} {'rows':>9} {'parquet (s)':>12} {'parquet MiB':>12} "
+        f"{'arrow (s)':>10} {'arrow MiB':>10} {'speedup':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "full_dataset.parquet"
+        for scale in args.scales:
+            df = make_full_dataset(scale=scale).dropna(subset=["Precio"])
+            df = _add_lag_features(_add_date_features(df.sort_values(GROUP_COLS)))
+            df.to_parquet(path, index=False)
+            write_feather(df, feather_path(path))
+
+            t_pq, m_pq = _measure(_read_parquet, path)
+            t_ar, m_ar = _measure(_read_arrow, path)
+            print(
+                f"{scale:>5} {len(df):>9} {t_pq:>12.3f} {m_pq:>12.1f} "
+                f"{t_ar:>10.3f} {m_ar:>10.1f} {t_pq / t_ar:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Compara el costo diario del monitoreo de drift sobre particiones diarias
+en disco local (`scale` multiplica el número de series):
+- full: leer las 211 particiones de las ventanas de referencia (180 días)
+  y actual (30 días + hoy), perfilarlas y compararlas, como hacía cada
+  corrida antes de llamar a Evidently (sin contar el HTML)
+- cached: leer sólo la partición de hoy, perfilarla, deslizar las dos
+  ventanas con los perfiles diarios guardados y compararlas
+
+Verifica que ambas rutas den el mismo resultado. Con `--evidently`, y si
+está instalado, también mide `Report(DataDriftPreset())` sobre las ventanas.
+
+Uso:
+    python -m benchmarks.bench_drift_profiles --scales 1 10 100
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import BASE_SERIES, make_full_dataset
+from orchestration.tasks.datalake_reader import read_partitions_df
+from orchestration.tasks.drift_profiles import ProfileCache, compare, day_profile
+
+
+def _days(start, end) -> list:
+    return [d.strftime("%Y-%m-%d") for d in pd.date_range(start, end)]
+
+
+def _evidently(df_ref, df_cur) -> float:
+    from evidently import Report
+    from evidently.presets import DataDriftPreset
+
+    start = time.perf_counter()
+    Report(metrics=[DataDriftPreset()]).run(reference_data=df_ref, current_data=df_cur)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--evidently", action="store_true")
+    args = parser.parse_args()
+
+    print(
+        f"{'scale':>6} {'window rows':>12} {'full (s)':>9} {'cached (s)':>11} "
+        f"{'speedup':>8} {'cache (KiB)':>12} {'evidently (s)':>14}"
+    )
+    for scale in args.scales:
+        df = make_full_dataset(n_series=BASE_SERIES * scale)
+        base = df["Fecha"].max()
+        current_cutoff = base - pd.Timedelta(days=30)
+        reference_cutoff = current_cutoff - pd.Timedelta(days=180)
+        reference = _days(reference_cutoff, current_cutoff - pd.Timedelta(days=1))
+        current = _days(current_cutoff, base)
+        df_ref = df[(df["Fecha"] >= reference_cutoff) & (df["Fecha"] < current_cutoff)]
+        df_cur = df[df["Fecha"] >= current_cutoff]
+
+        # Estado de ayer: perfiles diarios y ventanas un día atrás
+        day = pd.Timedelta(days=1)
+        cache = ProfileCache()
+        cache.add_days(
+            df[df["Fecha"] < base], _days(reference_cutoff - day, base - day)
+        )
+        cache.slide(
+            "reference", _days(reference_cutoff - day, current_cutoff - 2 * day)
+        )
+        cache.slide("current", _days(current_cutoff - day, base - day))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            files = {}
+            for fecha, rows in df[df["Fecha"] >= reference_cutoff].groupby("Fecha"):
+                files[f"{fecha:%Y-%m-%d}"] = (
+                    Path(tmp) / f"{fecha:%Y-%m-%d}-data.parquet"
+                )
+                rows.to_parquet(files[f"{fecha:%Y-%m-%d}"], index=False)
+            path = cache.save(Path(tmp) / "profiles.json")
+            size = path.stat().st_size / 1024
+
+            start = time.perf_counter()
+            window = read_partitions_df([str(files[d]) for d in reference + current])
+            fecha = window["Fecha"].dt.strftime("%Y-%m-%d")
+            expected = compare(
+                day_profile(window[fecha < current[0]], cache.edges),
+                day_profile(window[fecha >= current[0]], cache.edges),
+                cache.edges,
+            )
+            t_full = time.perf_counter() - start
+
+            start = time.perf_counter()
+            cached = ProfileCache.load(path)
+            cached.add_days(read_partitions_df([str(files[current[-1]])]), current[-1:])
+            result = compare(
+                cached.slide("reference", reference),
+                cached.slide("current", current),
+                cached.edges,
+            )
+            cached.forget_before(reference[0])
+            cached.save(path)
+            t_cached = time.perf_counter() - start
+
+        assert result["drifted_columns"] == expected["drifted_columns"]
+        assert result["reference_rows"] == len(df_ref)
+        assert result["current_rows"] == len(df_cur)
+        for col, stats in expected["columns"].items():
+            for key in ("psi", "ks", "jensen_shannon"):
+                if key in stats:
+                    assert abs(result["columns"][col][key] - stats[key]) < 1e-9
+
+        t_evidently = "-"
+        if args.evidently:
+            try:
+                t_evidently = f"{_evidently(df_ref, df_cur):.3f}"
+            except ImportError:
+                t_evidently = "n/a"
+
+        print(
+            f"{scale:>6} {len(df_ref) + len(df_cur):>12,} {t_full:>9.3f} {t_cached:>11.4f} "
+            f"{t_full / t_cached:>7.0f}x {size:>12.0f} {t_evidently:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
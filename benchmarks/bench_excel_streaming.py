@@ -0,0 +1,63 @@
+"""
+Costo de ingerir el bloque del día según el tamaño del libro SNIIM:
+- full: pd.read_excel de toda la hoja + parseo + filtro por fecha
+- streaming: lectura fila por fila que se detiene al terminar el bloque del día
+
+Los libros sintéticos van del más reciente al más antiguo, como cuando el
+día a ingerir es el último publicado (2 de enero vs. mediados de diciembre).
+
+Uso:
+    python -m benchmarks.bench_excel_streaming --days 2 180 350
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import make_sniim_sheet
+from orchestration.tasks.sniim_parser import parse_excel_for_date, parse_excel_to_df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, nargs="+", default=[2, 180, 350])
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=["openpyxl", "calamine"],
+        help="Streaming engines",
+    )
+    args = parser.parse_args()
+
+    header = f"{'days':>5} {'full (s)':>9}" + "".join(
+        f" {e + ' (s)':>15}" for e in args.engines
+    )
+    print(header)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_days in args.days:
+            end_date = pd.Timestamp("2025-01-01") + pd.Timedelta(days=n_days - 1)
+            path = Path(tmp) / f"Leche{end_date:%d%m%Y}.xlsx"
+            make_sniim_sheet(n_days=n_days, end_date=str(end_date.date())).to_excel(
+                path, header=False, index=False
+            )
+            target = end_date.date()
+
+            start = time.perf_counter()
+            df_all = parse_excel_to_df(path)
+            expected = df_all[df_all["Fecha"] == target]
+            t_full = time.perf_counter() - start
+
+            line = f"{n_days:>5} {t_full:>9.3f}"
+            for engine in args.engines:
+                start = time.perf_counter()
+                streamed = parse_excel_for_date(path, target, engine=engine)
+                line += f" {time.perf_counter() - start:>15.4f}"
+                assert len(streamed) == len(expected)
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
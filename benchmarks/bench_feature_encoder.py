@@ -0,0 +1,95 @@
+"""
+Compara la vectorización de features para entrenamiento:
+- dict: `to_dict(orient="records")` + DictVectorizer (implementación original)
+- columnar: CategoricalEncoder sobre el DataFrame
+
+Mide tiempo y pico de memoria asignada (tracemalloc, en una corrida
+aparte) de fit_transform, y
+verifica que ambas matrices tengan el mismo contenido.
+
+Uso:
+    python -m benchmarks.bench_feature_encoder --scales 1 5 10
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction import DictVectorizer
+
+from benchmarks.synthetic import make_full_dataset
+from orchestration.tasks.feature_encoder import (
+    CATEGORICAL,
+    NUMERICAL,
+    CategoricalEncoder,
+)
+from orchestration.tasks.prepare_full_dataset_s3 import (
+    GROUP_COLS,
+    _add_date_features,
+    _add_lag_features,
+)
+
+
+def _make_features(scale: int) -> pd.DataFrame:
+    df = make_full_dataset(scale=scale).dropna(subset=["Precio"])
+    df = df.sort_values(GROUP_COLS + ["Fecha"])
+    df = _add_lag_features(_add_date_features(df))
+    df = df.dropna(subset=["Precio_lag1", "Precio_mean7"])
+    df[CATEGORICAL] = df[CATEGORICAL].astype(str)
+    return df[CATEGORICAL + NUMERICAL].reset_index(drop=True)
+
+
+def _vectorize_dicts(X: pd.DataFrame):
+    vectorizer = DictVectorizer()
+    return vectorizer, vectorizer.fit_transform(X.to_dict(orient="records"))
+
+
+def _vectorize_columnar(X: pd.DataFrame):
+    encoder = CategoricalEncoder(CATEGORICAL, NUMERICAL)
+    return encoder, encoder.fit_transform(X)
+
+
+def _measure(fn, X):
+    start = time.perf_counter()
+    vectorizer, M = fn(X)
+    elapsed = time.perf_counter() - start
+
+    # Segunda corrida para el pico de memoria: tracemalloc distorsiona el tiempo
+    tracemalloc.start()
+    fn(X)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, vectorizer, M
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 5, 10])
+    args = parser.parse_args()
+
+    print(
+        f"{'scale':>5} {'rows':>9} {'dict (s)':>9} {'dict MiB':>9} "
+        f"{'columnar (s)':>13} {'columnar MiB':>13} {'speedup':>8}"
+    )
+    for scale in args.scales:
+        X = _make_features(scale)
+        t_dict, m_dict, dv, M_dict = _measure(_vectorize_dicts, X)
+        t_col, m_col, enc, M_col = _measure(_vectorize_columnar, X)
+
+        # Mismo contenido, distinto orden de columnas
+        order = [
+            list(dv.get_feature_names_out()).index(name)
+            for name in enc.get_feature_names_out()
+        ]
+        assert np.allclose(M_col.toarray(), M_dict[:, order].toarray(), equal_nan=True)
+
+        print(
+            f"{scale:>5} {len(X):>9} {t_dict:>9.3f} {m_dict:>9.1f} "
+            f"{t_col:>13.3f} {m_col:>13.1f} {t_dict / t_col:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Compara el arranque en frío del handler de Lambda con dos artefactos del
+mismo modelo:
+- pipeline: el pipeline cloudpickle que registra MLflow (encoder +
+  regresor), cargado con sus dependencias (sklearn, scipy, pandas,
+  xgboost). Es lo que hace `mlflow.pyfunc.load_model` sin contar el import
+  de MLflow ni la descarga de S3, así que subestima el handler original
+- slim: `manifest.json` + `trees.npz` de `write_slim_model`, cargado con
+  `slim_model.SlimModel` (solo numpy)
+
+Cada arranque corre en un intérprete nuevo y mide el tiempo de importar,
+cargar el modelo y la primera predicción de un dict, más el tiempo total
+del proceso (incluye levantar el intérprete). Si MLflow está instalado
+también reporta lo que tarda `import mlflow.pyfunc`.
+
+Uso:
+    python -m benchmarks.bench_lambda_cold_start --repeats 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cloudpickle
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from benchmarks.bench_feature_encoder import _make_features
+from benchmarks.bench_xgb_native import PARAMS as XGB_PARAMS
+from orchestration.tasks.export_slim_model import write_slim_model
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+from orchestration.tasks.model_specs import build_random_forest, build_xgboost
+
+SERVING_DIR = Path(__file__).resolve().parents[1] / "deployment" / "ondemand"
+RF_PARAMS = {
+    "n_estimators": 100,
+    "max_depth": 15,
+    "min_samples_split": 2,
+    "min_samples_leaf": 1,
+}
+
+PIPELINE_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import cloudpickle
+imported = time.perf_counter()
+with open(sys.argv[1], "rb") as f:
+    model = cloudpickle.load(f)
+loaded = time.perf_counter()
+model.predict([json.loads(sys.argv[2])])
+done = time.perf_counter()
+print(json.dumps([imported - start, loaded - imported, done - loaded]))
+"""
+
+SLIM_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[3])
+from slim_model import SlimModel
+imported = time.perf_counter()
+model = SlimModel(sys.argv[1])
+loaded = time.perf_counter()
+model.predict(json.loads(sys.argv[2]))
+done = time.perf_counter()
+print(json.dumps([imported - start, loaded - imported, done - loaded]))
+"""
+
+
+def _cold_start(code: str, *args) -> list:
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", code, *map(str, args)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out) + [time.perf_counter() - start]
+
+
+def _median(runs: list) -> list:
+    return [statistics.median(values) for values in zip(*runs)]
+
+
+def _mlflow_import_seconds():
+    code = "import time; t = time.perf_counter(); import mlflow.pyfunc; print(time.perf_counter() - t)"
+    try:
+        out = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        ).stdout
+    except subprocess.CalledProcessError:
+        return None
+    return float(out)
+
+
+def _fit(kind: str, X, y) -> Pipeline:
+    if kind == "rf":
+        encoder, model = CategoricalEncoder(), build_random_forest(RF_PARAMS)
+    else:
+        native = kind == "xgb-native"
+        encoder = CategoricalEncoder(encoding="category" if native else "onehot")
+        model = build_xgboost(XGB_PARAMS, native=native)
+    return Pipeline([("vectorizer", encoder), ("regressor", model)]).fit(X, y)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--models", nargs="+", default=["xgb", "xgb-native", "rf"])
+    args = parser.parse_args()
+
+    X = _make_features(args.scale)
+    y = X["Precio_lag1"].to_numpy() + np.random.default_rng(0).normal(0, 0.2, len(X))
+    row = json.dumps(X.iloc[0].to_dict())
+
+    mlflow_import = _mlflow_import_seconds()
+    if mlflow_import is None:
+        print("mlflow no está instalado: el handler original tarda además su import\n")
+    else:
+        print(f"import mlflow.pyfunc: {mlflow_import:.2f} s (no incluido abajo)\n")
+
+    print(
+        f"{'model':>10} {'artifact':>9} {'MiB':>7} {'import (s)':>11} "
+        f"{'load (s)':>9} {'1st pred (ms)':>14} {'process (s)':>12}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in args.models:
+            pipeline = _fit(kind, X, y)
+            pickle_path = Path(tmp) / f"{kind}.pkl"
+            pickle_path.write_bytes(cloudpickle.dumps(pipeline))
+            slim_dir = write_slim_model(pipeline, Path(tmp) / kind)
+
+            results = {
+                "pipeline": (
+                    pickle_path.stat().st_size,
+                    _median(
+                        [
+                            _cold_start(PIPELINE_CHILD, pickle_path, row)
+                            for _ in range(args.repeats)
+                        ]
+                    ),
+                ),
+                "slim": (
+                    sum(p.stat().st_size for p in slim_dir.iterdir()),
+                    _median(
+                        [
+                            _cold_start(SLIM_CHILD, slim_dir, row, SERVING_DIR)
+                            for _ in range(args.repeats)
+                        ]
+                    ),
+                ),
+            }
+            for name, (size, (imp, load, pred, total)) in results.items():
+                print(
+                    f"{kind:>10} {name:>9} {size / 2**20:>7.2f} {imp:>11.3f} "
+                    f"{load:>9.3f} {pred * 1e3:>14.2f} {total:>12.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Prueba de carga del modo asíncrono (`deployment/local/asgi.py`, uvicorn):
+- sin batching: `MICROBATCH_MAX_SIZE=1`, un `predict` por request
+- con batching: los requests concurrentes se agrupan en micro-lotes
+  (`MICROBATCH_MAX_SIZE`, `MICROBATCH_MAX_WAIT_MS`)
+
+Levanta el servidor en un proceso aparte con un XGBoost entrenado sobre el
+dataset sintético, manda `--requests` requests de un registro con
+`--concurrency` clientes simultáneos y reporta throughput, latencia p50/p99
+y el tamaño medio de los lotes.
+
+Uso:
+    python -m benchmarks.bench_microbatching --concurrency 1 16 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from benchmarks.bench_feature_encoder import _make_features
+from benchmarks.bench_xgb_native import PARAMS
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+from orchestration.tasks.model_specs import build_xgboost
+
+ROOT = Path(__file__).resolve().parents[1]
+APP_DIR = ROOT / "deployment" / "local"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(workdir: Path, port: int, max_size: int, max_wait_ms: float):
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "MICROBATCH_MAX_SIZE": str(max_size),
+        "MICROBATCH_MAX_WAIT_MS": str(max_wait_ms),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "asgi:app", "--app-dir", str(APP_DIR)]
+        + ["--port", str(port), "--log-level", "warning"],
+        cwd=workdir,
+        env=env,
+    )
+    for _ in range(300):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("uvicorn didn't start")
+
+
+async def _post(reader, writer, body: bytes) -> bytes:
+    # HTTP/1.1 keep-alive mínimo: httpx gasta más CPU por request que el
+    # propio servidor y, con pocos núcleos, el cliente sería el cuello
+    writer.write(
+        b"POST /predict HTTP/1.1\r\nHost: bench\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    if not head.startswith(b"HTTP/1.1 200"):
+        raise RuntimeError(head.decode())
+    length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+    return await reader.readexactly(length)
+
+
+async def _load(port: int, bodies: list, concurrency: int) -> tuple:
+    latencies = []
+    queue = iter(bodies)
+
+    async def client():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for body in queue:
+            start = time.perf_counter()
+            await _post(reader, writer, body)
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return np.array(latencies), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    X = _make_features(1)
+    y = X["Precio_lag1"].to_numpy()
+    pipeline = Pipeline(
+        [("vectorizer", CategoricalEncoder()), ("regressor", build_xgboost(PARAMS))]
+    ).fit(X, y)
+    records = X.sample(args.requests, random_state=0).to_dict(orient="records")
+    bodies = [json.dumps(record).encode() for record in records]
+
+    print(
+        f"{'mode':>8} {'clients':>8} {'req/s':>8} {'p50 (ms)':>9} "
+        f"{'p99 (ms)':>9} {'batch size':>11}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "model").mkdir()
+        with open(Path(tmp) / "model" / "model.pkl", "wb") as f:
+            pickle.dump(pipeline, f)
+
+        for mode, max_size in [("single", 1), ("batched", args.max_size)]:
+            port = _free_port()
+            server = _start_server(Path(tmp), port, max_size, args.max_wait_ms)
+            try:
+                asyncio.run(_load(port, bodies[:50], 4))  # calentamiento
+                for concurrency in args.concurrency:
+                    before = httpx.get(f"http://127.0.0.1:{port}/predict/stats").json()
+                    latencies, elapsed = asyncio.run(_load(port, bodies, concurrency))
+                    after = httpx.get(f"http://127.0.0.1:{port}/predict/stats").json()
+                    b0, b1 = before["microbatching"], after["microbatching"]
+                    batch_size = (b1["records"] - b0["records"]) / max(
+                        b1["batches"] - b0["batches"], 1
+                    )
+                    p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+                    print(
+                        f"{mode:>8} {concurrency:>8} {len(latencies) / elapsed:>8.0f} "
+                        f"{p50:>9.2f} {p99:>9.2f} {batch_size:>11.1f}"
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
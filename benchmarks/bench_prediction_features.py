@@ -0,0 +1,68 @@
+"""
+Compara el armado de features para la predicción diaria:
+- loop: una máscara booleana por serie sobre todo el dataset (implementación original)
+- vectorized: un solo pase con NumPy
+
+Uso:
+    python -m benchmarks.bench_prediction_features --scales 1 10 100
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from benchmarks.synthetic import make_full_dataset
+from orchestration.tasks.prediction_features import (
+    build_prediction_features,
+    build_prediction_features_loop,
+)
+
+
+def _timeit(fn, *args, repeat: int = 1) -> tuple:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--skip-loop", action="store_true", help="Only time the vectorized path"
+    )
+    args = parser.parse_args()
+
+    target = datetime(2025, 8, 1) + timedelta(days=1)
+
+    print(
+        f"{'scale':>6} {'rows':>11} {'loop (s)':>10} {'vector (s)':>11} {'speedup':>8}"
+    )
+    for scale in args.scales:
+        df = make_full_dataset(scale=scale)
+
+        t_vec, out_vec = _timeit(
+            build_prediction_features, df, target, repeat=args.repeat
+        )
+
+        if args.skip_loop:
+            print(f"{scale:>6} {len(df):>11,} {'-':>10} {t_vec:>11.4f} {'-':>8}")
+            continue
+
+        t_loop, out_loop = _timeit(build_prediction_features_loop, df, target)
+        pd.testing.assert_frame_equal(out_vec, out_loop)
+
+        print(
+            f"{scale:>6} {len(df):>11,} {t_loop:>10.3f} {t_vec:>11.4f} "
+            f"{t_loop / t_vec:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
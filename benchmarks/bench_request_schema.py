@@ -0,0 +1,132 @@
+"""
+Costo por request de `/predict` (un registro, XGBoost one-hot):
+- pandas: `json.loads` + `pipeline.predict(record)`, que arma un DataFrame
+  por request dentro del encoder (implementación original)
+- schema: `parse_records` (orjson + esquema compilado) + `FastPredictor`,
+  que arma la matriz CSR directo desde los registros
+
+Reporta el tiempo medio por request del parseo/validación, de la
+construcción de la matriz y del total con la predicción, además de la
+ronda completa por el `test_client` de la app Flask (en la columna
+pandas solo se cambia el modelo por el pipeline crudo). Verifica que ambas
+rutas den la misma predicción.
+
+Uso:
+    python -m benchmarks.bench_request_schema --requests 2000
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from benchmarks.bench_feature_encoder import _make_features
+from benchmarks.bench_xgb_native import PARAMS
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+from orchestration.tasks.model_specs import build_xgboost
+
+ROOT = Path(__file__).resolve().parents[1]
+APP_DIR = ROOT / "deployment" / "local"
+
+
+def _load_schema():
+    spec = importlib.util.spec_from_file_location(
+        "request_schema", APP_DIR / "request_schema.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _per_request(fn, bodies) -> float:
+    start = time.perf_counter()
+    for body in bodies:
+        fn(body)
+    return (time.perf_counter() - start) / len(bodies) * 1e6
+
+
+def _flask_round_trip(pipeline, bodies, fast: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "model").mkdir()
+        with open(Path(tmp) / "model" / "model.pkl", "wb") as f:
+            pickle.dump(pipeline, f)
+        cwd = Path.cwd()
+        sys.path.insert(0, str(APP_DIR))
+        try:
+            os.chdir(tmp)
+            for name in ("app", "request_schema", "batch", "prediction_index"):
+                sys.modules.pop(name, None)
+            import app
+
+            if not fast:
+                # Ruta original: el pipeline recibe el dict y arma el DataFrame
+                app.model = app.model.model
+            client = app.app.test_client()
+            post = lambda body: client.post(  # noqa: E731
+                "/predict", data=body, content_type="application/json"
+            )
+            for body in bodies[:50]:
+                post(body)
+            return _per_request(post, bodies)
+        finally:
+            os.chdir(cwd)
+            sys.path.remove(str(APP_DIR))
+            sys.modules.pop("app", None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    schema = _load_schema()
+    X = _make_features(1)
+    pipeline = Pipeline(
+        [("vectorizer", CategoricalEncoder()), ("regressor", build_xgboost(PARAMS))]
+    ).fit(X, X["Precio_lag1"].to_numpy())
+    fast = schema.FastPredictor(pipeline)
+    encoder = pipeline.named_steps["vectorizer"]
+
+    records = X.sample(args.requests, random_state=0).to_dict(orient="records")
+    bodies = [json.dumps(record).encode() for record in records]
+
+    expected = [pipeline.predict(json.loads(body))[0] for body in bodies[:200]]
+    got = [fast.predict(schema.parse_records(body))[0] for body in bodies[:200]]
+    np.testing.assert_allclose(got, expected, rtol=1e-6)
+
+    rows = {
+        "pandas": {
+            "parse": lambda body: json.loads(body),
+            "matrix": lambda body: encoder.transform(json.loads(body)),
+            "predict": lambda body: pipeline.predict(json.loads(body)),
+        },
+        "schema": {
+            "parse": lambda body: schema.parse_records(body),
+            "matrix": lambda body: fast.matrix(schema.parse_records(body)),
+            "predict": lambda body: fast.predict(schema.parse_records(body)),
+        },
+    }
+
+    print(
+        f"{'path':>8} {'parse (us)':>11} {'+matrix (us)':>13} "
+        f"{'+predict (us)':>14} {'flask (us)':>11}"
+    )
+    for name, steps in rows.items():
+        times = [_per_request(fn, bodies) for fn in steps.values()]
+        flask = _flask_round_trip(pipeline, bodies, fast=name == "schema")
+        print(
+            f"{name:>8} {times[0]:>11.1f} {times[1]:>13.1f} "
+            f"{times[2]:>14.1f} {flask:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compara el costo diario de las features por serie:
+- rescan: `_add_lag_features` sobre todo el histórico para actualizar un
+  día y `build_prediction_features` sobre todo el dataset para el día
+  siguiente (implementación original)
+- state: `SeriesState.append` con la partición del día y
+  `prediction_features` desde los buffers (O(series))
+
+Verifica que las features de las filas nuevas y de la predicción
+coincidan con las del rescan.
+
+Uso:
+    python -m benchmarks.bench_series_state --scales 1 10 100
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import make_full_dataset
+from orchestration.tasks.prediction_features import build_prediction_features
+from orchestration.tasks.prepare_full_dataset_s3 import (
+    FEATURE_COLS,
+    GROUP_COLS,
+    _add_lag_features,
+)
+from orchestration.tasks.series_state import SeriesState
+
+
+def _timeit(fn, *args) -> tuple:
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    print(
+        f"{'scale':>6} {'rows':>11} {'update rescan (s)':>18} {'update state (s)':>17} "
+        f"{'next-day rescan (s)':>20} {'next-day state (s)':>19} {'state (KiB)':>12}"
+    )
+    for scale in args.scales:
+        df = make_full_dataset(scale=scale).dropna(subset=["Precio"])
+        df = df.sort_values(GROUP_COLS + ["Fecha"]).reset_index(drop=True)
+        last = df["Fecha"].max()
+        history, today = df[df["Fecha"] < last], df[df["Fecha"] == last]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = SeriesState.from_frame(history).save(Path(tmp) / "s.series.npz")
+            size = path.stat().st_size / 1024
+
+            t_rescan, full = _timeit(_add_lag_features, df.copy())
+            start = time.perf_counter()
+            series = SeriesState.load(path)
+            new = series.append(today)
+            t_state = time.perf_counter() - start
+
+        target = datetime.combine(last.date(), datetime.min.time()) + timedelta(days=1)
+        t_pred_rescan, expected = _timeit(build_prediction_features, df, target)
+        t_pred_state, result = _timeit(series.prediction_features, target)
+
+        np.testing.assert_allclose(
+            new[FEATURE_COLS].to_numpy(), full.loc[today.index, FEATURE_COLS].to_numpy()
+        )
+        merged = expected.merge(result, on=GROUP_COLS, suffixes=("", "_state"))
+        assert len(merged) == len(expected)
+        np.testing.assert_allclose(merged["Precio_mean7"], merged["Precio_mean7_state"])
+
+        print(
+            f"{scale:>6} {len(df):>11,} {t_rescan:>18.4f} {t_state:>17.4f} "
+            f"{t_pred_rescan:>20.4f} {t_pred_state:>19.4f} {size:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Compara el parser del libro SNIIM:
+- legacy: doble `iterrows()` (implementación original de parse_excel_to_df)
+- vectorized: máscaras sobre el arreglo de celdas (orchestration.tasks.sniim_parser)
+
+Se mide sólo el parseo sobre la hoja ya cargada, que es lo que cambió.
+
+Uso:
+    python -m benchmarks.bench_sniim_parser --years 1 3
+"""
+
+import argparse
+import re
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_sniim_sheet
+from orchestration.tasks.sniim_parser import meses_es_a_en, parse_sniim_sheet
+
+
+def parse_sheet_legacy(df):
+    data_final = []
+
+    for i, row in df.iterrows():
+        if (
+            row.astype(str)
+            .str.contains(
+                "Precio promedio al consumidor por litro", case=False, na=False
+            )
+            .any()
+        ):
+            row_fecha = df.iloc[i + 1]
+            fecha_raw = next(
+                (
+                    str(cell)
+                    for cell in row_fecha
+                    if isinstance(cell, str) and "de" in cell
+                ),
+                None,
+            )
+            if not fecha_raw:
+                continue
+
+            match = re.search(
+                r"(\d{1,2}) de (\w+) de (\d{4})", fecha_raw, re.IGNORECASE
+            )
+            if not match:
+                continue
+            dia, mes, año = match.groups()
+            mes_en = meses_es_a_en.get(mes.lower())
+            if not mes_en:
+                continue
+            fecha = pd.to_datetime(f"{dia} {mes_en} {año}", dayfirst=True).date()
+
+            enc2 = df.iloc[i + 3, 2:6].values
+            columnas = ["Estado", "Ciudad"]
+            for j in range(4):
+                tipo = "Pasteurizada" if j < 2 else "Ultrapasteurizada"
+                canal = enc2[j]
+                columnas.append(f"{tipo}_{canal}")
+
+            df_bloque = df.iloc[i + 4 :, 0:6].copy()
+            df_bloque.columns = columnas
+            df_bloque[["Estado", "Ciudad"]] = df_bloque[["Estado", "Ciudad"]].ffill()
+
+            stop_idx = None
+            for k, row_k in df_bloque.iterrows():
+                celda = str(row_k.iloc[0]).strip().lower()
+                if (
+                    "promedio" in celda
+                    or "fuente" in celda
+                    or "sniim" in celda
+                    or celda == "estado"
+                    or celda == "nan"
+                ):
+                    stop_idx = k
+                    break
+            if stop_idx:
+                df_bloque = df_bloque.loc[: stop_idx - 1]
+
+            df_bloque["Fecha"] = fecha
+            df_long = df_bloque.melt(
+                id_vars=["Fecha", "Estado", "Ciudad"],
+                var_name="Tipo_Canal",
+                value_name="Precio",
+            )
+
+            df_long["Tipo"] = df_long["Tipo_Canal"].str.split("_").str[0]
+            df_long["Canal"] = df_long["Tipo_Canal"].str.split("_").str[1]
+            df_long = df_long[["Fecha", "Estado", "Ciudad", "Tipo", "Canal", "Precio"]]
+            df_long["Precio"] = pd.to_numeric(df_long["Precio"], errors="coerce")
+
+            data_final.append(df_long)
+
+    df_final = pd.concat(data_final, ignore_index=True)
+    df_final = df_final[
+        ~df_final["Ciudad"].str.lower().str.contains("promedio", na=False)
+    ]
+    return df_final
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 3])
+    parser.add_argument(
+        "--skip-legacy", action="store_true", help="Only time the vectorized path"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'years':>6} {'rows':>9} {'legacy (s)':>11} {'vector (s)':>11} {'speedup':>8}"
+    )
+    for years in args.years:
+        raw = make_sniim_sheet(n_days=365 * years)
+
+        start = time.perf_counter()
+        out_vec = parse_sniim_sheet(raw)
+        t_vec = time.perf_counter() - start
+
+        if args.skip_legacy:
+            print(f"{years:>6} {len(raw):>9,} {'-':>11} {t_vec:>11.3f} {'-':>8}")
+            continue
+
+        start = time.perf_counter()
+        out_legacy = parse_sheet_legacy(raw)
+        t_legacy = time.perf_counter() - start
+
+        pd.testing.assert_frame_equal(out_vec, out_legacy, check_dtype=False)
+        print(
+            f"{years:>6} {len(raw):>9,} {t_legacy:>11.3f} {t_vec:>11.3f} "
+            f"{t_legacy / t_vec:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
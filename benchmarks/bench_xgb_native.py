@@ -0,0 +1,111 @@
+"""
+Compara dos formas de entrenar y servir el mismo XGBoost:
+- onehot: CategoricalEncoder one-hot (CSR) + XGBRegressor (pipeline actual)
+- native: CategoricalEncoder "category" + xgb.train sobre un
+  QuantileDMatrix con `enable_categorical` y `tree_method="hist"`
+
+Con los mismos hiperparámetros reporta el tiempo de codificar y entrenar,
+el de una búsqueda con parada temprana (`early_stopping_rmse`, folds
+cacheados), el tamaño del pipeline serializado, la latencia de predecir
+un dict y un lote de dicts, y el RMSE en un holdout.
+
+Uso:
+    python -m benchmarks.bench_xgb_native --scales 1 5
+"""
+
+import argparse
+import time
+
+import cloudpickle
+import numpy as np
+from sklearn.metrics import root_mean_squared_error
+from sklearn.pipeline import Pipeline
+
+from benchmarks.bench_feature_encoder import _make_features
+from benchmarks.bench_xgb_tuning import HOLDOUT_RATIO
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+from orchestration.tasks.model_specs import (
+    MAX_ROUNDS,
+    build_xgboost,
+    early_stopping_rmse,
+)
+from orchestration.tasks.tuning import make_folds
+
+PARAMS = {
+    "max_depth": 6,
+    "learning_rate": 0.1,
+    "n_estimators": 200,
+    "min_child_weight": 1,
+    "gamma": 0.0,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+}
+BATCH_SIZE = 1000
+REPEATS = 50
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _run(X_train, y_train, X_test, y_test, native: bool) -> dict:
+    encoding = "category" if native else "onehot"
+
+    def fit():
+        encoder = CategoricalEncoder(encoding=encoding).fit(X_train)
+        model = build_xgboost(PARAMS, native=native)
+        model.fit(encoder.transform(X_train), y_train)
+        return Pipeline([("vectorizer", encoder), ("regressor", model)])
+
+    pipeline, fit_seconds = _timed(fit)
+
+    encoder = pipeline.named_steps["vectorizer"]
+    folds = make_folds(encoder.transform(X_train), y_train)
+    _, search_seconds = _timed(lambda: early_stopping_rmse(PARAMS, MAX_ROUNDS, folds))
+
+    one = X_test.head(1).to_dict(orient="records")
+    batch = X_test.head(BATCH_SIZE).to_dict(orient="records")
+    _, one_seconds = _timed(lambda: [pipeline.predict(one) for _ in range(REPEATS)])
+    _, batch_seconds = _timed(lambda: pipeline.predict(batch))
+
+    return {
+        "fit": fit_seconds,
+        "search": search_seconds,
+        "size": len(cloudpickle.dumps(pipeline)) / 2**20,
+        "one_ms": one_seconds / REPEATS * 1e3,
+        "batch_ms": batch_seconds * 1e3,
+        "rmse": root_mean_squared_error(y_test, pipeline.predict(X_test)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 5])
+    args = parser.parse_args()
+
+    print(
+        f"{'scale':>5} {'path':>7} {'fit (s)':>8} {'search (s)':>11} "
+        f"{'MiB':>6} {'1 dict (ms)':>12} {f'{BATCH_SIZE} dicts (ms)':>16} "
+        f"{'holdout RMSE':>13}"
+    )
+    for scale in args.scales:
+        X = _make_features(scale)
+        y = X["Precio_lag1"].to_numpy() + np.random.default_rng(0).normal(
+            0, 0.2, len(X)
+        )
+        holdout = np.random.default_rng(1).random(len(X)) < HOLDOUT_RATIO
+        split = (X[~holdout], y[~holdout], X[holdout], y[holdout])
+
+        for name, native in [("onehot", False), ("native", True)]:
+            r = _run(*split, native=native)
+            print(
+                f"{scale:>5} {name:>7} {r['fit']:>8.2f} {r['search']:>11.2f} "
+                f"{r['size']:>6.2f} {r['one_ms']:>12.2f} {r['batch_ms']:>16.1f} "
+                f"{r['rmse']:>13.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
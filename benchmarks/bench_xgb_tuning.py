@@ -0,0 +1,104 @@
+"""
+Compara estrategias de búsqueda de hiperparámetros para XGBoost con el
+mismo presupuesto de `max_evals`:
+- tpe: Hyperopt, cada trial entrena todas sus rondas en 3 folds
+- halving: TPE + successive halving asíncrono sobre rondas de boosting,
+  con parada temprana en el fold de validación
+
+Reporta el tiempo de búsqueda, el mejor RMSE de CV y el RMSE en un holdout
+del modelo final entrenado con los mejores parámetros.
+
+Uso:
+    python -m benchmarks.bench_xgb_tuning --scale 1 --max-evals 25
+"""
+
+import argparse
+import time
+from functools import partial
+
+import numpy as np
+from hyperopt import STATUS_OK, Trials, fmin, tpe
+from sklearn.metrics import root_mean_squared_error
+
+from benchmarks.bench_feature_encoder import _make_features
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+from orchestration.tasks.model_specs import (
+    HALVING_ETA,
+    MAX_ROUNDS,
+    MIN_ROUNDS,
+    build_xgboost,
+    early_stopping_rmse,
+    search_space_xgb,
+)
+from orchestration.tasks.tuning import (
+    cv_rmse,
+    halving_budgets,
+    halving_fmin,
+    make_folds,
+)
+
+HOLDOUT_RATIO = 0.2
+
+
+def _search_tpe(folds, max_evals):
+    trials = Trials()
+    best = fmin(
+        fn=lambda params: {
+            "loss": cv_rmse(build_xgboost, params, folds),
+            "status": STATUS_OK,
+        },
+        space=search_space_xgb,
+        algo=tpe.suggest,
+        max_evals=max_evals,
+        trials=trials,
+        rstate=np.random.default_rng(42),
+        show_progressbar=False,
+    )
+    return best, trials.best_trial["result"]["loss"]
+
+
+def _search_halving(folds, max_evals):
+    best, trials, _ = halving_fmin(
+        partial(early_stopping_rmse, n_jobs=-1, dmatrices={}),
+        folds,
+        space=search_space_xgb,
+        max_evals=max_evals,
+        budgets=halving_budgets(MIN_ROUNDS, MAX_ROUNDS, HALVING_ETA),
+        eta=HALVING_ETA,
+    )
+    result = trials.best_trial["result"]
+    return {**best, "n_estimators": result["info"]["n_rounds"]}, result["loss"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--max-evals", type=int, default=25)
+    args = parser.parse_args()
+
+    X = _make_features(args.scale)
+    y = X["Precio_lag1"].to_numpy() + np.random.default_rng(0).normal(0, 0.2, len(X))
+    # Holdout con las filas más recientes de cada serie mezcladas al azar
+    rng = np.random.default_rng(1)
+    holdout = rng.random(len(X)) < HOLDOUT_RATIO
+
+    encoder = CategoricalEncoder().fit(X[~holdout])
+    M_train, M_test = encoder.transform(X[~holdout]), encoder.transform(X[holdout])
+    y_train, y_test = y[~holdout], y[holdout]
+    folds = make_folds(M_train, y_train)
+
+    print(
+        f"{'strategy':>8} {'search (s)':>11} {'best CV RMSE':>13} {'holdout RMSE':>13}"
+    )
+    for name, search in [("tpe", _search_tpe), ("halving", _search_halving)]:
+        start = time.perf_counter()
+        best, best_loss = search(folds, args.max_evals)
+        elapsed = time.perf_counter() - start
+
+        model = build_xgboost(best).fit(M_train, y_train)
+        holdout_rmse = root_mean_squared_error(y_test, model.predict(M_test))
+        print(f"{name:>8} {elapsed:>11.1f} {best_loss:>13.4f} {holdout_rmse:>13.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+# Tamaño aproximado del dataset actual: ~190 series x ~548 días
+BASE_SERIES = 190
+BASE_DAYS = 548
+
+
+def make_full_dataset(
+    scale: int = 1,
+    n_series: int = BASE_SERIES,
+    end_date: str = "2025-08-01",
+    nan_ratio: float = 0.05,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    Synthetic stand-in for the daily datalake with the same schema
+    (Fecha, Estado, Ciudad, Tipo, Canal, Precio).
+
+    `scale` multiplies the amount of history (days per series).
+    """
+    rng = np.random.default_rng(seed)
+    n_days = BASE_DAYS * scale
+    fechas = pd.date_range(end=end_date, periods=n_days, freq="D")
+
+    n_cities = int(np.ceil(n_series / 4))
+    estados = np.array([f"Estado {i // 2:02d}" for i in range(n_cities)])
+    ciudades = np.array([f"Ciudad {i:03d}" for i in range(n_cities)])
+    tipos = np.array(["Pasteurizada", "Ultrapasteurizada"])
+    canales = np.array(["Tiendas", "Autoservicios"])
+
+    city_idx = np.repeat(np.arange(n_cities), 4)[:n_series]
+    tipo_idx = np.tile([0, 0, 1, 1], n_cities)[:n_series]
+    canal_idx = np.tile([0, 1, 0, 1], n_cities)[:n_series]
+
+    base = rng.uniform(22, 34, size=n_series)
+    noise = rng.normal(0, 0.15, size=(n_days, n_series)).cumsum(axis=0)
+    precio = np.round(base + noise, 2)
+    precio[rng.random(size=precio.shape) < nan_ratio] = np.nan
+
+    return pd.DataFrame(
+        {
+            "Fecha": np.repeat(fechas.values, n_series),
+            "Estado": np.tile(estados[city_idx], n_days),
+            "Ciudad": np.tile(ciudades[city_idx], n_days),
+            "Tipo": np.tile(tipos[tipo_idx], n_days),
+            "Canal": np.tile(canales[canal_idx], n_days),
+            "Precio": precio.ravel(),
+        }
+    )
+
+
+MESES = [
+    "enero",
+    "febrero",
+    "marzo",
+    "abril",
+    "mayo",
+    "junio",
+    "julio",
+    "agosto",
+    "septiembre",
+    "octubre",
+    "noviembre",
+    "diciembre",
+]
+
+
+def make_sniim_sheet(
+    n_days: int = 365,
+    n_states: int = 32,
+    cities_per_state: int = 2,
+    end_date: str = "2025-07-31",
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    Synthetic raw SNIIM sheet (as returned by `pd.read_excel(header=None)`)
+    with one price block per day, newest first.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for fecha in pd.date_range(end=end_date, periods=n_days, freq="D")[::-1]:
+        rows.append(
+            ["Precio promedio al consumidor por litro", None, None, None, None, None]
+        )
+        rows.append(
+            [
+                None,
+                None,
+                f"Viernes {fecha.day} de {MESES[fecha.month - 1]} de {fecha.year}",
+                None,
+                None,
+                None,
+            ]
+        )
+        rows.append(
+            ["Estado", "Ciudad", "Pasteurizada", None, "Ultrapasteurizada", None]
+        )
+        rows.append(
+            [None, None, "Tiendas", "Autoservicios", "Tiendas", "Autoservicios"]
+        )
+        for s in range(n_states):
+            for c in range(cities_per_state):
+                precios = list(np.round(rng.uniform(20, 35, size=4), 2))
+                if rng.random() < 0.1:
+                    precios[rng.integers(4)] = "n.d."
+                rows.append(
+                    [f"Estado {s:02d}" if c == 0 else None, f"Ciudad {s:02d}-{c}"]
+                    + precios
+                )
+            if s % 8 == 0:
+                rows.append(
+                    [None, "Promedio estatal"]
+                    + list(np.round(rng.uniform(20, 35, size=4), 2))
+                )
+        rows.append(
+            ["Promedio Nacional", None] + list(np.round(rng.uniform(20, 35, size=4), 2))
+        )
+        rows.append(["Fuente: SNIIM", None, None, None, None, None])
+        rows.append([None] * 6)
+    return pd.DataFrame(rows)
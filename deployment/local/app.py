@@ -1,26 +1,94 @@
-from flask import Flask, request, jsonify
+import os
+import time
+import orjson
+from flask import Flask, Response, request, jsonify
+from batch import MAX_BATCH_BYTES, BatchError, log_batch, parse_batch, to_records
+from feature_store import OnlineFeatureStore
+from prediction_index import PredictionIndex
+from request_schema import FastPredictor, SchemaError, parse_records, validate_records
 import pickle
 
 app = Flask(__name__)
+# Flask responde 413 a cuerpos más grandes que el límite de lotes
+app.config["MAX_CONTENT_LENGTH"] = MAX_BATCH_BYTES
 
 # Carga el modelo entrenado
 with open("model/model.pkl", "rb") as f_in:
-    model = pickle.load(f_in)
+    # FastPredictor arma la matriz del modelo sin pasar por pandas
+    model = FastPredictor(pickle.load(f_in))
+
+# Predicciones diarias precalculadas (reports/predicciones_<fecha>.csv)
+index = PredictionIndex()
+index.load_latest_local(os.environ.get("PREDICTIONS_DIR", "reports"))
+
+# Lag features por serie (reports/online_features_<fecha>.csv): completan
+# los requests que solo mandan Estado/Ciudad/Tipo/Canal
+feature_store = OnlineFeatureStore()
+feature_store.load_latest_local(os.environ.get("ONLINE_FEATURES_DIR", "reports"))
 
 
 @app.route("/predict", methods=["POST"])
 def predict():
-    features = request.get_json()
+    # Payloads inválidos se rechazan antes de tocar el modelo
+    try:
+        features = parse_records(request.get_data())
+    except SchemaError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        # Series precalculadas desde el índice, el resto con el modelo
+        prediction = index.predict(
+            features, lambda rows: model.predict(feature_store.enrich(rows))
+        )
+        return Response(
+            orjson.dumps({"predicted_price": prediction[0]}),
+            mimetype="application/json",
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
-    # Asegúrate que la entrada sea una lista de diccionarios
-    if isinstance(features, dict):
-        features = [features]
 
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Thousands of records in one request: JSON lines, a list of records or
+    columnar JSON (see `batch.parse_batch`). Runs a single `predict` and
+    returns the predictions in input order plus the batch latency.
+    Series in the precomputed index skip the model.
+    """
+    start = time.perf_counter()
     try:
-        prediction = model.predict(features)
-        return jsonify({"predicted_price": float(prediction[0])})
+        payload, n = parse_batch(request.get_data(), request.content_type)
+    except BatchError as e:
+        return jsonify({"error": str(e)}), e.status_code
+    # Mismo esquema que /predict: registros inválidos no llegan al modelo
+    try:
+        records = validate_records(to_records(payload))
+    except SchemaError as e:
+        return jsonify({"error": str(e)}), 400
+    parsed = time.perf_counter()
+
+    try:
+        prediction = index.predict(
+            records,
+            lambda rows: model.predict(feature_store.enrich(rows)),
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 400
+    done = time.perf_counter()
+
+    return jsonify(
+        {
+            "predictions": prediction,
+            "metrics": log_batch(n, (parsed - start) * 1e3, (done - parsed) * 1e3),
+        }
+    )
+
+
+@app.route("/predict/stats", methods=["GET"])
+def predict_stats():
+    # Aciertos / fallos del índice de predicciones precalculadas
+    return jsonify({**index.stats(), "online_features": feature_store.stats()})
 
 
 @app.route("/", methods=["GET"])
@@ -29,4 +97,5 @@ def health():
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=9696)
+    # Modo debug solo si se pide explícitamente (FLASK_DEBUG=1)
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1", host="0.0.0.0", port=9696)
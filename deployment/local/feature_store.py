@@ -0,0 +1,181 @@
+# Online feature store: last price and rolling 7-price sum of each
+# (Estado, Ciudad, Tipo, Canal) series, exported by `export_online_features`
+# after each ingest (`online_features_<date>.csv`). Requests that only send
+# the four dimensions are completed with `Precio_lag1`, `Precio_mean7` and
+# the date features of the next day with a single dict lookup. Only uses the
+# standard library.
+#
+# Keep in sync: the same file lives in deployment/local, deployment/ondemand
+# and iac/code.
+
+import csv
+import io
+import logging
+import math
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+DIM_COLS = ["Estado", "Ciudad", "Tipo", "Canal"]
+FEATURE_COLS = ["Precio_lag1", "Precio_mean7", "año", "mes", "dia", "dia_semana"]
+DATALAKE_BUCKET = "mlops-milk-datalake"
+FEATURES_PREFIX = "features/online/"
+# Igual que `Series.dt.day_name()` en prepare_full_dataset_s3
+WEEKDAYS = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+logger = logging.getLogger(__name__)
+
+
+def _number(value: str) -> float:
+    # pandas escribe los nulos como celdas vacías
+    return float(value) if value else math.nan
+
+
+class OnlineFeatureStore:
+    """
+    In-process table of the lag features of each series, keyed by its four
+    dimensions. Features are predicted for the day after the newest date in
+    the table. The table is rebuilt aside and swapped in a single
+    assignment on reload.
+    """
+
+    def __init__(self):
+        self._state = ({}, {})
+        self.source = None
+        self.loaded_at = None
+        self.target_date = None
+        self.enriched = 0
+        self.unknown = 0
+
+    def __len__(self):
+        return len(self._state[0])
+
+    def load_csv(self, f, source: str = None) -> int:
+        """
+        Loads an online features CSV (path or text file object).
+
+        Returns:
+            int: number of series
+        """
+        if isinstance(f, (str, Path)):
+            with open(f, newline="", encoding="utf-8") as fh:
+                return self.load_csv(fh, source or str(f))
+        table, as_of = {}, ""
+        for row in csv.DictReader(f):
+            key = tuple(row[col] for col in DIM_COLS)
+            count = _number(row["Precio_count7"])
+            mean7 = _number(row["Precio_sum7"]) / count if count else math.nan
+            table[key] = (_number(row["Precio_last"]), mean7)
+            as_of = max(as_of, row["Fecha"])
+
+        target = date.fromisoformat(as_of) + timedelta(days=1) if as_of else None
+        dates = {}
+        if target is not None:
+            dates = {
+                "año": target.year,
+                "mes": target.month,
+                "dia": target.day,
+                "dia_semana": WEEKDAYS[target.weekday()],
+            }
+        self._state = (table, dates)
+        self.source = source
+        self.target_date = target
+        self.loaded_at = time.time()
+        logger.info("Loaded online features of %d series from %s", len(table), source)
+        return len(table)
+
+    def load_latest_local(self, directory: str = "reports") -> bool:
+        """
+        Loads the newest `online_features_<date>.csv` of `directory`, if any.
+        """
+        files = sorted(Path(directory).glob("online_features_*.csv"))
+        if not files or str(files[-1]) == self.source:
+            return False
+        self.load_csv(files[-1])
+        return True
+
+    def refresh_from_s3(
+        self, s3, bucket: str = DATALAKE_BUCKET, prefix: str = FEATURES_PREFIX
+    ) -> bool:
+        """
+        Loads the newest online features CSV under `s3://bucket/prefix` if
+        it isn't the one already loaded.
+
+        Returns:
+            bool: True if a new file was loaded
+        """
+        keys = []
+        for page in s3.get_paginator("list_objects_v2").paginate(
+            Bucket=bucket, Prefix=prefix
+        ):
+            keys.extend(
+                obj["Key"]
+                for obj in page.get("Contents", [])
+                if obj["Key"].endswith(".csv")
+            )
+        # features/online/<YYYY-MM-DD>/...: el orden lexicográfico es el cronológico
+        if not keys or max(keys) == self.source:
+            self.loaded_at = time.time()
+            return False
+        latest = max(keys)
+        body = s3.get_object(Bucket=bucket, Key=latest)["Body"].read()
+        self.load_csv(io.StringIO(body.decode("utf-8")), source=latest)
+        return True
+
+    def enrich(self, records: list) -> list:
+        """
+        Fills the missing `FEATURE_COLS` of each record from its series.
+        Fields sent by the client win; records that already have every
+        feature, or whose series isn't in the table, are returned as is.
+        """
+        table, dates = self._state
+        out = []
+        for record in records:
+            if all(col in record for col in FEATURE_COLS):
+                out.append(record)
+                continue
+            entry = table.get(tuple(str(record.get(col)) for col in DIM_COLS))
+            if entry is None:
+                self.unknown += 1
+                out.append(record)
+                continue
+            lag1, mean7 = entry
+            out.append({"Precio_lag1": lag1, "Precio_mean7": mean7, **dates, **record})
+            self.enriched += 1
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "series": len(self),
+            "enriched": self.enriched,
+            "unknown_series": self.unknown,
+            "target_date": self.target_date and self.target_date.isoformat(),
+            "source": self.source,
+        }
+
+    def start(self, refresh, interval: float) -> threading.Thread:
+        """
+        Calls `refresh` (e.g. `lambda: store.refresh_from_s3(s3)`) now and
+        then every `interval` seconds from a daemon thread.
+        """
+
+        def _poll():
+            while True:
+                try:
+                    refresh()
+                except Exception:
+                    logger.exception("Couldn't refresh the online features")
+                time.sleep(interval)
+
+        thread = threading.Thread(target=_poll, daemon=True)
+        thread.start()
+        return thread
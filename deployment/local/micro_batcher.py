@@ -0,0 +1,143 @@
+# Collects concurrent single-record requests of the ASGI app into
+# micro-batches, so the model runs one vectorized `predict` per batch
+# instead of one per request.
+#
+# Keep in sync: the same file lives in deployment/local and
+# deployment/ondemand.
+
+import asyncio
+import os
+
+MAX_BATCH_SIZE = int(os.environ.get("MICROBATCH_MAX_SIZE", "64"))
+MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", "2"))
+
+
+class BatcherStopped(RuntimeError):
+    pass
+
+
+class MicroBatcher:
+    """
+    `await predict(record)` queues the record and returns its prediction.
+
+    A worker task takes the first queued record, waits up to `max_wait_ms`
+    for more (or until `max_batch_size` are queued) and calls
+    `predict_fn(records)` once, in a thread so the event loop keeps
+    accepting requests. Each caller gets back the prediction of its own
+    record. If the batch fails, its records are retried one by one so a
+    bad record only fails its own request. A `predict_fn` that returns a
+    different number of predictions than records fails the whole batch.
+    `stop()` fails every request still pending with `BatcherStopped`.
+    """
+
+    def __init__(
+        self,
+        predict_fn,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1e3
+        self.batches = 0
+        self.records = 0
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        # Requests encolados que ya no tomará ningún worker
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            _fail(future, BatcherStopped("The micro-batcher was stopped"))
+
+    async def predict(self, record: dict) -> float:
+        if self._worker is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Lo que ya esté en la cola entra sin esperar más
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._score(batch)
+            except asyncio.CancelledError:
+                # stop() durante un lote: sus requests no se quedan colgados
+                for _, future in batch:
+                    _fail(future, BatcherStopped("The micro-batcher was stopped"))
+                raise
+
+    async def _score(self, batch: list):
+        records = [record for record, _ in batch]
+        futures = [future for _, future in batch]
+        self.batches += 1
+        self.records += len(batch)
+        try:
+            values = await asyncio.to_thread(self.predict_fn, records)
+        except Exception:
+            results = [await self._predict_one(record) for record in records]
+        else:
+            if len(values) == len(records):
+                results = [(float(value), None) for value in values]
+            else:
+                error = RuntimeError(
+                    f"predict_fn returned {len(values)} predictions "
+                    f"for {len(records)} records"
+                )
+                results = [(None, error)] * len(records)
+        for future, (value, error) in zip(futures, results):
+            if future.done():  # el cliente ya se desconectó
+                continue
+            if error is None:
+                future.set_result(value)
+            else:
+                future.set_exception(error)
+
+    async def _predict_one(self, record: dict) -> tuple:
+        try:
+            values = await asyncio.to_thread(self.predict_fn, [record])
+            if len(values) != 1:
+                raise RuntimeError(f"predict_fn returned {len(values)} predictions")
+            return float(values[0]), None
+        except Exception as e:
+            return None, e
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "records": self.records,
+            "mean_batch_size": self.records / self.batches if self.batches else 0.0,
+        }
+
+
+def _fail(future: asyncio.Future, error: Exception):
+    if not future.done():
+        future.set_exception(error)
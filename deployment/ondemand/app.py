@@ -1,36 +1,106 @@
-from flask import Flask, request, jsonify
-import mlflow.pyfunc
-import json
-import boto3
-
-# --- Load model metadata directly from S3 ---
-s3 = boto3.client("s3")
-response = s3.get_object(
-    Bucket="mlflow-models-milk-price-dev", Key="promoted/daily_model.json"
-)
-meta = json.load(response["Body"])
-
-model_id = meta["artifact_uri"].split("/")[-1]
-model_s3_path = f"s3://mlflow-models-milk-price-dev/2/models/{model_id}/artifacts/"
-model = mlflow.pyfunc.load_model(model_s3_path)
+import os
+import time
+import orjson
+from flask import Flask, Response, request, jsonify
+from batch import MAX_BATCH_BYTES, BatchError, log_batch, parse_batch, to_records
+from feature_store import OnlineFeatureStore
+from prediction_index import PredictionIndex
+from request_schema import FastPredictor, SchemaError, parse_records, validate_records
+from model_manager import POLL_SECONDS, ModelManager, load_mlflow_model
+
+# --- Promoted model, reloaded in the background when a new one is promoted ---
+# FastPredictor arma la matriz del modelo sin pasar por pandas
+manager = ModelManager(load=lambda path: FastPredictor(load_mlflow_model(path)))
+manager.start()
+
+# --- Daily precomputed predictions, answered without calling the model ---
+index = PredictionIndex()
+index.start(lambda: index.refresh_from_s3(manager.s3), POLL_SECONDS)
+
+# --- Online lag features, to complete requests with only the four dimensions ---
+feature_store = OnlineFeatureStore()
+feature_store.start(lambda: feature_store.refresh_from_s3(manager.s3), POLL_SECONDS)
 
 # --- Initialize Flask app ---
 app = Flask(__name__)
+# Flask responde 413 a cuerpos más grandes que el límite de lotes
+app.config["MAX_CONTENT_LENGTH"] = MAX_BATCH_BYTES
 
 
 @app.route("/predict", methods=["POST"])
 def predict():
-    features = request.get_json()
+    # Payloads inválidos se rechazan antes de tocar el modelo
+    try:
+        features = parse_records(request.get_data())
+    except SchemaError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Una sola referencia por request: un cambio de modelo no la afecta
+    model, run_id = manager.model, manager.meta["run_id"]
+    try:
+        # Series precalculadas desde el índice, el resto con el modelo
+        prediction = index.predict(
+            features,
+            lambda rows: model.predict(feature_store.enrich(rows)),
+            run_id=run_id,
+        )
+        return Response(
+            orjson.dumps({"predicted_price": prediction[0]}),
+            mimetype="application/json",
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
-    # Ensure input is a list of dictionaries
-    if isinstance(features, dict):
-        features = [features]
 
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Thousands of records in one request: JSON lines, a list of records or
+    columnar JSON (see `batch.parse_batch`). Runs a single `predict` and
+    returns the predictions in input order plus the batch latency.
+    Series in the precomputed index skip the model.
+    """
+    start = time.perf_counter()
     try:
-        prediction = model.predict(features)
-        return jsonify({"predicted_price": float(prediction[0])})
+        payload, n = parse_batch(request.get_data(), request.content_type)
+    except BatchError as e:
+        return jsonify({"error": str(e)}), e.status_code
+    # Mismo esquema que /predict: registros inválidos no llegan al modelo
+    try:
+        records = validate_records(to_records(payload))
+    except SchemaError as e:
+        return jsonify({"error": str(e)}), 400
+    parsed = time.perf_counter()
+
+    model, run_id = manager.model, manager.meta["run_id"]
+    try:
+        prediction = index.predict(
+            records,
+            lambda rows: model.predict(feature_store.enrich(rows)),
+            run_id=run_id,
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 400
+    done = time.perf_counter()
+
+    return jsonify(
+        {
+            "predictions": prediction,
+            "metrics": log_batch(n, (parsed - start) * 1e3, (done - parsed) * 1e3),
+        }
+    )
+
+
+@app.route("/model", methods=["GET"])
+def model_info():
+    meta = manager.meta
+    return jsonify({key: meta[key] for key in ("model_name", "version", "run_id")})
+
+
+@app.route("/predict/stats", methods=["GET"])
+def predict_stats():
+    # Aciertos / fallos del índice de predicciones precalculadas
+    return jsonify({**index.stats(), "online_features": feature_store.stats()})
 
 
 @app.route("/", methods=["GET"])
@@ -39,4 +109,5 @@ def health():
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=9696)
+    # Modo debug solo si se pide explícitamente (FLASK_DEBUG=1)
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1", host="0.0.0.0", port=9696)
@@ -0,0 +1,103 @@
+"""
+Async serving mode: the Flask app's model manager and precomputed index,
+served with Starlette. Concurrent `/predict` requests are grouped into
+micro-batches (`MICROBATCH_MAX_SIZE`, `MICROBATCH_MAX_WAIT_MS`) and scored
+with one `predict` per batch.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 9696
+"""
+
+import time
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+import app as wsgi
+from batch import BatchError, log_batch, parse_batch, to_records
+from micro_batcher import MicroBatcher
+from request_schema import SchemaError, parse_records, validate_records
+
+
+def _predict(records: list) -> list:
+    # Un modelo por lote: un cambio de modelo no afecta al lote en curso
+    model, run_id = wsgi.manager.model, wsgi.manager.meta["run_id"]
+    return wsgi.index.predict(
+        records,
+        lambda rows: model.predict(wsgi.feature_store.enrich(rows)),
+        run_id=run_id,
+    )
+
+
+batcher = MicroBatcher(_predict)
+
+
+async def predict(request):
+    try:
+        # Igual que la app Flask: se responde el primer registro
+        record = parse_records(await request.body())[0]
+        prediction = await batcher.predict(record)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return JSONResponse({"predicted_price": prediction})
+
+
+async def predict_batch(request):
+    start = time.perf_counter()
+    try:
+        payload, n = parse_batch(
+            await request.body(), request.headers.get("content-type")
+        )
+    except BatchError as e:
+        return JSONResponse({"error": str(e)}, status_code=e.status_code)
+    # Mismo esquema que /predict: registros inválidos no llegan al modelo
+    try:
+        records = validate_records(to_records(payload))
+    except SchemaError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    parsed = time.perf_counter()
+
+    try:
+        prediction = await run_in_threadpool(_predict, records)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    done = time.perf_counter()
+
+    return JSONResponse(
+        {
+            "predictions": prediction,
+            "metrics": log_batch(n, (parsed - start) * 1e3, (done - parsed) * 1e3),
+        }
+    )
+
+
+async def predict_stats(request):
+    return JSONResponse(
+        {
+            **wsgi.index.stats(),
+            "online_features": wsgi.feature_store.stats(),
+            "microbatching": batcher.stats(),
+        }
+    )
+
+
+async def health(request):
+    return PlainTextResponse("App is running")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await batcher.start()
+    yield
+    await batcher.stop()
+
+
+app = Starlette(
+    routes=[
+        Route("/predict", predict, methods=["POST"]),
+        Route("/predict/batch", predict_batch, methods=["POST"]),
+        Route("/predict/stats", predict_stats, methods=["GET"]),
+        Route("/", health, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
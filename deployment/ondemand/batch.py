@@ -0,0 +1,103 @@
+# Parsing and limits of batch prediction payloads (`/predict/batch` and the
+# batch event of the Lambda handler). Only uses the standard library.
+#
+# Keep in sync: the same file lives in deployment/local, deployment/ondemand
+# and iac/code.
+
+import json
+import logging
+import os
+
+MAX_BATCH_RECORDS = int(os.environ.get("MAX_BATCH_RECORDS", "10000"))
+MAX_BATCH_BYTES = int(os.environ.get("MAX_BATCH_BYTES", str(8 * 2**20)))
+
+logger = logging.getLogger(__name__)
+
+
+class BatchError(ValueError):
+    status_code = 400
+
+
+class BatchTooLarge(BatchError):
+    status_code = 413
+
+
+def is_json_lines(content_type) -> bool:
+    return bool(content_type) and (
+        "ndjson" in content_type or "jsonlines" in content_type
+    )
+
+
+def _check_size(n: int):
+    if n == 0:
+        raise BatchError("Empty batch")
+    if n > MAX_BATCH_RECORDS:
+        raise BatchTooLarge(f"Batch has {n} records, the limit is {MAX_BATCH_RECORDS}")
+
+
+def parse_batch(body, content_type: str = None):
+    """
+    Accepts a batch as:
+
+    - JSON lines: one record per line (`application/x-ndjson`)
+    - a JSON list of records, or `{"records": [...]}`
+    - columnar JSON: `{"columns": {"Estado": [...], "Ciudad": [...], ...}}`
+
+    Returns:
+        tuple: (payload, n) where payload is a list of dicts or a dict of
+        equal-length lists (columnar), ready for a single `model.predict`
+    """
+    if isinstance(body, (bytes, str)):
+        if len(body) > MAX_BATCH_BYTES:
+            raise BatchTooLarge(f"Batch is larger than {MAX_BATCH_BYTES} bytes")
+        try:
+            if is_json_lines(content_type):
+                text = body.decode() if isinstance(body, bytes) else body
+                body = [json.loads(line) for line in text.splitlines() if line.strip()]
+            else:
+                body = json.loads(body)
+        except ValueError as e:
+            raise BatchError(f"Invalid JSON: {e}")
+
+    if isinstance(body, dict) and "columns" in body:
+        columns = body["columns"]
+        if not isinstance(columns, dict) or not all(
+            isinstance(values, list) for values in columns.values()
+        ):
+            raise BatchError('"columns" must map each column to a list')
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise BatchError("Every column must have the same length")
+        n = lengths.pop()
+        _check_size(n)
+        return columns, n
+
+    records = body.get("records") if isinstance(body, dict) else body
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise BatchError("Expected a list of records or columnar JSON")
+    _check_size(len(records))
+    return records, len(records)
+
+
+def to_records(payload) -> list:
+    """
+    Columnar payload -> list of dicts (records are returned as they are).
+    """
+    if isinstance(payload, list):
+        return payload
+    names = list(payload)
+    return [dict(zip(names, values)) for values in zip(*payload.values())]
+
+
+def log_batch(n: int, parse_ms: float, predict_ms: float) -> dict:
+    """
+    Per-batch latency metrics, logged and returned with the predictions.
+    """
+    metrics = {
+        "records": n,
+        "parse_ms": round(parse_ms, 3),
+        "predict_ms": round(predict_ms, 3),
+        "per_record_us": round(predict_ms * 1e3 / n, 3),
+    }
+    logger.info("batch %s", json.dumps(metrics))
+    return metrics
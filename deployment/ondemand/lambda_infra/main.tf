@@ -145,6 +145,14 @@ resource "aws_apigatewayv2_route" "predict_route" {
   target    = "integrations/${aws_apigatewayv2_integration.milk_api_integration.id}"
 }
 
+# Lotes y estadísticas del índice llegan a la misma Lambda
+resource "aws_apigatewayv2_route" "extra_routes" {
+  for_each  = toset(["POST /predict/batch", "GET /predict/stats"])
+  api_id    = aws_apigatewayv2_api.milk_api_gateway.id
+  route_key = each.value
+  target    = "integrations/${aws_apigatewayv2_integration.milk_api_integration.id}"
+}
+
 # 🔄 Permission: allow API Gateway to invoke Lambda
 resource "aws_lambda_permission" "api_gateway_invoke" {
   statement_id  = "AllowExecutionFromAPIGateway"
@@ -0,0 +1,209 @@
+# Keeps the promoted model of the Flask app up to date without restarts:
+# polls `promoted/daily_model.json` with If-None-Match and swaps the model
+# when a new version is promoted. Artifacts are downloaded once to a cache
+# on disk shared by every gunicorn worker.
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+BUCKET = "mlflow-models-milk-price-dev"
+PROMOTION_KEY = "promoted/daily_model.json"
+CACHE_DIR = os.environ.get("MODEL_CACHE_DIR", "/tmp/model-cache")
+POLL_SECONDS = int(os.environ.get("MODEL_POLL_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+def artifacts_uri(meta: dict, bucket: str = BUCKET) -> str:
+    """
+    S3 location of the MLflow model artifacts of a promotion record.
+    """
+    model_id = meta["artifact_uri"].split("/")[-1]
+    return f"s3://{bucket}/2/models/{model_id}/artifacts/"
+
+
+def download_mlflow_artifacts(uri: str, dst: str) -> str:
+    import mlflow.artifacts
+
+    return mlflow.artifacts.download_artifacts(artifact_uri=uri, dst_path=dst)
+
+
+def load_mlflow_model(path: str):
+    import mlflow.pyfunc
+
+    # download_artifacts puede anidar el modelo en un subdirectorio
+    mlmodel = next(Path(path).rglob("MLmodel"))
+    return mlflow.pyfunc.load_model(str(mlmodel.parent))
+
+
+class ModelManager:
+    """
+    Promoted model, cached by `version`/`run_id` of the promotion record.
+
+    - `refresh()` asks S3 for the record with `If-None-Match`, so polling
+      an unchanged record costs a 304 and no download
+    - a new version is downloaded to `cache_dir/<version>-<run_id>` under
+      a file lock: with N workers, the first one downloads it and the
+      others wait and load it from disk
+    - `(key, meta, model)` is replaced in a single assignment: requests that
+      already took the previous model finish with it
+    - after a swap, cached versions other than the current and the
+      previous one are deleted
+    """
+
+    def __init__(
+        self,
+        s3=None,
+        bucket: str = BUCKET,
+        key: str = PROMOTION_KEY,
+        cache_dir: str = CACHE_DIR,
+        download=download_mlflow_artifacts,
+        load=load_mlflow_model,
+    ):
+        if s3 is None:
+            import boto3
+
+            s3 = boto3.client("s3")
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.cache_dir = Path(cache_dir)
+        self.download = download
+        self.load = load
+        self._etag = None
+        self._current = (None, None, None)  # (cache key, metadata, model)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @property
+    def model(self):
+        if self._current[2] is None:
+            self.refresh()
+        return self._current[2]
+
+    @property
+    def meta(self) -> dict:
+        return self._current[1]
+
+    def _get_record(self):
+        kwargs = {"Bucket": self.bucket, "Key": self.key}
+        if self._etag is not None:
+            kwargs["IfNoneMatch"] = self._etag
+        try:
+            response = self.s3.get_object(**kwargs)
+        except Exception as e:
+            code = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if code in ("304", "NotModified"):
+                return None
+            raise
+        return response["ETag"], json.load(response["Body"])
+
+    def _lock_file(self, name: str, blocking: bool = True):
+        """
+        Opens and locks `cache_dir/<name>.lock`. Retries if the file was
+        removed by a cleanup while waiting for it, so the lock held is
+        always the one on disk. Returns None if `blocking` is False and
+        another worker holds it.
+        """
+        path = self.cache_dir / f"{name}.lock"
+        while True:
+            lock = open(path, "a")
+            try:
+                flags = fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+                fcntl.flock(lock, flags)
+            except BlockingIOError:
+                lock.close()
+                return None
+            if path.exists() and os.path.samestat(os.fstat(lock.fileno()), path.stat()):
+                return lock
+            lock.close()
+
+    def _local_copy(self, name: str, meta: dict) -> Path:
+        path = self.cache_dir / name
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock_file(name):
+            # Un solo worker descarga; los demás esperan y leen del disco
+            if not path.exists():
+                tmp = tempfile.mkdtemp(dir=self.cache_dir, prefix=f".{name}-")
+                try:
+                    self.download(artifacts_uri(meta, self.bucket), tmp)
+                    os.rename(tmp, path)
+                except BaseException:
+                    shutil.rmtree(tmp, ignore_errors=True)
+                    raise
+        return path
+
+    def _prune(self, keep: set):
+        """
+        Deletes the cached versions (and their `.lock` files) not in `keep`.
+        Each one is deleted while holding its file lock; versions another
+        worker is downloading or loading are left for a later cleanup.
+        """
+        names = {
+            p.name.removesuffix(".lock")
+            for p in self.cache_dir.iterdir()
+            # Los ".<name>-*" son descargas en curso
+            if not p.name.startswith(".")
+        }
+        for name in names - keep:
+            lock = self._lock_file(name, blocking=False)
+            if lock is None:
+                continue
+            with lock:
+                shutil.rmtree(self.cache_dir / name, ignore_errors=True)
+                os.unlink(self.cache_dir / f"{name}.lock")
+
+    def refresh(self) -> bool:
+        """
+        Loads the promoted model if it changed since the last call.
+
+        Returns:
+            bool: True if a new model was swapped in
+        """
+        with self._lock:
+            record = self._get_record()
+            if record is None:
+                return False
+            etag, meta = record
+            name = f"{meta['version']}-{meta['run_id']}"
+            if name != self._current[0]:
+                model = self.load(str(self._local_copy(name, meta)))
+                previous = self._current[0]
+                self._current = (name, meta, model)
+                logger.info("Loaded model %s v%s", meta["model_name"], meta["version"])
+                try:
+                    self._prune({name, previous})
+                except OSError:
+                    logger.exception("Couldn't clean up the model cache")
+                swapped = True
+            else:
+                swapped = False
+            # La ETag se guarda solo si el modelo ya quedó cargado
+            self._etag = etag
+            return swapped
+
+    def _poll(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception:
+                # Se sigue sirviendo el modelo actual y se reintenta luego
+                logger.exception("Couldn't refresh the promoted model")
+
+    def start(self, interval: float = POLL_SECONDS) -> threading.Thread:
+        """
+        Loads the current model and polls for new ones in a daemon thread.
+        """
+        self.refresh()
+        thread = threading.Thread(target=self._poll, args=(interval,), daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,210 @@
+# In-memory index of the daily predictions written by
+# `generate_daily_predictions` (`predicciones_<date>.csv`), keyed by the four
+# series dimensions. Requests for a precomputed series are answered without
+# calling the model, as long as the file targets today and was produced by
+# the model being served. Only uses the standard library.
+#
+# Keep in sync: the same file lives in deployment/local, deployment/ondemand
+# and iac/code.
+
+import csv
+import io
+import logging
+import math
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+DIM_COLS = ["Estado", "Ciudad", "Tipo", "Canal"]
+PREDICTION_COL = "Precio_sugerido"
+# Columnas que describen el archivo, no las features de la predicción
+RUN_ID_COL = "run_id"
+DATE_COLS = ["año", "mes", "día"]
+DATALAKE_BUCKET = "mlops-milk-datalake"
+PREDICTIONS_PREFIX = "predicciones/"
+
+logger = logging.getLogger(__name__)
+
+
+def _same(requested, stored: str) -> bool:
+    if str(requested) == stored:
+        return True
+    try:
+        return math.isclose(float(requested), float(stored))
+    except (TypeError, ValueError):
+        return False
+
+
+class PredictionIndex:
+    """
+    Precomputed prediction of each (Estado, Ciudad, Tipo, Canal) series.
+
+    A record is a hit when its four dimensions are in the index and any
+    other field it sends matches the features the prediction was computed
+    with. Everything else is a miss and goes to the model. The index is
+    rebuilt aside and swapped in a single assignment on reload.
+
+    The whole index is skipped (`stale`) when the file doesn't target
+    today or, if the caller passes the `run_id` of the model it serves,
+    when it was produced by another model.
+    """
+
+    def __init__(self):
+        self._index = {}
+        self._meta = (None, None)  # (target date, run_id)
+        self.source = None
+        self.loaded_at = None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    @property
+    def target_date(self):
+        return self._meta[0]
+
+    @property
+    def run_id(self):
+        return self._meta[1]
+
+    def __len__(self):
+        return len(self._index)
+
+    def load_csv(self, f, source: str = None) -> int:
+        """
+        Loads a predictions CSV (path or text file object).
+
+        Returns:
+            int: number of indexed series
+        """
+        if isinstance(f, (str, Path)):
+            with open(f, newline="", encoding="utf-8") as fh:
+                return self.load_csv(fh, source or str(f))
+        index, target, run_id = {}, None, None
+        for row in csv.DictReader(f):
+            key = tuple(row[col] for col in DIM_COLS)
+            features = {
+                col: value
+                for col, value in row.items()
+                if col not in DIM_COLS and col not in (PREDICTION_COL, RUN_ID_COL)
+            }
+            index[key] = (features, float(row[PREDICTION_COL]))
+            # Todas las filas comparten fecha objetivo y modelo
+            if target is None and all(row.get(col) for col in DATE_COLS):
+                target = date(*(int(float(row[col])) for col in DATE_COLS))
+            run_id = run_id or row.get(RUN_ID_COL) or None
+        self._index, self._meta = index, (target, run_id)
+        self.source = source
+        self.loaded_at = time.time()
+        logger.info("Loaded %d precomputed predictions from %s", len(index), source)
+        return len(index)
+
+    def load_latest_local(self, directory: str = "reports") -> bool:
+        """
+        Loads the newest `predicciones_<date>.csv` of `directory`, if any.
+        """
+        files = sorted(Path(directory).glob("predicciones_*.csv"))
+        if not files or str(files[-1]) == self.source:
+            return False
+        self.load_csv(files[-1])
+        return True
+
+    def refresh_from_s3(
+        self, s3, bucket: str = DATALAKE_BUCKET, prefix: str = PREDICTIONS_PREFIX
+    ) -> bool:
+        """
+        Loads the newest predictions CSV under `s3://bucket/prefix` if it
+        isn't the one already loaded.
+
+        Returns:
+            bool: True if a new file was loaded
+        """
+        keys = []
+        for page in s3.get_paginator("list_objects_v2").paginate(
+            Bucket=bucket, Prefix=prefix
+        ):
+            keys.extend(
+                obj["Key"]
+                for obj in page.get("Contents", [])
+                if obj["Key"].endswith(".csv")
+            )
+        # predicciones/<YYYY-MM-DD>/...: el orden lexicográfico es el cronológico
+        if not keys or max(keys) == self.source:
+            self.loaded_at = time.time()
+            return False
+        latest = max(keys)
+        body = s3.get_object(Bucket=bucket, Key=latest)["Body"].read()
+        self.load_csv(io.StringIO(body.decode("utf-8")), source=latest)
+        return True
+
+    def lookup(self, record: dict):
+        entry = self._index.get(tuple(str(record.get(col)) for col in DIM_COLS))
+        if entry is None:
+            return None
+        features, prediction = entry
+        for col, value in record.items():
+            if col in DIM_COLS:
+                continue
+            if col not in features or not _same(value, features[col]):
+                return None
+        return prediction
+
+    def is_current(self, run_id: str = None) -> bool:
+        """
+        True if the loaded file targets today and, when `run_id` is given,
+        was produced by that model.
+        """
+        target, loaded_run_id = self._meta
+        if target != date.today():
+            return False
+        return run_id is None or loaded_run_id == run_id
+
+    def predict(self, records: list, predict_fn, run_id: str = None) -> list:
+        """
+        Predictions for `records` in input order: hits come from the index
+        and the misses go to `predict_fn` in a single call. A stale index
+        (see `is_current`) sends every record to `predict_fn`.
+        """
+        if self._index and not self.is_current(run_id):
+            self.stale += len(records)
+            return [float(value) for value in predict_fn(records)]
+        predictions = [self.lookup(record) for record in records]
+        missed = [i for i, value in enumerate(predictions) if value is None]
+        self.hits += len(records) - len(missed)
+        self.misses += len(missed)
+        if missed:
+            values = predict_fn([records[i] for i in missed])
+            for i, value in zip(missed, values):
+                predictions[i] = float(value)
+        return predictions
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "series": len(self),
+            "source": self.source,
+            "stale": self.stale,
+            "target_date": str(self.target_date) if self.target_date else None,
+            "run_id": self.run_id,
+        }
+
+    def start(self, refresh, interval: float) -> threading.Thread:
+        """
+        Calls `refresh` (e.g. `lambda: index.refresh_from_s3(s3)`) now and
+        then every `interval` seconds from a daemon thread.
+        """
+
+        def _poll():
+            while True:
+                try:
+                    refresh()
+                except Exception:
+                    logger.exception("Couldn't refresh the precomputed predictions")
+                time.sleep(interval)
+
+        thread = threading.Thread(target=_poll, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,162 @@
+# Fast path of `/predict`: parses the body with orjson, validates it
+# (and every `/predict/batch` record) against a schema compiled once at
+# startup and builds the model input matrix straight from the records,
+# without a pandas DataFrame per request.
+#
+# Keep in sync: the same file lives in deployment/local and
+# deployment/ondemand.
+
+import math
+import numpy as np
+import orjson
+from scipy import sparse
+
+CATEGORICAL = ["Estado", "Ciudad", "Tipo", "Canal"]
+OPTIONAL_CATEGORICAL = ["dia_semana"]
+NUMERICAL = ["Precio_lag1", "Precio_mean7", "mes", "dia", "año"]
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def compile_schema(
+    required: list = CATEGORICAL,
+    optional_categorical: list = OPTIONAL_CATEGORICAL,
+    numerical: list = NUMERICAL,
+):
+    """
+    Builds the validator of a single record. Field lists are frozen into
+    tuples once, so validating a record is a handful of `isinstance` checks.
+    Unknown fields are allowed and left untouched.
+
+    Returns:
+        callable: validate(record) -> record, raises SchemaError
+    """
+    required = tuple(required)
+    optional_categorical = tuple(optional_categorical)
+    numerical = tuple(numerical)
+
+    def validate(record):
+        if not isinstance(record, dict):
+            raise SchemaError("Each record must be a JSON object")
+        for field in required:
+            value = record.get(field)
+            if not isinstance(value, str) or not value:
+                raise SchemaError(f"{field}: expected a non-empty string")
+        for field in optional_categorical:
+            value = record.get(field)
+            if value is not None and not isinstance(value, (str, int)):
+                raise SchemaError(f"{field}: expected a string or an integer")
+        for field in numerical:
+            value = record.get(field)
+            # bool es subclase de int: se rechaza explícitamente
+            if value is not None and (
+                isinstance(value, bool) or not isinstance(value, (int, float))
+            ):
+                raise SchemaError(f"{field}: expected a number")
+        return record
+
+    return validate
+
+
+validate_record = compile_schema()
+
+
+def parse_records(body: bytes, validate=validate_record) -> list:
+    """
+    `/predict` body (a record or a list of records) -> validated records.
+    """
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise SchemaError(f"Invalid JSON: {e}")
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list) or not payload:
+        raise SchemaError("Expected a record or a non-empty list of records")
+    return [validate(record) for record in payload]
+
+
+def validate_records(records: list, validate=validate_record) -> list:
+    """
+    Batch records (see `batch.to_records`) -> validated records. Errors name
+    the offending record by its position in the batch.
+    """
+    for i, record in enumerate(records):
+        try:
+            validate(record)
+        except SchemaError as e:
+            raise SchemaError(f"Record {i}: {e}")
+    return records
+
+
+class FastPredictor:
+    """
+    Wraps a `CategoricalEncoder(encoding="onehot")` + regressor pipeline.
+    `predict(records)` with a list of dicts builds the same CSR matrix as
+    the encoder, directly from the records, and calls the regressor; any
+    other input (DataFrame, other encodings) goes through the wrapped model.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        pipeline = model
+        if not hasattr(pipeline, "named_steps") and hasattr(model, "get_raw_model"):
+            # pyfunc de MLflow con sabor sklearn: el pipeline está dentro
+            pipeline = model.get_raw_model()
+        steps = getattr(pipeline, "named_steps", {})
+        encoder = steps.get("vectorizer")
+        self.regressor = steps.get("regressor")
+        if getattr(encoder, "encoding", None) != "onehot" or self.regressor is None:
+            self.regressor = None
+            return
+
+        self._columns = {}
+        offset = 0
+        for col in encoder.categorical:
+            categories = encoder.categories_[col]
+            self._columns[col] = {
+                str(value): offset + code for code, value in enumerate(categories)
+            }
+            offset += len(categories)
+        self._numerical = [(col, offset + j) for j, col in enumerate(encoder.numerical)]
+        self._width = offset + len(encoder.numerical)
+
+    def matrix(self, records: list) -> sparse.csr_matrix:
+        # Como el DataFrame del encoder: una columna ausente en todo el lote
+        # vale 0, una clave que falta solo en algunos registros vale NaN
+        default = {
+            col: math.nan if any(col in record for record in records) else 0.0
+            for col, _ in self._numerical
+        }
+        indices, data, indptr = [], [], [0]
+        for record in records:
+            for col, index in self._columns.items():
+                value = record.get(col)
+                if value is not None:
+                    position = index.get(str(value))
+                    if position is not None:
+                        indices.append(position)
+                        data.append(1.0)
+            for col, position in self._numerical:
+                value = record.get(col, default[col])
+                value = math.nan if value is None else float(value)
+                # Como csr_matrix: los ceros no se almacenan, NaN sí
+                if value != 0.0:
+                    indices.append(position)
+                    data.append(value)
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (
+                np.array(data, dtype=np.float64),
+                np.array(indices, dtype=np.int32),
+                np.array(indptr, dtype=np.int32),
+            ),
+            shape=(len(records), self._width),
+        )
+
+    def predict(self, X):
+        if self.regressor is None or not isinstance(X, list):
+            return self.model.predict(X)
+        return self.regressor.predict(self.matrix(X))
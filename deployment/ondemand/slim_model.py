@@ -0,0 +1,110 @@
+# Inference for the slim model artifact exported at promotion
+# (`orchestration/tasks/export_slim_model.py`). Only needs numpy: no MLflow,
+# sklearn, pandas or xgboost, so the Lambda image stays small and the cold
+# start doesn't pay for importing them.
+#
+# Keep in sync: the same file lives in deployment/ondemand and iac/code.
+
+import json
+import math
+from pathlib import Path
+import numpy as np
+
+MANIFEST = "manifest.json"
+TREES = "trees.npz"
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class SlimModel:
+    """
+    Encoder vocabulary + tree ensemble of a promoted pipeline. `predict`
+    accepts the same payloads as the MLflow model: a dict or a list of
+    dicts with the categorical and numerical columns.
+    """
+
+    def __init__(self, model_dir):
+        model_dir = Path(model_dir)
+        self.manifest = json.loads((model_dir / MANIFEST).read_text())
+        # Artefactos exportados antes de guardar el run_id: None
+        self.run_id = self.manifest.get("run_id")
+        with np.load(model_dir / TREES) as trees:
+            self.trees = {name: trees[name] for name in trees.files}
+        self._index = {
+            col: {value: code for code, value in enumerate(values)}
+            for col, values in self.manifest["categories"].items()
+        }
+
+    def features(self, rows: list) -> np.ndarray:
+        """
+        Same matrix as `CategoricalEncoder.transform`, dense and float32.
+        """
+        m = self.manifest
+        n = len(rows)
+        codes = np.full((n, len(m["categorical"])), -1, dtype=np.int64)
+        for j, col in enumerate(m["categorical"]):
+            index = self._index[col]
+            for i, row in enumerate(rows):
+                value = row.get(col)
+                if not _is_missing(value):
+                    codes[i, j] = index.get(str(value), -1)
+        numerical = np.array(
+            [[_to_float(row.get(col, 0.0)) for col in m["numerical"]] for row in rows],
+            dtype=np.float64,
+        ).reshape(n, len(m["numerical"]))
+
+        if m["encoding"] == "onehot":
+            sizes = [len(m["categories"][col]) for col in m["categorical"]]
+            offsets = np.cumsum([0] + sizes[:-1])
+            onehot = np.zeros((n, sum(sizes)), dtype=np.float64)
+            rows_idx, cols_idx = np.nonzero(codes >= 0)
+            onehot[rows_idx, codes[rows_idx, cols_idx] + offsets[cols_idx]] = 1.0
+            X = np.hstack([onehot, numerical])
+            if m["zero_as_missing"]:
+                X[X == 0] = np.nan
+        else:
+            X = np.hstack([np.where(codes >= 0, codes, np.nan), numerical])
+        return X.astype(np.float32)
+
+    def predict(self, rows) -> np.ndarray:
+        if isinstance(rows, dict):
+            rows = [rows]
+        X = self.features(rows)
+        t = self.trees
+        row = np.arange(len(X))[:, None]
+        node = np.broadcast_to(t["roots"], (len(X), len(t["roots"])))
+        # Las hojas apuntan a sí mismas: se avanza hasta que nadie se mueve
+        while True:
+            x = X[row, t["feature"][node]]
+            if self.manifest["split"] == "lt":
+                go_left = x < t["threshold"][node]
+            else:
+                go_left = x <= t["threshold"][node]
+            cat_row = t["cat_row"][node]
+            is_cat = (cat_row >= 0) & ~np.isnan(x)
+            if is_cat.any():
+                code = x[is_cat].astype(np.int64)
+                sets = t["cat_sets"]
+                known = code < sets.shape[1]
+                to_right = np.zeros(len(code), dtype=bool)
+                to_right[known] = sets[cat_row[is_cat][known], code[known]]
+                go_left[is_cat] = ~to_right
+            go_left = np.where(np.isnan(x), t["default_left"][node], go_left)
+            child = np.where(go_left, t["left"][node], t["right"][node])
+            if np.array_equal(child, node):
+                break
+            node = child
+
+        values = t["value"][node].astype(np.float64)
+        if self.manifest["aggregate"] == "mean":
+            return values.mean(axis=1)
+        return self.manifest["base_score"] + values.sum(axis=1)
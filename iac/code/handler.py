@@ -1,20 +1,142 @@
 import json
-import boto3
-import mlflow.pyfunc
 import logging
+import os
+import time
+from pathlib import Path
+from batch import is_json_lines, log_batch, parse_batch, to_records
+from feature_store import OnlineFeatureStore
+from prediction_index import PredictionIndex
+from slim_model import MANIFEST, TREES, SlimModel
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-s3 = boto3.client("s3")
-response = s3.get_object(
-    Bucket="mlflow-models-milk-price-dev", Key="promoted/daily_model.json"
+BUCKET = "mlflow-models-milk-price-dev"
+PROMOTION_KEY = "promoted/daily_model.json"
+SLIM_PREFIX = "promoted/slim"
+
+# Artefacto ligero horneado en la imagen (opcional); si no existe se
+# descarga el del modelo promovido a /tmp, que sobrevive entre invocaciones
+MODEL_DIR = os.environ.get(
+    "MODEL_DIR", os.path.join(os.environ.get("LAMBDA_TASK_ROOT", "."), "model")
 )
-meta = json.load(response["Body"])
+TMP_DIR = "/tmp/model"
+
+# Predicciones diarias precalculadas: "s3" (la más reciente del datalake),
+# la ruta de un CSV en la imagen, u "off"
+PRECOMPUTED_PREDICTIONS = os.environ.get("PRECOMPUTED_PREDICTIONS", "s3")
+PREDICTIONS_REFRESH_SECONDS = int(os.environ.get("PREDICTIONS_REFRESH_SECONDS", "900"))
+# Lag features por serie para requests con solo las cuatro dimensiones:
+# "s3" (la tabla más reciente del datalake), la ruta de un CSV, u "off"
+ONLINE_FEATURES = os.environ.get("ONLINE_FEATURES", "s3")
+
+
+def _download_promoted_model() -> Path:
+    # boto3 solo se importa si el modelo no viene en la imagen
+    import boto3
+    import botocore.exceptions
+
+    s3 = boto3.client("s3")
+    response = s3.get_object(Bucket=BUCKET, Key=PROMOTION_KEY)
+    meta = json.load(response["Body"])
+
+    # Promociones anteriores al artefacto ligero no guardan slim_uri: se
+    # busca en la ruta donde lo deja export_slim_model
+    slim_uri = meta.get("slim_uri") or f"s3://{BUCKET}/{SLIM_PREFIX}/{meta['run_id']}/"
+    bucket, prefix = slim_uri.removeprefix("s3://").split("/", 1)
+    model_dir = Path(TMP_DIR) / meta["run_id"]
+    if not (model_dir / MANIFEST).exists():
+        model_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            # El manifest va al final: marca la descarga como completa
+            for name in (TREES, MANIFEST):
+                s3.download_file(bucket, prefix + name, str(model_dir / name))
+        except botocore.exceptions.ClientError as e:
+            raise RuntimeError(
+                f"No slim model found at {slim_uri} for run {meta['run_id']}. "
+                "The promoted model predates the slim export: re-promote it, "
+                "or run export_slim_model(run_id=...) and add its URI as "
+                f"`slim_uri` to s3://{BUCKET}/{PROMOTION_KEY}."
+            ) from e
+    return model_dir
+
+
+def load_model() -> SlimModel:
+    if (Path(MODEL_DIR) / MANIFEST).exists():
+        return SlimModel(MODEL_DIR)
+    return SlimModel(_download_promoted_model())
+
+
+model = load_model()
+index = PredictionIndex()
+feature_store = OnlineFeatureStore()
+_next_refresh = 0.0
+
+
+def refresh_index():
+    """
+    (Re)loads the precomputed predictions and the online features at most
+    once every PREDICTIONS_REFRESH_SECONDS: a warm container can outlive a
+    day. Called on each request, never at import, so the S3 listing and
+    download stay out of the cold start.
+    """
+    global _next_refresh
+    if time.time() < _next_refresh:
+        return
+    _next_refresh = time.time() + PREDICTIONS_REFRESH_SECONDS
+    # Ambas tablas se cargan igual: del datalake o de un CSV en la imagen
+    for setting, table in (
+        (PRECOMPUTED_PREDICTIONS, index),
+        (ONLINE_FEATURES, feature_store),
+    ):
+        if setting == "off":
+            continue
+        try:
+            if setting == "s3":
+                import boto3
 
-model_id = meta["artifact_uri"].split("/")[-1]
-model_s3_path = f"s3://mlflow-models-milk-price-dev/2/models/{model_id}/artifacts/"
-model = mlflow.pyfunc.load_model(model_s3_path)
+                table.refresh_from_s3(boto3.client("s3"))
+            elif table.source is None:
+                table.load_csv(setting)
+        except Exception as e:
+            # Sin índice (o sin features) se responde todo con el modelo
+            print(f"[WARN] No se pudo cargar {type(table).__name__}: {e}")
+
+
+def predict_records(rows: list) -> list:
+    # Completa Precio_lag1 / Precio_mean7 y la fecha de los registros incompletos
+    return model.predict(feature_store.enrich(rows))
+
+
+def _response(status: int, payload: dict) -> dict:
+    return {
+        "statusCode": status,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(payload),
+    }
+
+
+def predict_batch(body, content_type: str = None) -> dict:
+    """
+    Batch event: `{"records": [...]}`, `{"columns": {...}}` or JSON lines
+    (see `batch.parse_batch`). A single `predict` for the whole batch;
+    predictions are returned in input order.
+    """
+    start = time.perf_counter()
+    payload, n = parse_batch(body, content_type)
+    parsed = time.perf_counter()
+    prediction = index.predict(
+        to_records(payload), predict_records, run_id=model.run_id
+    )
+    done = time.perf_counter()
+    return {
+        "predictions": prediction,
+        "metrics": log_batch(n, (parsed - start) * 1e3, (done - parsed) * 1e3),
+    }
+
+
+def _path(event: dict) -> str:
+    return event.get("rawPath") or event.get("path") or ""
 
 
 # Lambda handler
@@ -22,29 +144,40 @@ def handler(event, context):
 
     try:
 
+        refresh_index()
+        if _path(event).endswith("/predict/stats"):
+            return _response(
+                200, {**index.stats(), "online_features": feature_store.stats()}
+            )
+
         raw_body = event.get("body")
+        headers = event.get("headers") or {}
+        content_type = headers.get("content-type") or headers.get("Content-Type")
+
+        # Lote: ruta /predict/batch o JSON lines (el límite de tamaño se
+        # revisa antes de parsear el cuerpo)
+        if _path(event).endswith("/predict/batch") or is_json_lines(content_type):
+            body = raw_body if raw_body is not None else event
+            return _response(200, predict_batch(body, content_type))
 
         if isinstance(raw_body, str):
             body = json.loads(raw_body)
         else:
             body = raw_body if raw_body is not None else event
 
+        # Invocación directa con un lote: {"records": [...]} o {"columns": {...}}
+        if isinstance(body, dict) and ("records" in body or "columns" in body):
+            return _response(200, predict_batch(body))
+
         if isinstance(body, dict):
             body = [body]
 
-        prediction = model.predict(body)
+        prediction = index.predict(body, predict_records, run_id=model.run_id)
 
-        return {
-            "statusCode": 200,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"predicted_price": float(prediction[0])}),
-        }
+        return _response(200, {"predicted_price": prediction[0]})
 
     except Exception as e:
         print(f"[ERROR] Ha ocurrido una excepción: {e}")
 
-        return {
-            "statusCode": 400,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": str(e)}),
-        }
+        # 413 si el lote excede los límites, 400 para cualquier otro error
+        return _response(getattr(e, "status_code", 400), {"error": str(e)})
@@ -29,6 +29,10 @@ resource "null_resource" "tfid_push_lambda_image" {
   triggers = {
     dockerfile_hash = md5(file("./code/Dockerfile"))
     handler_hash    = md5(file("./code/handler.py"))
+    slim_model_hash = md5(file("./code/slim_model.py"))
+    batch_hash      = md5(file("./code/batch.py"))
+    index_hash      = md5(file("./code/prediction_index.py"))
+    features_hash   = md5(file("./code/feature_store.py"))
   }
 }
 
@@ -57,5 +61,6 @@ module "api_gw" {
   lambda_invoke_arn    = module.lambda.lambda_invoke_arn
   lambda_function_name = module.lambda.lambda_function_name
   route_key            = var.route_key
+  extra_route_keys     = var.extra_route_keys
   stage_name           = var.stage_name
 }
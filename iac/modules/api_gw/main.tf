@@ -17,6 +17,14 @@ resource "aws_apigatewayv2_route" "tfid_route" {
   target    = "integrations/${aws_apigatewayv2_integration.tfid_integration.id}"
 }
 
+# Rutas adicionales del handler (lotes y estadísticas del índice)
+resource "aws_apigatewayv2_route" "tfid_extra_routes" {
+  for_each  = toset(var.extra_route_keys)
+  api_id    = aws_apigatewayv2_api.tfid_api.id
+  route_key = each.value
+  target    = "integrations/${aws_apigatewayv2_integration.tfid_integration.id}"
+}
+
 resource "aws_apigatewayv2_stage" "tfid_stage" {
   api_id      = aws_apigatewayv2_api.tfid_api.id
   name        = var.stage_name
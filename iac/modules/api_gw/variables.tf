@@ -19,6 +19,12 @@ variable "route_key" {
   default     = "POST /predict"
 }
 
+variable "extra_route_keys" {
+  description = "Additional route keys served by the same Lambda integration"
+  type        = list(string)
+  default     = ["POST /predict/batch", "GET /predict/stats"]
+}
+
 variable "stage_name" {
   description = "Name of the stage (e.g., default, v1, prod)"
   type        = string
@@ -56,6 +56,13 @@ variable "route_key" {
   default     = "POST /predict"
 }
 
+# 🌐 Rutas adicionales hacia la misma Lambda (lotes y estadísticas)
+variable "extra_route_keys" {
+  description = "Additional HTTP route keys for API Gateway (e.g. POST /predict/batch)"
+  type        = list(string)
+  default     = ["POST /predict/batch", "GET /predict/stats"]
+}
+
 # 🧾 Nombre del stage de la API
 variable "stage_name" {
   description = "Name of the API Gateway stage"
@@ -0,0 +1,58 @@
+from prefect import flow
+import argparse
+from datetime import datetime
+from orchestration.tasks.backfill_datalake import backfill_datalake
+from orchestration.tasks.compact_datalake import compact_datalake
+from typing import Optional
+
+
+@flow(name="backfill-datalake")
+def backfill_flow(
+    start_date: str,
+    end_date: str,
+    excel_dir: str = "data/raw",
+    daily_root: str = "s3://mlops-milk-datalake/daily",
+    max_workers: Optional[int] = None,
+    overwrite: bool = False,
+):
+    result = backfill_datalake(
+        start_date=start_date,
+        end_date=end_date,
+        excel_dir=excel_dir,
+        daily_root=daily_root,
+        max_workers=max_workers,
+        overwrite=overwrite,
+    )
+
+    # Recompactar solo los meses que recibieron particiones nuevas
+    months = sorted(
+        {
+            (d.year, d.month)
+            for d in (datetime.fromisoformat(f) for f in result["written"])
+        }
+    )
+    if months:
+        compact_datalake(daily_root=daily_root, months=months)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild daily partitions from downloaded SNIIM workbooks"
+    )
+    parser.add_argument("start_date", help="YYYY-MM-DD")
+    parser.add_argument("end_date", help="YYYY-MM-DD")
+    parser.add_argument("--excel-dir", default="data/raw")
+    parser.add_argument("--daily-root", default="s3://mlops-milk-datalake/daily")
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+
+    backfill_flow(
+        start_date=args.start_date,
+        end_date=args.end_date,
+        excel_dir=args.excel_dir,
+        daily_root=args.daily_root,
+        max_workers=args.max_workers,
+        overwrite=args.overwrite,
+    )
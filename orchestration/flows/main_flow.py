@@ -24,16 +24,16 @@ def main(source: str = "local", year: int = 0, month: int = 0):
     print(f"🗓️ Running pipeline for year={year}, month={month}, source={source}")
 
     # Load data
-    X_train_dicts, y_train, X_val_dicts, y_val = load_data(year, month, source)
+    X_train, y_train, X_val, y_val = load_data(year, month, source)
 
     # Train model
-    rmse, y_pred = train_model(X_train_dicts, y_train, X_val_dicts, y_val)
+    rmse, y_pred = train_model(X_train, y_train, X_val, y_val)
 
     # Monitor data drift
     data_drift_dict = monitor_data_drift(
-        X_ref_dicts=X_train_dicts,
+        X_ref_dicts=X_train,
         y_ref=y_train,
-        X_cur_dicts=X_val_dicts,
+        X_cur_dicts=X_val,
         y_cur=y_val,
         year=year,
         month=month,
@@ -1,12 +1,16 @@
 from prefect import flow
-from datetime import datetime
-from orchestration.tasks.check_file_availability import check_file_availability
+from datetime import datetime, timedelta
+from orchestration.tasks.check_file_availability import check_files_availability
+from orchestration.tasks.compact_datalake import compact_datalake
+from orchestration.tasks.export_online_features import export_online_features
+from orchestration.tasks.export_slim_model import export_slim_model
 from orchestration.tasks.extract_and_ingest_today import extract_and_ingest_today
 from orchestration.tasks.monitor_data_drift_from_s3 import monitor_data_drift_from_s3
 from orchestration.tasks.notify_telegram import notify_telegram
 from orchestration.tasks.prepare_full_dataset_s3 import prepare_full_dataset_s3
 from orchestration.tasks.train_random_forest_model import train_random_forest_model
 from orchestration.tasks.train_xgboost_model import train_xgboost_model
+from orchestration.tasks.tuning import split_cpu_budget
 import mlflow
 from typing import Optional
 
@@ -14,55 +18,109 @@ import boto3
 import json
 
 
-@flow(name="daily-mlops-pipeline")
-def daily_pipeline(execution_date: Optional[str] = None):
+# Si un paso falla, el reintento reutiliza los resultados persistidos de los
+# pasos que ya terminaron y vuelve a empezar desde el que falló
+@flow(
+    name="daily-mlops-pipeline",
+    retries=1,
+    retry_delay_seconds=300,
+    persist_result=True,
+)
+def daily_pipeline(
+    execution_date: Optional[str] = None,
+    cpu_budget: Optional[int] = None,
+    xgb_strategy: str = "halving",
+    warm_start: bool = True,
+    full_search_weekday: int = 6,
+    catch_up_days: int = 7,
+):
+    """
+    Daily ingestion, training and promotion pipeline.
+
+    `cpu_budget` caps the cores used by training (defaults to every core).
+    Random Forest and XGBoost are tuned at the same time, each with half of
+    the budget. `xgb_strategy` picks the XGBoost search ("tpe" or
+    "halving", see `train_xgboost_model`).
+
+    With `warm_start`, ordinary days skip the hyperparameter search and
+    keep training the previous models on the new window. The full search
+    runs on `full_search_weekday` (0 = Monday, default Sunday) and on any
+    day data drift is detected.
+
+    Besides `execution_date`, the previous `catch_up_days` days are checked
+    too, so workbooks missed by a failed or skipped run are ingested by the
+    next one.
+    """
     # Parse date
     if execution_date is None:
         exec_date = datetime.today()
     else:
         exec_date = datetime.fromisoformat(execution_date)
 
-    # Step 1: Check if new file is available
-    should_run = check_file_availability(execution_date=exec_date)
+    # Step 1: Check which published files are not in the datalake yet
+    pending = check_files_availability(
+        start_date=exec_date - timedelta(days=catch_up_days), end_date=exec_date
+    )
     notify_telegram.submit("✅ Checked file availability.")
 
-    if not should_run:
+    if not pending:
         print("🚫 No new file to process.")
         notify_telegram.submit("🚫 No new file to process.")
         return
 
-    # Step 2: Extract and ingest data
-    s3_path = extract_and_ingest_today(execution_date=exec_date)
-    print(f"✅ File ingested and uploaded to: {s3_path}")
-    notify_telegram.submit(f"✅ File ingested: {s3_path}")
+    # Step 2: Extract and ingest data (oldest first, so lags are complete)
+    for day in pending:
+        s3_path = extract_and_ingest_today(execution_date=day)
+        print(f"✅ File ingested and uploaded to: {s3_path}")
+        notify_telegram.submit(f"✅ File ingested: {s3_path}")
+
+    # Step 2.1: Compact the ingested months so readers can use the partition index.
+    # The previous month is included so late partitions reach the index too.
+    prev_month = exec_date.replace(day=1) - timedelta(days=1)
+    months = {(d.year, d.month) for d in pending}
+    months |= {(prev_month.year, prev_month.month), (exec_date.year, exec_date.month)}
+    compact_datalake(months=sorted(months))
 
     # Step 3: Data Drift Monitoring
     drift_report = monitor_data_drift_from_s3()
     print("📈 Drift monitoring complete.")
     notify_telegram.submit("📈 Drift monitoring complete.")
 
-    try:
-        label = drift_report["widgets"][0]["params"]["counters"][0]["label"]
-        data_drift_detected = "NOT" not in label.upper()
-    except Exception as e:
-        data_drift_detected = False
-        print("⚠️ Couldn't determine data drift status:", e)
-
+    data_drift_detected = drift_report["drift_detected"]
     if data_drift_detected:
         notify_telegram.submit("🚨 <b>Data Drift detected</b>")
     else:
         notify_telegram.submit("✅ <b>Data drift evaluated, and no issues found</b>")
 
     # Step 4: Prepare dataset for training
-    output_path = prepare_full_dataset_s3(reference_date=str(exec_date))
+    output_path = prepare_full_dataset_s3(
+        reference_date=str(exec_date), incremental=True
+    )
     print(f"📦 Full dataset prepared at: {output_path}")
     notify_telegram.submit(f"📦 Full dataset ready: {output_path}")
 
+    # Step 4.1: Refresh the online lag features read by the serving apps
+    export_online_features(dataset_path=output_path)
+
     # Step 5: Train models
     notify_telegram.submit("🚀 Starting model training and selection pipeline...")
-    rmse_rf = train_random_forest_model()
+    full_search = (
+        not warm_start
+        or data_drift_detected
+        or exec_date.weekday() == full_search_weekday
+    )
+    if not full_search:
+        notify_telegram.submit("♻️ Warm-starting yesterday's models.")
+    family_budget = split_cpu_budget(cpu_budget, n_families=2)
+    rf_future = train_random_forest_model.submit(
+        cpu_budget=family_budget, warm_start=not full_search
+    )
+    xgb_future = train_xgboost_model.submit(
+        cpu_budget=family_budget, strategy=xgb_strategy, warm_start=not full_search
+    )
+    rmse_rf = rf_future.result()
     notify_telegram.submit(f"🌲 Random Forest trained with RMSE: {rmse_rf:.4f}")
-    rmse_xgb = train_xgboost_model()
+    rmse_xgb = xgb_future.result()
     notify_telegram.submit(f"⚡ XGBoost trained with RMSE: {rmse_xgb:.4f}")
 
     # Step 6: Choose best model
@@ -101,12 +159,16 @@ def daily_pipeline(execution_date: Optional[str] = None):
         run = client.get_run(run_id)
         rmse = float(run.data.metrics.get("final_rmse", best_rmse))
 
+        # Slim artifact (encoder vocabulary + trees) for the Lambda handler
+        slim_uri = export_slim_model(run_id=run_id)
+
         # Save promotion metadata to S3
         promotion_record = {
             "model_name": best_model_name,
             "version": str(model_version),
             "run_id": run_id,
             "artifact_uri": artifact_uri,
+            "slim_uri": slim_uri,
             "rmse": rmse,
             "promoted_stage": "Staging",
             "promotion_time": datetime.utcnow().isoformat(),
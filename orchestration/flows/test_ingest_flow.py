@@ -16,14 +16,7 @@ def main():
         drift_report = monitor_data_drift_from_s3()
         print("📈 Drift monitoring complete.")
 
-        try:
-            label = drift_report["widgets"][0]["params"]["counters"][0]["label"]
-            data_drift_detected = "NOT" not in label.upper()
-
-        except Exception as e:
-            data_drift_detected = False
-            print("⚠️ Couldn't get dataset_drift:", e)
-
+        data_drift_detected = drift_report["drift_detected"]
         if data_drift_detected:
             notify_telegram.submit("🚨 <b>Data Drift detected</b>")
         else:
@@ -5,8 +5,8 @@ from prefect import flow
 
 @flow
 def train_pipeline(year: int, month: int, source: str = "local"):
-    X_train_dicts, y_train, X_val_dicts, y_val = load_data(year, month, source)
-    train_model(X_train_dicts, y_train, X_val_dicts, y_val)
+    X_train, y_train, X_val, y_val = load_data(year, month, source)
+    train_model(X_train, y_train, X_val, y_val)
 
 
 if __name__ == "__main__":
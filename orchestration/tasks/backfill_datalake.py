@@ -0,0 +1,176 @@
+from prefect import task
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+import os
+import pandas as pd
+from orchestration.tasks.compact_datalake import daily_key
+from orchestration.tasks.datalake_reader import DEFAULT_MAX_CONCURRENCY, resolve
+from orchestration.tasks.sniim_parser import OUTPUT_COLUMNS, parse_excel_to_df
+
+WORKBOOK_GLOB = "Leche*.xlsx"
+
+
+def workbook_date(path) -> datetime:
+    """
+    `Leche25072025.xlsx` -> 2025-07-25. Returns None for other filenames.
+    """
+    try:
+        return datetime.strptime(Path(path).stem[len("Leche") :], "%d%m%Y")
+    except ValueError:
+        return None
+
+
+def _parse_workbook(path: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """
+    Runs in a worker process: parses one workbook and keeps the rows in
+    [start, end].
+    """
+    try:
+        df = parse_excel_to_df(path)
+    except ValueError:
+        print(f"⚠️ No price blocks in {path}, skipping.")
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    fechas = pd.to_datetime(df["Fecha"])
+    return df[(fechas >= start) & (fechas <= end)]
+
+
+def _existing_keys(fs, root: str, start: datetime, end: datetime) -> set:
+    """
+    Lists the monthly prefixes of the range once instead of one HEAD per day.
+    """
+    keys = set()
+    month = datetime(start.year, start.month, 1)
+    while month <= end:
+        keys.update(fs.glob(f"{root}/{month.year}/{month.month:02d}/*-data.parquet"))
+        month = (month + timedelta(days=32)).replace(day=1)
+    return keys
+
+
+def _write_partition(fs, key: str, df: pd.DataFrame):
+    fs.makedirs(key.rsplit("/", 1)[0], exist_ok=True)
+    if "file" in fs.protocol:
+        # En disco local: escribir aparte y renombrar para no dejar
+        # particiones a medias si el proceso se interrumpe
+        tmp_key = f"{key}.tmp"
+        with fs.open(tmp_key, "wb") as f:
+            df.to_parquet(f, index=False)
+        fs.mv(tmp_key, key)
+    else:
+        # Un PUT a S3 es atómico
+        with fs.open(key, "wb") as f:
+            df.to_parquet(f, index=False)
+
+
+def dedupe_days(frames: list) -> pd.DataFrame:
+    """
+    Merges the parsed workbooks, newest first. A day that appears in
+    several workbooks is taken from the newest one only, since later
+    publications may carry corrected prices.
+    """
+    claimed = set()
+    kept = []
+    for df in frames:
+        if df.empty:
+            continue
+        fresh = df[~df["Fecha"].isin(claimed)]
+        claimed.update(fresh["Fecha"].unique())
+        kept.append(fresh)
+    if not kept:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    df = pd.concat(kept, ignore_index=True)
+    return df.drop_duplicates(subset=["Fecha", "Estado", "Ciudad", "Tipo", "Canal"])
+
+
+@task(name="backfill_datalake")
+def backfill_datalake(
+    start_date: str,
+    end_date: str,
+    excel_dir: str = "data/raw",
+    daily_root: str = "s3://mlops-milk-datalake/daily",
+    max_workers: int = None,
+    overwrite: bool = False,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> dict:
+    """
+    Rebuilds the daily partitions between `start_date` and `end_date` from
+    already-downloaded SNIIM workbooks (`LecheDDMMYYYY.xlsx`).
+
+    Workbooks are parsed in parallel across processes, overlapping days are
+    deduped (newest workbook wins) and all partitions are written in one
+    concurrent pass. Partitions that already exist are skipped unless
+    `overwrite=True`, so a crashed backfill can simply be run again.
+
+    Args:
+        start_date (str): first date to backfill, ISO format
+        end_date (str): last date to backfill, ISO format
+        excel_dir (str): directory with the downloaded workbooks
+        daily_root (str): root of the `daily/YYYY/MM/YYYY-MM-DD-data.parquet` tree
+        max_workers (int): parser processes, defaults to the number of CPUs
+        overwrite (bool): rewrite partitions that already exist
+        max_concurrency (int): concurrent partition writes
+
+    Returns:
+        dict: {"written": [...], "skipped": [...], "missing": [...]} as
+        "YYYY-MM-DD" strings
+    """
+    start = datetime.fromisoformat(start_date)
+    end = datetime.fromisoformat(end_date)
+
+    # Solo libros publicados a partir de `start` pueden traer días del rango
+    workbooks = [
+        p
+        for p in Path(excel_dir).glob(WORKBOOK_GLOB)
+        if workbook_date(p) and workbook_date(p) >= start
+    ]
+    if not workbooks:
+        raise FileNotFoundError(f"No SNIIM workbooks found in {excel_dir}")
+    workbooks.sort(key=workbook_date, reverse=True)
+
+    fs, root = resolve(daily_root, max_concurrency)
+    existing = set() if overwrite else _existing_keys(fs, root, start, end)
+
+    # --- Parseo en paralelo ---
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(workbooks)))
+    print(f"📚 Parsing {len(workbooks)} workbooks with {workers} processes")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        frames = list(
+            pool.map(
+                _parse_workbook,
+                [str(p) for p in workbooks],
+                [start] * len(workbooks),
+                [end] * len(workbooks),
+            )
+        )
+    df = dedupe_days(frames)
+
+    # --- Escritura en bloque ---
+    pending, skipped = [], []
+    for fecha, df_day in df.groupby("Fecha", sort=True):
+        fecha = pd.Timestamp(fecha)
+        key = daily_key(root, fecha)
+        if key in existing:
+            skipped.append(fecha.strftime("%Y-%m-%d"))
+        else:
+            pending.append((key, df_day, fecha.strftime("%Y-%m-%d")))
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+            list(pool.map(lambda p: _write_partition(fs, p[0], p[1]), pending))
+
+    written = [fecha for _, _, fecha in pending]
+    found = set(written) | set(skipped)
+    missing = [
+        d.strftime("%Y-%m-%d")
+        for d in pd.date_range(start, end, freq="D")
+        if d.strftime("%Y-%m-%d") not in found
+    ]
+
+    print(
+        f"✅ Backfill {start_date}..{end_date}: {len(written)} written, "
+        f"{len(skipped)} already present, {len(missing)} days without data"
+    )
+    return {"written": written, "skipped": skipped, "missing": missing}
+
+
+backfill_datalake_fn = backfill_datalake.fn
@@ -1,13 +1,18 @@
 # orchestration/tasks/check_file_availability.py
 
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import boto3
 import requests
+from requests.adapters import HTTPAdapter
 from prefect import task
+from orchestration.tasks.compact_datalake import _partition_date, window_keys
+from orchestration.tasks.datalake_reader import DEFAULT_MAX_CONCURRENCY, resolve
 
 BUCKET_NAME = "mlops-milk-datalake"
 S3_PREFIX = "daily"
 BASE_URL = "https://www.economia-sniim.gob.mx/SNIIM-Archivosfuente/Comentarios/Otros"
+HEAD_TIMEOUT_SECONDS = 10
 
 
 def build_filenames(execution_date: datetime):
@@ -52,3 +57,101 @@ def check_file_availability(execution_date: datetime = None) -> bool:
     """
     execution_date = execution_date or datetime.today()
     return _is_file_available_logic(execution_date)
+
+
+# --- Variante por lotes ---
+
+
+def _ingested_dates(daily_root: str, start: datetime, end: datetime) -> set:
+    """
+    Partition dates in [start, end] already in the datalake. Uses the
+    compaction index (plus the days it doesn't cover) when there is one;
+    otherwise lists only the monthly prefixes of the range.
+    """
+    fs, root = resolve(daily_root)
+    start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    keys = window_keys(fs, root, start, end)
+    if keys is None:
+        keys = []
+        month = start.replace(day=1)
+        while month <= end:
+            keys += fs.glob(f"{root}/{month.year}/{month.month:02d}/*-data.parquet")
+            month = (month + timedelta(days=32)).replace(day=1)
+    dates = set()
+    for key in keys:
+        fecha = _partition_date(key)
+        if fecha is not None and start <= fecha <= end:
+            dates.add(fecha.date())
+    return dates
+
+
+def _online_dates(
+    dates: list,
+    base_url: str = BASE_URL,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    timeout: float = HEAD_TIMEOUT_SECONDS,
+) -> set:
+    """
+    HEAD checks for the workbooks of `dates`, run concurrently over one
+    pooled session. A date whose check fails or times out counts as not
+    published.
+    """
+    if not dates:
+        return set()
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def _head(fecha):
+        excel_filename, _ = build_filenames(fecha)
+        try:
+            response = session.head(f"{base_url}/{excel_filename}", timeout=timeout)
+        except requests.RequestException as e:
+            print(f"⚠️ HEAD failed for {excel_filename}: {e}")
+            return False
+        return response.status_code == 200
+
+    workers = max(1, min(max_concurrency, len(dates)))
+    with session, ThreadPoolExecutor(max_workers=workers) as pool:
+        online = list(pool.map(_head, dates))
+    return {fecha.date() for fecha, ok in zip(dates, online) if ok}
+
+
+def _dates_needing_ingestion_logic(
+    start_date: datetime,
+    end_date: datetime,
+    daily_root: str = f"s3://{BUCKET_NAME}/{S3_PREFIX}",
+    base_url: str = BASE_URL,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    timeout: float = HEAD_TIMEOUT_SECONDS,
+) -> list:
+    """
+    Same rule as `_is_file_available_logic` for a whole date range: one
+    lookup of the ingested dates (see `_ingested_dates`) plus concurrent
+    HEADs only for the dates not yet ingested.
+    """
+    ingested = _ingested_dates(daily_root, start_date, end_date)
+    candidates = []
+    day = start_date
+    while day.date() <= end_date.date():
+        if day.date() not in ingested:
+            candidates.append(day)
+        day += timedelta(days=1)
+
+    online = _online_dates(candidates, base_url, max_concurrency, timeout)
+    return [d for d in candidates if d.date() in online]
+
+
+@task
+def check_files_availability(
+    start_date: datetime, end_date: datetime = None, **kwargs
+) -> list:
+    """
+    Batched version of `check_file_availability` to catch up after an
+    outage. Returns the dates in [start_date, end_date] that are published
+    and not yet in the datalake, oldest first.
+    """
+    end_date = end_date or datetime.today()
+    return _dates_needing_ingestion_logic(start_date, end_date, **kwargs)
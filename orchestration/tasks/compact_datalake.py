@@ -0,0 +1,292 @@
+from prefect import task
+from datetime import datetime, timedelta, timezone
+import json
+import pandas as pd
+from orchestration.tasks.datalake_reader import (
+    DEFAULT_MAX_CONCURRENCY,
+    read_partitions,
+    read_partitions_df,
+    resolve,
+)
+
+INDEX_FILENAME = "_index.json"
+SORT_COLS = ["Fecha", "Estado", "Ciudad", "Tipo", "Canal"]
+# ~1 semana de datos por row group: permite saltar row groups al filtrar por Fecha
+ROW_GROUP_SIZE = 2048
+
+
+def compacted_root_for(daily_root: str) -> str:
+    """
+    `s3://bucket/daily` -> `s3://bucket/compacted`
+    """
+    return daily_root.rstrip("/").rsplit("/", 1)[0] + "/compacted"
+
+
+def daily_key(root: str, date: datetime) -> str:
+    return (
+        f"{root}/{date.year}/{date.month:02d}/{date.strftime('%Y-%m-%d')}-data.parquet"
+    )
+
+
+def _partition_date(path: str):
+    try:
+        return datetime.strptime(path.split("/")[-1][:10], "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+# --- Índice de particiones ---
+
+
+def load_partition_index(fs, compacted_root: str):
+    """
+    Returns the list of index entries, or None if the datalake hasn't been
+    compacted yet.
+    """
+    index_path = f"{compacted_root}/{INDEX_FILENAME}"
+    if not fs.exists(index_path):
+        return None
+    with fs.open(index_path, "r") as f:
+        return json.load(f)["partitions"]
+
+
+def _save_partition_index(fs, compacted_root: str, entries: list):
+    entries = sorted(entries, key=lambda e: e["min_date"])
+    fs.makedirs(compacted_root, exist_ok=True)
+    with fs.open(f"{compacted_root}/{INDEX_FILENAME}", "w") as f:
+        json.dump(
+            {
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+                "partitions": entries,
+            },
+            f,
+            indent=2,
+        )
+
+
+def plan_reads(index: list, start: datetime, end: datetime = None):
+    """
+    Picks the compacted files that overlap [start, end] using only the index.
+
+    Returns:
+        tuple: (paths, covered_dates) where covered_dates are the daily
+        dates available in those files
+    """
+    paths, covered = [], []
+    for entry in index:
+        min_date = datetime.fromisoformat(entry["min_date"])
+        max_date = datetime.fromisoformat(entry["max_date"])
+        if max_date < start.replace(hour=0, minute=0, second=0, microsecond=0):
+            continue
+        if end is not None and min_date > end:
+            continue
+        paths.append(entry["path"])
+        covered.extend(datetime.fromisoformat(d) for d in entry["dates"])
+    return paths, covered
+
+
+def _tail_keys(fs, root: str, index: list, start: datetime, end: datetime = None):
+    """
+    Daily keys that arrived after the last compaction, probed one day at a
+    time instead of listing the prefix.
+    """
+    last_covered = max(
+        (datetime.fromisoformat(e["max_date"]) for e in index), default=start
+    )
+    day = max(last_covered + timedelta(days=1), start)
+    until = end or datetime.today()
+    keys = []
+    while day <= until:
+        key = daily_key(root, day)
+        if fs.exists(key):
+            keys.append(key)
+        day += timedelta(days=1)
+    return keys
+
+
+def _gap_keys(fs, root: str, index: list, start: datetime, end: datetime = None):
+    """
+    Daily keys of the months in the window that the index doesn't cover
+    (history from before the index existed, months missed by the daily
+    compaction), listed one monthly prefix at a time.
+    """
+    compacted = {(e["year"], e["month"]) for e in index}
+    last_covered = max(
+        (datetime.fromisoformat(e["max_date"]) for e in index), default=start
+    )
+    until = min(last_covered, end) if end is not None else last_covered
+    day_start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    keys = []
+    month = datetime(start.year, start.month, 1)
+    while month <= until:
+        if (month.year, month.month) not in compacted:
+            for path in fs.glob(
+                f"{root}/{month.year}/{month.month:02d}/*-data.parquet"
+            ):
+                date = _partition_date(path)
+                if date and day_start <= date <= until:
+                    keys.append(path)
+        month = (month + timedelta(days=32)).replace(day=1)
+    return sorted(keys)
+
+
+def _daily_keys(fs, root: str, index: list, start: datetime, end: datetime = None):
+    # Todo lo que el índice no cubre se lee de las particiones diarias
+    return _gap_keys(fs, root, index, start, end) + _tail_keys(
+        fs, root, index, start, end
+    )
+
+
+def window_keys(fs, root: str, start: datetime, end: datetime = None):
+    """
+    Daily keys with start <= date <= end, taken from the partition index
+    plus the months it doesn't cover and the days after the last compaction.
+
+    Returns:
+        list: daily keys, or None if the datalake hasn't been compacted yet
+    """
+    index = load_partition_index(fs, compacted_root_for(root))
+    if index is None:
+        return None
+
+    _, covered = plan_reads(index, start, end)
+    covered = [d for d in covered if d >= start and (end is None or d <= end)]
+    return [daily_key(root, d) for d in covered] + _daily_keys(
+        fs, root, index, start, end
+    )
+
+
+def read_window(
+    daily_root: str,
+    start: datetime,
+    end: datetime = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+):
+    """
+    Reads every row with start <= Fecha <= end from the compacted layout,
+    plus the daily partitions that arrived after the last compaction. The
+    plan comes from the partition index; only months of the window missing
+    from it are listed.
+
+    Returns:
+        tuple: (DataFrame, daily keys included) or None if there is no index
+    """
+    fs, root = resolve(daily_root, max_concurrency)
+    compacted_root = compacted_root_for(root)
+    index = load_partition_index(fs, compacted_root)
+    if index is None:
+        return None
+
+    paths, covered = plan_reads(index, start, end)
+    covered = [d for d in covered if d >= start and (end is None or d <= end)]
+    daily_keys = _daily_keys(fs, root, index, start, end)
+
+    filters = [("Fecha", ">=", pd.Timestamp(start))]
+    if end is not None:
+        filters.append(("Fecha", "<=", pd.Timestamp(end)))
+
+    frames = []
+    if paths:
+        frames.append(
+            read_partitions_df(
+                paths, fs=fs, max_concurrency=max_concurrency, filters=filters
+            )
+        )
+    if daily_keys:
+        frames.append(
+            read_partitions_df(daily_keys, fs=fs, max_concurrency=max_concurrency)
+        )
+    if not frames:
+        raise FileNotFoundError("No valid files found within date window.")
+
+    df = pd.concat(frames, ignore_index=True)
+    included = [daily_key(root, d) for d in covered] + daily_keys
+    return df, included
+
+
+# --- Compactación ---
+
+
+def _compact_month(fs, compacted_root, year, month, daily_paths, max_concurrency):
+    table = read_partitions(sorted(daily_paths), fs=fs, max_concurrency=max_concurrency)
+    df = table.to_pandas().sort_values(SORT_COLS, kind="stable")
+
+    out_path = f"{compacted_root}/year={year}/month={month:02d}/data.parquet"
+    fs.makedirs(out_path.rsplit("/", 1)[0], exist_ok=True)
+    with fs.open(out_path, "wb") as f:
+        df.to_parquet(f, index=False, row_group_size=ROW_GROUP_SIZE)
+
+    dates = sorted({_partition_date(p) for p in daily_paths})
+    return {
+        "path": out_path,
+        "year": year,
+        "month": month,
+        "min_date": dates[0].strftime("%Y-%m-%d"),
+        "max_date": dates[-1].strftime("%Y-%m-%d"),
+        "dates": [d.strftime("%Y-%m-%d") for d in dates],
+        "num_rows": len(df),
+        "min_precio": None if df["Precio"].isna().all() else df["Precio"].min(),
+        "max_precio": None if df["Precio"].isna().all() else df["Precio"].max(),
+    }
+
+
+@task(name="compact_datalake")
+def compact_datalake(
+    daily_root: str = "s3://mlops-milk-datalake/daily",
+    months: list = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> dict:
+    """
+    Merges the daily partitions into one Hive-partitioned file per month
+    (`compacted/year=YYYY/month=MM/data.parquet`) sorted by Fecha, and
+    updates the partition index. Only months whose set of daily files
+    changed are rewritten.
+
+    Args:
+        daily_root (str): root of the `daily/YYYY/MM/YYYY-MM-DD-data.parquet` tree
+        months (list): optional (year, month) tuples to restrict the job
+        max_concurrency (int): concurrent reads per month
+
+    Returns:
+        dict: {"compacted": [...], "skipped": [...]} as "YYYY-MM" strings
+    """
+    fs, root = resolve(daily_root, max_concurrency)
+    compacted_root = compacted_root_for(root)
+
+    if months:
+        daily_paths = []
+        for year, month in months:
+            daily_paths.extend(fs.glob(f"{root}/{year}/{month:02d}/*-data.parquet"))
+    else:
+        daily_paths = fs.glob(f"{root}/**/*-data.parquet")
+
+    by_month = {}
+    for path in daily_paths:
+        date = _partition_date(path)
+        if date:
+            by_month.setdefault((date.year, date.month), []).append(path)
+
+    index = {
+        (e["year"], e["month"]): e
+        for e in (load_partition_index(fs, compacted_root) or [])
+    }
+
+    result = {"compacted": [], "skipped": []}
+    for (year, month), paths in sorted(by_month.items()):
+        dates = sorted(_partition_date(p).strftime("%Y-%m-%d") for p in paths)
+        current = index.get((year, month))
+        if current and current["dates"] == dates:
+            result["skipped"].append(f"{year}-{month:02d}")
+            continue
+
+        index[(year, month)] = _compact_month(
+            fs, compacted_root, year, month, paths, max_concurrency
+        )
+        result["compacted"].append(f"{year}-{month:02d}")
+        print(f"🗜️ Compacted {len(paths)} daily files into {year}-{month:02d}")
+
+    _save_partition_index(fs, compacted_root, list(index.values()))
+    return result
+
+
+compact_datalake_fn = compact_datalake.fn
@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import fsspec
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("DATALAKE_MAX_CONCURRENCY", "16"))
+
+
+@lru_cache(maxsize=None)
+def get_filesystem(
+    protocol: str = "s3", max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+):
+    """
+    Returns one shared filesystem per protocol so every read reuses the same
+    session and connection pool instead of opening a new client per file.
+    """
+    if protocol == "s3":
+        return fsspec.filesystem(
+            "s3", config_kwargs={"max_pool_connections": max_concurrency}
+        )
+    return fsspec.filesystem(protocol)
+
+
+def resolve(url: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+    """
+    Splits `s3://bucket/key` or a local path into (filesystem, path).
+    """
+    protocol, _ = fsspec.core.split_protocol(url)
+    fs = get_filesystem(protocol or "file", max_concurrency)
+    return fs, fs._strip_protocol(url)
+
+
+def _normalize_dates(table: pa.Table) -> pa.Table:
+    """
+    Daily partitions written by the ingestion task store Fecha as date32,
+    while the simulated backfill stores it as timestamp. Cast dates to
+    timestamps so partitions from both sources can be concatenated.
+    """
+    for i, field in enumerate(table.schema):
+        if pa.types.is_date(field.type):
+            table = table.set_column(
+                i, field.name, table.column(i).cast(pa.timestamp("ns"))
+            )
+    return table
+
+
+def read_partitions(
+    paths: list,
+    fs=None,
+    columns: list = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    filters: list = None,
+) -> pa.Table:
+    """
+    Reads many parquet partitions concurrently and concatenates them into a
+    single Arrow table, keeping the order of `paths`.
+
+    Args:
+        paths (list): partition paths (`bucket/key` for S3, or local paths)
+        fs: fsspec filesystem; resolved from the first path when None
+        columns (list): optional subset of columns to read
+        max_concurrency (int): maximum number of partitions read at once
+        filters (list): optional pyarrow row filters, e.g. [("Fecha", ">=", ts)]
+
+    Returns:
+        pa.Table: all partitions concatenated
+    """
+    paths = list(paths)
+    if not paths:
+        raise FileNotFoundError("No partitions to read.")
+
+    if fs is None:
+        fs, _ = resolve(paths[0], max_concurrency)
+        paths = [resolve(p, max_concurrency)[1] for p in paths]
+
+    def _read(path):
+        return _normalize_dates(
+            pq.read_table(path, filesystem=fs, columns=columns, filters=filters)
+        )
+
+    workers = max(1, min(max_concurrency, len(paths)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        tables = list(pool.map(_read, paths))
+
+    return pa.concat_tables(tables, promote_options="permissive")
+
+
+def read_partitions_df(paths: list, fs=None, columns: list = None, **kwargs):
+    """
+    Same as `read_partitions`, returned as a pandas DataFrame.
+    """
+    return read_partitions(paths, fs=fs, columns=columns, **kwargs).to_pandas()
@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+# Columnas de texto repetitivas: se guardan como diccionario (categorías)
+CATEGORY_COLS = ["Estado", "Ciudad", "Tipo", "Canal", "dia_semana"]
+
+
+def feather_path(parquet_path) -> Path:
+    """
+    Arrow IPC copy written next to `full_dataset.parquet`.
+    """
+    return Path(parquet_path).with_suffix(".arrow")
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    arrays, names = [], []
+    for col in df.columns:
+        values = df[col]
+        if col in CATEGORY_COLS:
+            array = pa.array(values.astype("category"))
+        elif values.dtype.kind == "f":
+            # NaN se guarda como valor y no como nulo: así la columna se
+            # puede leer sin copiar (sin máscara de validez que rellenar)
+            array = pa.array(values.to_numpy(), from_pandas=False)
+        else:
+            array = pa.array(values)
+        arrays.append(array)
+        names.append(col)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def write_feather(df: pd.DataFrame, path) -> Path:
+    """
+    Writes `df` as an uncompressed Arrow IPC (Feather v2) file with the
+    categorical columns dictionary-encoded, so readers can memory-map it.
+
+    The file is written next to its destination and renamed over it:
+    readers that still have the previous file mapped keep a valid copy.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    feather.write_feather(_to_arrow(df), tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    return path
+
+
+def read_dataset(path, columns: list = None) -> pd.DataFrame:
+    """
+    Reads the dataset written by `prepare_full_dataset_s3`.
+
+    When the Arrow copy next to `path` is up to date, it is memory-mapped
+    and only `columns` are read: numeric columns are views over the mapped
+    file (shared through the page cache by every task of the worker) and
+    categorical columns come back as pandas categoricals. Otherwise falls
+    back to the parquet file, with the same dtypes.
+    """
+    path = Path(path)
+    arrow_path = feather_path(path)
+    if arrow_path.exists() and (
+        not path.exists() or arrow_path.stat().st_mtime >= path.stat().st_mtime
+    ):
+        with pa.memory_map(str(arrow_path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas(split_blocks=True)
+
+    df = pq.read_table(path, columns=columns).to_pandas()
+    for col in CATEGORY_COLS:
+        if col in df:
+            df[col] = df[col].astype(str).where(df[col].notna()).astype("category")
+    return df
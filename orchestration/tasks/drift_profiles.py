@@ -0,0 +1,269 @@
+import json
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+from scipy.spatial.distance import jensenshannon
+
+NUMERICAL = ["Precio"]
+CATEGORICAL = ["Estado", "Ciudad", "Tipo", "Canal"]
+# Histograma de ancho fijo por columna numérica (más dos cubetas de
+# desborde): sirve de sketch de cuantiles y de CDF para KS / Wasserstein
+BINS = 200
+# Reglas por defecto de DataDriftPreset de Evidently
+SMALL_SAMPLE = 1000
+P_VALUE = 0.05
+DISTANCE = 0.1
+DRIFT_SHARE = 0.5
+EPS = 1e-4
+
+
+def numeric_edges(values, bins: int = BINS) -> list:
+    """
+    Bin edges fixed when the cache is created: the observed range widened
+    by half on each side. Values outside fall in the overflow bins.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    pad = max(hi - lo, abs(hi), 1.0) * 0.5
+    return np.linspace(lo - pad, hi + pad, bins + 1).tolist()
+
+
+def empty_profile(edges: dict) -> dict:
+    return {
+        "rows": 0,
+        "hist": {col: [0] * (len(e) + 1) for col, e in edges.items()},
+        "moments": {col: [0.0, 0.0] for col in edges},
+        "freq": {col: {} for col in CATEGORICAL},
+    }
+
+
+def day_profile(df: pd.DataFrame, edges: dict) -> dict:
+    """
+    Profile of one day of data: a histogram and the sum / sum of squares of
+    each numerical column and the category counts of each categorical one.
+    """
+    profile = empty_profile(edges)
+    profile["rows"] = len(df)
+    for col, e in edges.items():
+        values = pd.to_numeric(df[col], errors="coerce").dropna().to_numpy(np.float64)
+        # Cubeta 0: < primer borde; cubeta -1: >= último borde
+        counts = np.bincount(
+            np.searchsorted(e, values, side="right"), minlength=len(e) + 1
+        )
+        profile["hist"][col] = counts.tolist()
+        profile["moments"][col] = [float(values.sum()), float((values**2).sum())]
+    for col in CATEGORICAL:
+        counts = df[col].dropna().astype(str).value_counts()
+        profile["freq"][col] = {key: int(n) for key, n in counts.items()}
+    return profile
+
+
+def merge(total: dict, profile: dict, sign: int = 1):
+    """
+    Adds (`sign=1`) or removes (`sign=-1`) a day profile from a window
+    profile, in place.
+    """
+    total["rows"] += sign * profile["rows"]
+    for col, counts in profile["hist"].items():
+        total["hist"][col] = [a + sign * b for a, b in zip(total["hist"][col], counts)]
+        total["moments"][col] = [
+            a + sign * b for a, b in zip(total["moments"][col], profile["moments"][col])
+        ]
+    for col, counts in profile["freq"].items():
+        freq = total["freq"][col]
+        for key, n in counts.items():
+            freq[key] = freq.get(key, 0) + sign * n
+            if not freq[key]:
+                del freq[key]
+
+
+class ProfileCache:
+    """
+    Daily profiles of the datalake plus the running profile of each
+    monitoring window ("reference", "current"). Sliding a window adds the
+    days that enter and subtracts the ones that leave, so each run only
+    profiles the days it hasn't seen.
+    """
+
+    def __init__(self, edges: dict = None):
+        self.edges = edges
+        self.days = {}
+        self.windows = {}
+
+    @classmethod
+    def load(cls, path) -> "ProfileCache":
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        with open(path) as f:
+            data = json.load(f)
+        cache = cls(data["edges"])
+        cache.days = data["days"]
+        cache.windows = data["windows"]
+        return cache
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        # `json.dumps` usa el codificador en C; `json.dump` escribe por trozos en Python
+        data = {"edges": self.edges, "days": self.days, "windows": self.windows}
+        with open(tmp, "w") as f:
+            f.write(json.dumps(data))
+        os.replace(tmp, path)
+        return path
+
+    def add_days(self, df: pd.DataFrame, days: list):
+        """
+        Profiles every day of `days` from the rows of `df`; days without
+        rows are stored as empty profiles so they aren't read again.
+        """
+        if self.edges is None:
+            self.edges = {col: numeric_edges(df[col]) for col in NUMERICAL}
+        fecha = pd.to_datetime(df["Fecha"]).dt.strftime("%Y-%m-%d")
+        groups = dict(tuple(df.groupby(fecha.to_numpy())))
+        for day in days:
+            rows = groups.get(day)
+            self.days[day] = (
+                day_profile(rows, self.edges)
+                if rows is not None
+                else empty_profile(self.edges)
+            )
+
+    def slide(self, name: str, days: list) -> dict:
+        """
+        Moves window `name` to `days` (all of them already profiled).
+
+        Returns:
+            dict: window profile
+        """
+        window = self.windows.get(name)
+        if window is None:
+            window = self.windows[name] = {
+                "days": [],
+                "profile": empty_profile(self.edges),
+            }
+        old, new = set(window["days"]), set(days)
+        for day in old - new:
+            merge(window["profile"], self.days[day], -1)
+        for day in sorted(new - old):
+            merge(window["profile"], self.days[day], 1)
+        window["days"] = sorted(new)
+        return window["profile"]
+
+    def forget_before(self, day: str):
+        self.days = {d: p for d, p in self.days.items() if d >= day}
+
+
+def _quantiles(counts: np.ndarray, edges: np.ndarray, qs) -> list:
+    # Interpolación lineal dentro de la cubeta; desbordes pegados a los bordes
+    cdf = np.cumsum(counts) / counts.sum()
+    bounds = np.r_[edges[0], edges, edges[-1]]
+    out = []
+    for q in qs:
+        i = int(np.searchsorted(cdf, q))
+        before = cdf[i - 1] if i else 0.0
+        frac = (q - before) / (cdf[i] - before) if cdf[i] > before else 0.0
+        out.append(float(bounds[i] + frac * (bounds[i + 1] - bounds[i])))
+    return out
+
+
+def _psi(ref: np.ndarray, cur: np.ndarray) -> float:
+    ref = np.maximum(ref / ref.sum(), EPS)
+    cur = np.maximum(cur / cur.sum(), EPS)
+    return float(np.sum((cur - ref) * np.log(cur / ref)))
+
+
+def _deciles(counts: np.ndarray) -> np.ndarray:
+    # Agrupa las cubetas finas en ~10 grupos de igual masa de la referencia
+    # (el PSI se calcula sobre deciles, no sobre 200 cubetas)
+    cdf = np.cumsum(counts) / counts.sum()
+    cuts = np.unique(np.searchsorted(cdf, np.arange(1, 10) / 10))
+    return np.searchsorted(cuts, np.arange(len(counts)))
+
+
+def numeric_drift(ref: dict, cur: dict, col: str, edges: list) -> dict:
+    r = np.asarray(ref["hist"][col], dtype=np.float64)
+    c = np.asarray(cur["hist"][col], dtype=np.float64)
+    n, m = r.sum(), c.sum()
+    e = np.asarray(edges)
+
+    groups = _deciles(r)
+    psi = _psi(np.bincount(groups, r), np.bincount(groups, c))
+
+    # CDFs en los bordes: KS y Wasserstein-1 aproximados por el histograma
+    diff = np.abs(np.cumsum(r)[:-1] / n - np.cumsum(c)[:-1] / m)
+    ks = float(diff.max())
+    ks_p = float(special.kolmogorov(ks * np.sqrt(n * m / (n + m))))
+    widths = np.r_[np.diff(e), 0.0]
+    mean = ref["moments"][col][0] / n
+    std = np.sqrt(max(ref["moments"][col][1] / n - mean**2, 0.0))
+    wasserstein = float(np.sum(diff * widths) / std) if std else 0.0
+
+    if n <= SMALL_SAMPLE:
+        method, drift = "ks", ks_p < P_VALUE
+    else:
+        method, drift = "wasserstein", wasserstein > DISTANCE
+    return {
+        "type": "num",
+        "method": method,
+        "drift": bool(drift),
+        "psi": psi,
+        "ks": ks,
+        "ks_p_value": ks_p,
+        "wasserstein_normed": wasserstein,
+        "reference_quantiles": _quantiles(r, e, [0.05, 0.5, 0.95]),
+        "current_quantiles": _quantiles(c, e, [0.05, 0.5, 0.95]),
+    }
+
+
+def categorical_drift(ref: dict, cur: dict, col: str) -> dict:
+    keys = sorted(set(ref["freq"][col]) | set(cur["freq"][col]))
+    r = np.array([ref["freq"][col].get(k, 0) for k in keys], dtype=np.float64)
+    c = np.array([cur["freq"][col].get(k, 0) for k in keys], dtype=np.float64)
+
+    # Chi-cuadrada de bondad de ajuste contra las frecuencias de referencia
+    expected = np.maximum(r / r.sum(), EPS)
+    expected = expected / expected.sum() * c.sum()
+    # Con una sola categoría no hay nada que contrastar
+    chi2_p = float(stats.chisquare(c, expected).pvalue) if len(keys) > 1 else 1.0
+    jensen_shannon = float(jensenshannon(r / r.sum(), c / c.sum()))
+
+    if r.sum() <= SMALL_SAMPLE:
+        method, drift = "chisquare", chi2_p < P_VALUE
+    else:
+        method, drift = "jensenshannon", jensen_shannon > DISTANCE
+    return {
+        "type": "cat",
+        "method": method,
+        "drift": bool(drift),
+        "psi": _psi(r, c),
+        "chi2_p_value": chi2_p,
+        "jensen_shannon": jensen_shannon,
+        "new_categories": [k for k, n in zip(keys, r) if not n],
+    }
+
+
+def compare(reference: dict, current: dict, edges: dict) -> dict:
+    """
+    Per-column drift of `current` against `reference` with the default
+    rules of Evidently's DataDriftPreset: KS / chi-square p-value < 0.05 up
+    to 1000 reference rows, normed Wasserstein / Jensen-Shannon > 0.1
+    above. PSI is reported for every column.
+    """
+    columns = {col: numeric_drift(reference, current, col, edges[col]) for col in edges}
+    columns.update(
+        {col: categorical_drift(reference, current, col) for col in CATEGORICAL}
+    )
+    drifted = [col for col, result in columns.items() if result["drift"]]
+    share = len(drifted) / len(columns)
+    return {
+        "drift_detected": share >= DRIFT_SHARE,
+        "drift_share": share,
+        "drifted_columns": drifted,
+        "reference_rows": reference["rows"],
+        "current_rows": current["rows"],
+        "columns": columns,
+    }
@@ -0,0 +1,75 @@
+from prefect import task
+from pathlib import Path
+import pandas as pd
+from orchestration.tasks.dataset_store import read_dataset
+from orchestration.tasks.prediction_features import DIM_COLS, WINDOW
+
+BUCKET = "mlops-milk-datalake"
+FEATURES_PREFIX = "features/online"
+COLUMNS = DIM_COLS + ["Fecha", "Precio_last", "Precio_sum7", "Precio_count7"]
+
+
+def build_online_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Online feature table: one row per (Estado, Ciudad, Tipo, Canal) series
+    with its last observed date and price, and the sum and count of its
+    last 7 observed prices. Serving derives the next-day `Precio_lag1`
+    (last price) and `Precio_mean7` (sum / count) from a single row, the
+    same values as `build_prediction_features`.
+
+    Args:
+        df (pd.DataFrame): full dataset with Fecha, Precio and the dimension columns
+
+    Returns:
+        pd.DataFrame: columns `COLUMNS`, Fecha as `YYYY-MM-DD`
+    """
+    df = df[DIM_COLS + ["Fecha", "Precio"]].dropna(subset=DIM_COLS)
+    df = df.astype({col: str for col in DIM_COLS})
+    df["Fecha"] = pd.to_datetime(df["Fecha"])
+    # Orden estable: mismo desempate que build_prediction_features
+    df = df.sort_values(DIM_COLS + ["Fecha"], kind="stable")
+
+    tail = df.groupby(DIM_COLS, sort=False).tail(WINDOW)
+    table = tail.groupby(DIM_COLS, sort=False).agg(
+        Fecha=("Fecha", "max"),
+        Precio_sum7=("Precio", "sum"),
+        Precio_count7=("Precio", "count"),
+    )
+    # No se usa agg("last"): salta nulos y el lag1 es el último precio, aunque sea nulo
+    table["Precio_last"] = (
+        tail.groupby(DIM_COLS, sort=False)["Precio"].nth(-1).to_numpy()
+    )
+    table["Fecha"] = table["Fecha"].dt.strftime("%Y-%m-%d")
+    return table.reset_index()[COLUMNS]
+
+
+@task(name="export_online_features")
+def export_online_features(
+    dataset_path: str = "data/processed/full_dataset.parquet",
+    output_dir: str = "reports",
+    bucket: str = BUCKET,
+    prefix: str = FEATURES_PREFIX,
+) -> str:
+    """
+    Rebuilds the online feature table from the dataset written by
+    `prepare_full_dataset_s3` and uploads it to
+    `s3://{bucket}/{prefix}/<date>/online_features_<date>.csv`, where the
+    serving apps pick up the newest one (see `feature_store.py`).
+
+    Returns:
+        str: S3 key of the uploaded table
+    """
+    import boto3
+
+    df = read_dataset(dataset_path, columns=DIM_COLS + ["Fecha", "Precio"])
+    table = build_online_features(df)
+    as_of = table["Fecha"].max()
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    local_path = Path(output_dir) / f"online_features_{as_of}.csv"
+    table.to_csv(local_path, index=False)
+
+    key = f"{prefix}/{as_of}/online_features_{as_of}.csv"
+    boto3.client("s3").upload_file(Filename=str(local_path), Bucket=bucket, Key=key)
+    print(f"📤 Online features for {len(table)} series: s3://{bucket}/{key}")
+    return key
@@ -0,0 +1,196 @@
+from prefect import task
+import json
+import tempfile
+from pathlib import Path
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from xgboost import XGBRegressor
+from orchestration.tasks.model_specs import NativeXGBRegressor
+
+BUCKET = "mlflow-models-milk-price-dev"
+SLIM_PREFIX = "promoted/slim"
+MANIFEST = "manifest.json"
+TREES = "trees.npz"
+
+
+def _forest_trees(forest: RandomForestRegressor) -> list:
+    trees = []
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        missing_left = getattr(tree, "missing_go_to_left", None)
+        trees.append(
+            {
+                "left": tree.children_left,
+                "right": tree.children_right,
+                "feature": np.maximum(tree.feature, 0),
+                "threshold": tree.threshold,
+                "value": tree.value[:, 0, 0],
+                "default_left": (
+                    np.zeros(tree.node_count, dtype=bool)
+                    if missing_left is None
+                    else missing_left.astype(bool)
+                ),
+                "categories": {},
+            }
+        )
+    return trees
+
+
+def _booster_trees(booster) -> tuple:
+    """
+    Node arrays of every tree of a `reg:squarederror` gbtree booster, read
+    from its JSON dump, plus its base score.
+    """
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    objective = learner["objective"]["name"]
+    if (
+        objective != "reg:squarederror"
+        or learner["gradient_booster"]["name"] != "gbtree"
+    ):
+        raise ValueError(f"Can't export a {objective} booster")
+
+    trees = []
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        # Nodos categóricos: las categorías listadas van a la derecha
+        categories = {}
+        for node, start, size in zip(
+            tree["categories_nodes"],
+            tree["categories_segments"],
+            tree["categories_sizes"],
+        ):
+            categories[node] = tree["categories"][start : start + size]
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        trees.append(
+            {
+                "left": np.asarray(tree["left_children"]),
+                "right": np.asarray(tree["right_children"]),
+                "feature": np.asarray(tree["split_indices"]),
+                # En las hojas split_conditions guarda el valor de la hoja
+                "threshold": conditions,
+                "value": conditions,
+                "default_left": np.asarray(tree["default_left"], dtype=bool),
+                "categories": categories,
+            }
+        )
+    base_score = learner["learner_model_param"]["base_score"].strip("[]")
+    return trees, float(base_score)
+
+
+def _node_table(trees: list) -> dict:
+    """
+    Concatenates the trees into a single node table. Children get global
+    indices and leaves point to themselves, so prediction walks every tree
+    at once until no row moves.
+    """
+    left, right, roots, cat_nodes, cat_values = [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        ids = np.arange(len(tree["left"])) + offset
+        leaf = tree["left"] < 0
+        left.append(np.where(leaf, ids, tree["left"] + offset))
+        right.append(np.where(leaf, ids, tree["right"] + offset))
+        roots.append(offset)
+        for node, values in tree["categories"].items():
+            cat_nodes.append(node + offset)
+            cat_values.append(values)
+        offset += len(ids)
+
+    # Una fila de `cat_sets` por nodo categórico: True si la categoría va a la derecha
+    cat_row = np.full(offset, -1, dtype=np.int32)
+    cat_row[cat_nodes] = np.arange(len(cat_nodes))
+    width = max((max(values, default=0) + 1 for values in cat_values), default=0)
+    cat_sets = np.zeros((len(cat_nodes), width), dtype=bool)
+    for i, values in enumerate(cat_values):
+        cat_sets[i, values] = True
+
+    return {
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "feature": np.concatenate([t["feature"] for t in trees]).astype(np.int32),
+        "threshold": np.concatenate([t["threshold"] for t in trees]),
+        "value": np.concatenate([t["value"] for t in trees]),
+        "default_left": np.concatenate([t["default_left"] for t in trees]),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "cat_row": cat_row,
+        "cat_sets": cat_sets,
+    }
+
+
+def write_slim_model(pipeline, out_dir, run_id: str = None) -> Path:
+    """
+    Exports a fitted encoder + regressor pipeline as a self-contained
+    inference artifact that only needs numpy to be evaluated:
+
+    - `manifest.json`: encoder vocabulary and how to combine the trees
+    - `trees.npz`: every tree of the model as a flat node table
+
+    Supports `RandomForestRegressor`, `XGBRegressor` and
+    `NativeXGBRegressor`. Serving loads it with `slim_model.SlimModel`,
+    without MLflow, sklearn or xgboost. `run_id` is recorded in the
+    manifest so serving can tell which model produced a precomputed file.
+    """
+    encoder = pipeline.named_steps["vectorizer"]
+    model = pipeline.named_steps["regressor"]
+
+    if isinstance(model, RandomForestRegressor):
+        trees, base_score = _forest_trees(model), 0.0
+        # sklearn: izquierda si x <= umbral; promedio de los árboles
+        split, aggregate = "le", "mean"
+    elif isinstance(model, (XGBRegressor, NativeXGBRegressor)):
+        booster = (
+            model.booster_
+            if isinstance(model, NativeXGBRegressor)
+            else model.get_booster()
+        )
+        trees, base_score = _booster_trees(booster)
+        # XGBoost: izquierda si x < umbral; suma de los árboles + base_score
+        split, aggregate = "lt", "sum"
+    else:
+        raise TypeError(f"Can't export a {type(model).__name__}")
+
+    manifest = {
+        "encoding": encoder.encoding,
+        "categorical": list(encoder.categorical),
+        "numerical": list(encoder.numerical),
+        "categories": {
+            col: [str(value) for value in values]
+            for col, values in encoder.categories_.items()
+        },
+        "split": split,
+        "aggregate": aggregate,
+        "base_score": base_score,
+        # XGBoost entrenado con la matriz one-hot dispersa: los ceros no
+        # almacenados son valores faltantes, no 0
+        "zero_as_missing": aggregate == "sum" and encoder.encoding == "onehot",
+        "run_id": run_id,
+    }
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    np.savez(out_dir / TREES, **_node_table(trees))
+    (out_dir / MANIFEST).write_text(json.dumps(manifest))
+    return out_dir
+
+
+@task
+def export_slim_model(
+    run_id: str, bucket: str = BUCKET, prefix: str = SLIM_PREFIX
+) -> str:
+    """
+    Exports the pipeline logged by run `run_id` with `write_slim_model` and
+    uploads it to `s3://{bucket}/{prefix}/{run_id}/`.
+
+    Returns:
+        str: S3 URI of the uploaded artifact directory
+    """
+    import boto3
+    import mlflow.sklearn
+
+    pipeline = mlflow.sklearn.load_model(f"runs:/{run_id}/model")
+    s3 = boto3.client("s3")
+    key_prefix = f"{prefix}/{run_id}"
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = write_slim_model(pipeline, tmp, run_id=run_id)
+        for name in (MANIFEST, TREES):
+            s3.upload_file(str(out_dir / name), bucket, f"{key_prefix}/{name}")
+    return f"s3://{bucket}/{key_prefix}/"
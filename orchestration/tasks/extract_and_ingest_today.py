@@ -4,31 +4,25 @@ from pathlib import Path
 import pandas as pd
 import requests
 import boto3
-import re
+from orchestration.tasks.sniim_parser import parse_excel_for_date, parse_excel_to_df
 
 # --- Configuración general ---
 S3_BUCKET = "mlops-milk-datalake"
 BASE_URL = "https://www.economia-sniim.gob.mx/SNIIM-Archivosfuente/Comentarios/Otros"
 
-# Diccionario de meses en español
-meses_es_a_en = {
-    "enero": "January",
-    "febrero": "February",
-    "marzo": "March",
-    "abril": "April",
-    "mayo": "May",
-    "junio": "June",
-    "julio": "July",
-    "agosto": "August",
-    "septiembre": "September",
-    "octubre": "October",
-    "noviembre": "November",
-    "diciembre": "December",
-}
-
 
 @task(name="extract_and_ingest_today", retries=2, retry_delay_seconds=30)
-def extract_and_ingest_today(execution_date: datetime = None) -> str:
+def extract_and_ingest_today(
+    execution_date: datetime = None, streaming: bool = True
+) -> str:
+    """
+    Downloads the SNIIM workbook for `execution_date`, keeps only that day's
+    block and uploads it as a daily parquet partition.
+
+    With `streaming=True` the workbook is read row by row (calamine if
+    installed, otherwise openpyxl read-only) and parsing stops as soon as
+    the block for `execution_date` ends, instead of loading the full sheet.
+    """
     execution_date = (
         execution_date.date() if execution_date else datetime.today().date()
     )
@@ -51,8 +45,11 @@ def extract_and_ingest_today(execution_date: datetime = None) -> str:
         f.write(response.content)
 
     # --- Parseo ---
-    df_all = parse_excel_to_df(excel_path)
-    df_today = df_all[df_all["Fecha"] == execution_date].copy()
+    if streaming:
+        df_today = parse_excel_for_date(excel_path, execution_date)
+    else:
+        df_all = parse_excel_to_df(excel_path)
+        df_today = df_all[df_all["Fecha"] == execution_date].copy()
     if df_today.empty:
         raise ValueError("❌ No rows found for the given execution date.")
 
@@ -66,85 +63,3 @@ def extract_and_ingest_today(execution_date: datetime = None) -> str:
         s3.upload_fileobj(f, S3_BUCKET, s3_key)
 
     return f"s3://{S3_BUCKET}/{s3_key}"
-
-
-def parse_excel_to_df(path):
-    df = pd.read_excel(path, header=None)
-    data_final = []
-
-    for i, row in df.iterrows():
-        if (
-            row.astype(str)
-            .str.contains(
-                "Precio promedio al consumidor por litro", case=False, na=False
-            )
-            .any()
-        ):
-            row_fecha = df.iloc[i + 1]
-            fecha_raw = next(
-                (
-                    str(cell)
-                    for cell in row_fecha
-                    if isinstance(cell, str) and "de" in cell
-                ),
-                None,
-            )
-            if not fecha_raw:
-                continue
-
-            match = re.search(
-                r"(\d{1,2}) de (\w+) de (\d{4})", fecha_raw, re.IGNORECASE
-            )
-            if not match:
-                continue
-            dia, mes, año = match.groups()
-            mes_en = meses_es_a_en.get(mes.lower())
-            if not mes_en:
-                continue
-            fecha = pd.to_datetime(f"{dia} {mes_en} {año}", dayfirst=True).date()
-
-            enc2 = df.iloc[i + 3, 2:6].values
-            columnas = ["Estado", "Ciudad"]
-            for j in range(4):
-                tipo = "Pasteurizada" if j < 2 else "Ultrapasteurizada"
-                canal = enc2[j]
-                columnas.append(f"{tipo}_{canal}")
-
-            df_bloque = df.iloc[i + 4 :, 0:6].copy()
-            df_bloque.columns = columnas
-            df_bloque[["Estado", "Ciudad"]] = df_bloque[["Estado", "Ciudad"]].ffill()
-
-            stop_idx = None
-            for k, row_k in df_bloque.iterrows():
-                celda = str(row_k[0]).strip().lower()
-                if (
-                    "promedio" in celda
-                    or "fuente" in celda
-                    or "sniim" in celda
-                    or celda == "estado"
-                    or celda == "nan"
-                ):
-                    stop_idx = k
-                    break
-            if stop_idx:
-                df_bloque = df_bloque.loc[: stop_idx - 1]
-
-            df_bloque["Fecha"] = fecha
-            df_long = df_bloque.melt(
-                id_vars=["Fecha", "Estado", "Ciudad"],
-                var_name="Tipo_Canal",
-                value_name="Precio",
-            )
-
-            df_long["Tipo"] = df_long["Tipo_Canal"].str.split("_").str[0]
-            df_long["Canal"] = df_long["Tipo_Canal"].str.split("_").str[1]
-            df_long = df_long[["Fecha", "Estado", "Ciudad", "Tipo", "Canal", "Precio"]]
-            df_long["Precio"] = pd.to_numeric(df_long["Precio"], errors="coerce")
-
-            data_final.append(df_long)
-
-    df_final = pd.concat(data_final, ignore_index=True)
-    df_final = df_final[
-        ~df_final["Ciudad"].str.lower().str.contains("promedio", na=False)
-    ]
-    return df_final
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
+
+CATEGORICAL = ["Estado", "Ciudad", "Tipo", "Canal", "dia_semana"]
+NUMERICAL = ["Precio_lag1", "Precio_mean7", "mes", "dia", "año"]
+
+
+def _as_frame(X) -> pd.DataFrame:
+    """
+    Accepts a DataFrame, a single dict or a list of dicts (serving payloads).
+    """
+    if isinstance(X, pd.DataFrame):
+        return X
+    if isinstance(X, dict):
+        return pd.DataFrame([X])
+    return pd.DataFrame(list(X))
+
+
+class CategoricalEncoder(TransformerMixin, BaseEstimator):
+    """
+    Columnar replacement for `DictVectorizer`: learns the categories of each
+    categorical column from a DataFrame and encodes them without building a
+    dict per row.
+
+    - `encoding="onehot"`: sparse CSR matrix, one column per category
+      followed by the numerical columns (same information as DictVectorizer)
+    - `encoding="ordinal"`: dense matrix with one integer code per
+      categorical column (NaN for unseen values) followed by the numericals
+    - `encoding="category"`: DataFrame with the categorical columns as
+      pandas categoricals over the learned categories (NaN for unseen
+      values), for models that split on categories natively (XGBoost
+      `enable_categorical`)
+
+    As with DictVectorizer, unseen categories and missing columns encode
+    as zeros, so partial dict payloads keep working at serving time.
+    """
+
+    def __init__(
+        self,
+        categorical: list = CATEGORICAL,
+        numerical: list = NUMERICAL,
+        encoding: str = "onehot",
+    ):
+        self.categorical = categorical
+        self.numerical = numerical
+        self.encoding = encoding
+
+    def fit(self, X, y=None):
+        if self.encoding not in ("onehot", "ordinal", "category"):
+            raise ValueError(f"Unknown encoding: {self.encoding}")
+        df = _as_frame(X)
+        self.categories_ = {}
+        for col in self.categorical:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Solo las categorías presentes, sin convertir fila por fila
+                values = values.cat.remove_unused_categories().cat.categories
+            self.categories_[col] = np.sort(
+                pd.Series(values).dropna().astype(str).unique()
+            )
+        return self
+
+    def _codes(self, df: pd.DataFrame, col: str) -> np.ndarray:
+        if col not in df:
+            return np.full(len(df), -1, dtype=np.int32)
+        values = df[col]
+        index = pd.Index(self.categories_[col])
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Se traducen las categorías de la columna y luego sus códigos
+            mapping = index.get_indexer(values.cat.categories.astype(str))
+            codes = values.cat.codes.to_numpy()
+            return np.where(codes >= 0, mapping[codes], -1).astype(np.int32)
+        values = values.astype(str).where(values.notna())
+        # -1 para nulos y categorías no vistas
+        return index.get_indexer(values).astype(np.int32)
+
+    def _numerical(self, df: pd.DataFrame) -> np.ndarray:
+        out = np.zeros((len(df), len(self.numerical)), dtype=np.float64)
+        for j, col in enumerate(self.numerical):
+            if col in df:
+                out[:, j] = pd.to_numeric(df[col], errors="coerce")
+        return out
+
+    def transform(self, X):
+        df = _as_frame(X)
+        n = len(df)
+        numerical = self._numerical(df)
+
+        if self.encoding == "category":
+            # Categorías fijas: mismos códigos en entrenamiento y serving
+            columns = {
+                col: pd.Categorical.from_codes(
+                    self._codes(df, col), categories=self.categories_[col]
+                )
+                for col in self.categorical
+            }
+            columns.update(zip(self.numerical, numerical.T))
+            return pd.DataFrame(columns)
+
+        if self.encoding == "ordinal":
+            codes = np.column_stack(
+                [self._codes(df, col) for col in self.categorical]
+            ).astype(np.float64)
+            codes[codes < 0] = np.nan
+            return np.hstack([codes, numerical])
+
+        rows, cols = [], []
+        offset = 0
+        for col in self.categorical:
+            codes = self._codes(df, col)
+            known = codes >= 0
+            rows.append(np.flatnonzero(known))
+            cols.append(codes[known] + offset)
+            offset += len(self.categories_[col])
+        rows = np.concatenate(rows)
+        onehot = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, np.concatenate(cols))), shape=(n, offset)
+        )
+        return sparse.hstack(
+            [onehot, sparse.csr_matrix(numerical)], format="csr", dtype=np.float64
+        )
+
+    def get_feature_names_out(self, input_features=None):
+        if self.encoding != "onehot":
+            names = list(self.categorical)
+        else:
+            names = [
+                f"{col}={value}"
+                for col in self.categorical
+                for value in self.categories_[col]
+            ]
+        return np.array(names + list(self.numerical), dtype=object)
+
+
+def log_pipeline(pipeline, artifact_path: str = "model"):
+    """
+    Logs a sklearn pipeline that contains a `CategoricalEncoder`. The encoder
+    class (and any other step defined in this repository) is pickled by
+    value, so serving environments can load the model with MLflow (or
+    cloudpickle) without having this repository installed.
+    """
+    import sys
+    import cloudpickle
+    import mlflow.sklearn
+
+    # Registro temporal: fuera de esta llamada los módulos se vuelven a
+    # serializar por referencia
+    registered = []
+    for _, step in pipeline.steps:
+        module = sys.modules[type(step).__module__]
+        if (
+            module.__name__.startswith("orchestration.")
+            and module.__name__ not in cloudpickle.list_registry_pickle_by_value()
+        ):
+            cloudpickle.register_pickle_by_value(module)
+            registered.append(module)
+    try:
+        return mlflow.sklearn.log_model(
+            pipeline, artifact_path=artifact_path, serialization_format="cloudpickle"
+        )
+    finally:
+        for module in registered:
+            cloudpickle.unregister_pickle_by_value(module)
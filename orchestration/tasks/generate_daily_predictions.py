@@ -1,61 +1,47 @@
-import pandas as pd
 from datetime import datetime, timedelta
 import mlflow.pyfunc
 import json
 from prefect import task
 import boto3
 from pathlib import Path
+from orchestration.tasks.dataset_store import read_dataset
+from orchestration.tasks.prediction_features import (
+    DIM_COLS,
+    build_prediction_features,
+)
+from orchestration.tasks.series_state import SeriesState, series_state_path
+
+DATASET_PATH = "data/processed/full_dataset.parquet"
+
+
+def _prediction_features(target_date: datetime):
+    """
+    Next-day features from the per-series state saved with the dataset
+    (O(series)); falls back to scanning the dataset when there's no state
+    or it already holds `target_date`.
+    """
+    state_path = series_state_path(DATASET_PATH)
+    if state_path.exists():
+        series = SeriesState.load(state_path)
+        try:
+            return series.prediction_features(
+                target_date, since=series.meta.get("since")
+            )
+        except ValueError as e:
+            print(f"⚠️ {e}, reading the full dataset.")
+    df = read_dataset(DATASET_PATH, columns=DIM_COLS + ["Fecha", "Precio"])
+    return build_prediction_features(df, target_date)
 
 
 @task(name="generate_daily_predictions")
 def generate_daily_predictions() -> str:
-    # --- Leer el dataset completo con histórico ---
-    df = pd.read_parquet("data/processed/full_dataset.parquet")
-
     # --- Definir la fecha objetivo ---
     tomorrow = datetime.today() + timedelta(days=1)
     fecha_pred = tomorrow.date()
 
-    # --- Asegurarse que la columna Fecha esté en datetime ---
-    df["Fecha"] = pd.to_datetime(df["Fecha"])
-
-    # --- Obtener combinaciones únicas de dimensiones ---
-    dim_cols = ["Estado", "Ciudad", "Tipo", "Canal"]
-    combinations = df[dim_cols].drop_duplicates()
-
-    # --- Calcular Precio_lag1 y Precio_mean7 ---
-    records = []
-    for _, row in combinations.iterrows():
-        mask = (
-            (df["Estado"] == row["Estado"])
-            & (df["Ciudad"] == row["Ciudad"])
-            & (df["Tipo"] == row["Tipo"])
-            & (df["Canal"] == row["Canal"])
-        )
-        df_sub = df[mask].sort_values("Fecha")
-        df_sub = df_sub[df_sub["Fecha"] < pd.Timestamp(fecha_pred)]
-
-        if len(df_sub) == 0:
-            continue
-
-        precio_lag1 = df_sub.iloc[-1]["Precio"]
-        precio_mean7 = df_sub.tail(7)["Precio"].mean()
-
-        record = {
-            "Estado": row["Estado"],
-            "Ciudad": row["Ciudad"],
-            "Tipo": row["Tipo"],
-            "Canal": row["Canal"],
-            "día": tomorrow.day,
-            "mes": tomorrow.month,
-            "año": tomorrow.year,
-            "dia_semana": str(tomorrow.weekday()),
-            "Precio_lag1": precio_lag1,
-            "Precio_mean7": precio_mean7,
-        }
-        records.append(record)
-
-    df_pred = pd.DataFrame(records)
+    # --- Calcular Precio_lag1 y Precio_mean7 para todas las series ---
+    # Desde los buffers por serie; sin estado, desde el dataset completo
+    df_pred = _prediction_features(tomorrow)
 
     # --- Leer metadata del modelo directamente desde S3 ---
     s3 = boto3.client("s3")
@@ -69,7 +55,10 @@ def generate_daily_predictions() -> str:
     model = mlflow.pyfunc.load_model(model_s3_path)
 
     # --- Generar predicciones ---
-    df_pred["Precio_sugerido"] = model.predict(df_pred.to_dict(orient="records"))
+    # El pipeline acepta el DataFrame directamente, sin pasar por dicts
+    df_pred["Precio_sugerido"] = model.predict(df_pred)
+    # Los servicios solo usan el archivo con el modelo que lo generó
+    df_pred["run_id"] = meta["run_id"]
 
     # --- Guardar reporte CSV localmente ---
     output_dir = "reports"
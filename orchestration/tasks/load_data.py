@@ -4,6 +4,17 @@ import pandas as pd
 import os
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
+from orchestration.tasks.datalake_reader import read_partitions_df
+
+
+def _partition_uri(year: int, month: int, source: str) -> str:
+    filename = f"{year}-{month:02d}-data.parquet"
+    file_path = f"monthly/{year}/{month:02d}/{filename}"
+
+    if source == "s3":
+        bucket = os.getenv("S3_BUCKET", "mlops-milk-datalake")
+        return f"s3://{bucket}/{file_path}"
+    return str(Path("data/datalake") / file_path)
 
 
 def read_parquet_partition(
@@ -16,18 +27,22 @@ def read_parquet_partition(
     - Local: data/datalake/monthly/YYYY/MM/YYYY-MM-data.parquet
     - S3:    s3://bucket/monthly/YYYY/MM/YYYY-MM-data.parquet
     """
-    filename = f"{year}-{month:02d}-data.parquet"
-    file_path = f"monthly/{year}/{month:02d}/{filename}"
+    return read_parquet_partitions([(year, month)], source)
 
-    if source == "s3":
-        bucket = os.getenv("S3_BUCKET", "mlops-milk-datalake")
-        s3_uri = f"s3://{bucket}/{file_path}"
-        print(f"📡 Loading from S3: {s3_uri}")
-        return pd.read_parquet(s3_uri)
-    else:
-        local_path = Path("data/datalake") / file_path
-        print(f"📁 Loading from local: {local_path}")
-        return pd.read_parquet(local_path)
+
+def read_parquet_partitions(months: list, source: str = "local") -> pd.DataFrame:
+    """
+    Reads several monthly .parquet files concurrently, in the given order.
+
+    Args:
+        months (list): (year, month) tuples
+        source (str): "local" or "s3"
+    """
+    uris = [_partition_uri(year, month, source) for year, month in months]
+    icon = "📡" if source == "s3" else "📁"
+    for uri in uris:
+        print(f"{icon} Loading from {source}: {uri}")
+    return read_partitions_df(uris)
 
 
 @task
@@ -44,11 +59,10 @@ def load_data(year: int, month: int, source: str = "local"):
         source (str): "local" or "s3"
 
     Returns:
-        tuple: (X_train_dicts, y_train, X_val_dicts, y_val)
+        tuple: (X_train, y_train, X_val, y_val) with X as DataFrames of the
+        categorical columns
     """
     categorical = ["Estado", "Ciudad", "Tipo", "Canal"]
-    X_train_dicts = []
-    y_train = []
 
     # Training: months 13 to 2 before the reference month
     train_months = [
@@ -56,14 +70,12 @@ def load_data(year: int, month: int, source: str = "local"):
         for i in range(13, 1, -1)
     ]
 
-    for date in train_months:
-        df = read_parquet_partition(date.year, date.month, source)
-        df = df.dropna(subset=["Precio"])
-        df[categorical] = df[categorical].astype(str)
+    df = read_parquet_partitions([(d.year, d.month) for d in train_months], source)
+    df = df.dropna(subset=["Precio"])
+    df[categorical] = df[categorical].astype(str)
 
-        feature_dicts = df[categorical].to_dict(orient="records")
-        X_train_dicts.extend(feature_dicts)
-        y_train.extend(df["Precio"].values)
+    X_train = df[categorical].reset_index(drop=True)
+    y_train = df["Precio"].to_numpy()
 
     # Validation: previous month
     val_date = datetime(year, month, 1) - relativedelta(months=1)
@@ -71,7 +83,7 @@ def load_data(year: int, month: int, source: str = "local"):
     df_val = df_val.dropna(subset=["Precio"])
     df_val[categorical] = df_val[categorical].astype(str)
 
-    X_val_dicts = df_val[categorical].to_dict(orient="records")
+    X_val = df_val[categorical].reset_index(drop=True)
     y_val = df_val["Precio"].values
 
-    return X_train_dicts, y_train, X_val_dicts, y_val
+    return X_train, y_train, X_val, y_val
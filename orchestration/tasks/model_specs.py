@@ -0,0 +1,195 @@
+# Search spaces and model factories of each model family. Kept free of
+# MLflow/Prefect so tuning workers and benchmarks can import them.
+
+import numpy as np
+import xgboost as xgb
+from hyperopt import hp
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import root_mean_squared_error
+from xgboost import XGBRegressor
+
+# --- Random Forest ---
+
+search_space_rf = {
+    "n_estimators": hp.quniform("n_estimators", 50, 300, 10),
+    "max_depth": hp.quniform("max_depth", 5, 20, 1),
+    "min_samples_split": hp.quniform("min_samples_split", 2, 10, 1),
+    "min_samples_leaf": hp.quniform("min_samples_leaf", 1, 5, 1),
+}
+
+
+def build_random_forest(params: dict, n_jobs: int = -1) -> RandomForestRegressor:
+    return RandomForestRegressor(
+        n_estimators=int(params["n_estimators"]),
+        max_depth=int(params["max_depth"]),
+        min_samples_split=int(params["min_samples_split"]),
+        min_samples_leaf=int(params["min_samples_leaf"]),
+        random_state=42,
+        n_jobs=n_jobs,
+    )
+
+
+# --- XGBoost ---
+
+search_space_xgb = {
+    "max_depth": hp.quniform("max_depth", 3, 10, 1),
+    "learning_rate": hp.loguniform("learning_rate", -4, 0),
+    "n_estimators": hp.quniform("n_estimators", 50, 300, 10),
+    "min_child_weight": hp.quniform("min_child_weight", 1, 10, 1),
+    "gamma": hp.uniform("gamma", 0, 1),
+    "subsample": hp.uniform("subsample", 0.5, 1.0),
+    "colsample_bytree": hp.uniform("colsample_bytree", 0.5, 1.0),
+}
+
+# Estrategia "halving": rondas de boosting por peldaño y parada temprana
+MIN_ROUNDS = 25
+MAX_ROUNDS = 300
+HALVING_ETA = 3
+EARLY_STOPPING_ROUNDS = 20
+
+
+def build_xgboost(params: dict, n_jobs: int = -1, native: bool = False):
+    if native:
+        return NativeXGBRegressor(params, int(params["n_estimators"]), n_jobs)
+    return XGBRegressor(
+        max_depth=int(params["max_depth"]),
+        learning_rate=params["learning_rate"],
+        n_estimators=int(params["n_estimators"]),
+        min_child_weight=params["min_child_weight"],
+        gamma=params["gamma"],
+        subsample=params["subsample"],
+        colsample_bytree=params["colsample_bytree"],
+        random_state=42,
+        n_jobs=n_jobs,
+    )
+
+
+def _native_xgboost_params(params: dict, n_jobs: int) -> dict:
+    native = {
+        "objective": "reg:squarederror",
+        "tree_method": "hist",
+        "max_depth": int(params["max_depth"]),
+        "learning_rate": params["learning_rate"],
+        "min_child_weight": params["min_child_weight"],
+        "gamma": params["gamma"],
+        "subsample": params["subsample"],
+        "colsample_bytree": params["colsample_bytree"],
+        "seed": 42,
+    }
+    if n_jobs > 0:
+        native["nthread"] = n_jobs
+    return native
+
+
+class NativeXGBRegressor(RegressorMixin, BaseEstimator):
+    """
+    XGBoost trained with `xgb.train` on a QuantileDMatrix built once from
+    the input, with `tree_method="hist"` and pandas categorical columns
+    split natively (`enable_categorical`) instead of one-hot encoded.
+
+    Meant to follow `CategoricalEncoder(encoding="category")` in a
+    pipeline, so the logged model still accepts dict payloads.
+    """
+
+    def __init__(self, params: dict = None, n_estimators: int = 100, n_jobs=-1):
+        self.params = params
+        self.n_estimators = n_estimators
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y, xgb_model=None):
+        dtrain = xgb.QuantileDMatrix(X, label=y, enable_categorical=True)
+        self.booster_ = xgb.train(
+            _native_xgboost_params(self.params, self.n_jobs),
+            dtrain,
+            num_boost_round=self.n_estimators,
+            xgb_model=xgb_model,
+        )
+        return self
+
+    def predict(self, X):
+        return self.booster_.inplace_predict(X)
+
+
+def _fold_dmatrices(i: int, fold: tuple, dmatrices: dict = None):
+    """
+    Training QuantileDMatrix and validation DMatrix of fold `i`. With a
+    `dmatrices` dict they are built once and reused by every configuration
+    scored with that dict, so the "hist" index is built once per search.
+    """
+    cached = dmatrices.get(i) if dmatrices is not None else None
+    # Se compara el fold mismo: un dict reutilizado con otros folds no
+    # devuelve matrices viejas
+    if cached is None or cached[0] is not fold:
+        X_train, y_train, X_test, y_test = fold
+        cached = (
+            fold,
+            xgb.QuantileDMatrix(X_train, label=y_train, enable_categorical=True),
+            xgb.DMatrix(X_test, label=y_test, enable_categorical=True),
+        )
+        if dmatrices is not None:
+            dmatrices[i] = cached
+    _, dtrain, dtest = cached
+    return dtrain, dtest
+
+
+def early_stopping_rmse(
+    params: dict,
+    n_rounds: int,
+    folds: list,
+    state: dict = None,
+    n_jobs: int = 1,
+    dmatrices: dict = None,
+):
+    """
+    CV RMSE of XGBoost with at most `n_rounds` boosting rounds, stopping
+    each fold early once its validation RMSE stops improving.
+
+    Boosters are kept in `state`, so calling again with a larger `n_rounds`
+    continues training (`xgb_model=`) the folds that didn't stop early.
+
+    Folds may hold sparse one-hot matrices or `encoding="category"`
+    frames. Uses `xgb.train` with plain DMatrix eval sets: the sklearn wrapper
+    builds the eval set as a QuantileDMatrix, which makes per-round
+    evaluation on sparse input several times slower than training.
+
+    Pass the same `dmatrices` dict to every call of one search (e.g.
+    `partial(early_stopping_rmse, dmatrices={})`) to build each fold's
+    matrices once; they are freed with the dict when the search ends.
+
+    Returns:
+        tuple: (rmse, {"n_rounds": mean best number of rounds,
+        "converged": every fold stopped early})
+    """
+    state = {} if state is None else state
+    native = _native_xgboost_params(params, n_jobs)
+    scores, rounds, stopped = [], [], []
+    for i, fold in enumerate(folds):
+        dtrain, dtest = _fold_dmatrices(i, fold, dmatrices)
+        booster, requested = state.get(i, (None, 0))
+        # Solo se sigue entrenando si el peldaño anterior no paró antes
+        if booster is None or (
+            booster.num_boosted_rounds() >= requested and n_rounds > requested
+        ):
+            booster = xgb.train(
+                native,
+                dtrain,
+                num_boost_round=n_rounds - requested,
+                evals=[(dtest, "validation")],
+                early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                verbose_eval=False,
+                xgb_model=booster,
+            )
+            requested = n_rounds
+        state[i] = (booster, requested)
+
+        best_rounds = booster.best_iteration + 1
+        y_pred = booster.predict(dtest, iteration_range=(0, best_rounds))
+        scores.append(root_mean_squared_error(fold[3], y_pred))
+        rounds.append(best_rounds)
+        stopped.append(booster.num_boosted_rounds() < requested)
+
+    return float(np.mean(scores)), {
+        "n_rounds": int(round(np.mean(rounds))),
+        "converged": all(stopped),
+    }
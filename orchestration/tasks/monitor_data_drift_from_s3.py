@@ -1,45 +1,37 @@
 from pathlib import Path
 from datetime import datetime, timedelta
 from prefect import task
-from evidently import Report
-from evidently.presets import DataDriftPreset
 import pandas as pd
-import s3fs
+from orchestration.tasks.datalake_reader import (
+    DEFAULT_MAX_CONCURRENCY,
+    get_filesystem,
+    read_partitions_df,
+)
+from orchestration.tasks.compact_datalake import read_window
+from orchestration.tasks.drift_profiles import ProfileCache, compare
 
+PROFILE_CACHE = "monitor/profiles/data_drift_profiles.json"
 
-@task(name="monitor_data_drift_from_s3")
-def monitor_data_drift_from_s3(
-    bucket: str = "mlops-milk-datalake",
-    prefix: str = "daily/",
-    current_days: int = 30,
-    reference_days: int = 180,
-    execution_date: datetime = None,
-) -> str:
-    # --- Set up S3 FS ---
-    fs = s3fs.S3FileSystem()
 
-    # --- List all relevant parquet files ---
-    all_files = fs.glob(f"{bucket}/{prefix}**/*.parquet")
+def extract_date_from_key(key: str) -> datetime:
+    filename = key.split("/")[-1]
+    date_str = filename.split("-data.parquet")[0]
+    return datetime.strptime(date_str, "%Y-%m-%d")
 
-    # --- Convert S3 keys to datetime ---
-    def extract_date_from_key(key: str) -> datetime:
-        parts = key.split("/")
-        filename = parts[-1]
-        date_str = filename.split("-data.parquet")[0]
-        return datetime.strptime(date_str, "%Y-%m-%d")
 
-    dated_files = [
+def _dated_files(fs, bucket, prefix):
+    # --- List all relevant parquet files and convert S3 keys to datetime ---
+    return [
         (key, extract_date_from_key(key))
-        for key in all_files
+        for key in fs.glob(f"{bucket}/{prefix}**/*.parquet")
         if key.endswith(".parquet")
     ]
 
-    # --- Determine date anchors ---
-    base_date = execution_date or datetime.today()
-    base_date = base_date.replace(hour=0, minute=0, second=0, microsecond=0)
 
-    current_cutoff = base_date - timedelta(days=current_days)
-    reference_cutoff = current_cutoff - timedelta(days=reference_days)
+def _load_windows_from_listing(
+    fs, bucket, prefix, current_cutoff, reference_cutoff, max_concurrency
+):
+    dated_files = _dated_files(fs, bucket, prefix)
 
     # --- Sort and split into current and reference windows ---
     dated_files.sort(key=lambda x: x[1], reverse=True)
@@ -55,19 +47,77 @@ def monitor_data_drift_from_s3(
     print(f"📁 Current files: {len(current_files)}")
     print(f"📁 Reference files: {len(reference_files)}")
 
-    # --- Load data ---
-    df_cur = pd.concat(
-        [
-            pd.read_parquet(f"s3://{f}", storage_options={"anon": False})
-            for f in current_files
-        ]
+    # --- Load data (concurrent reads over one connection pool) ---
+    df_cur = read_partitions_df(current_files, fs=fs, max_concurrency=max_concurrency)
+    df_ref = read_partitions_df(reference_files, fs=fs, max_concurrency=max_concurrency)
+    return df_cur, df_ref
+
+
+def _load_windows_from_index(
+    bucket, prefix, current_cutoff, reference_cutoff, max_concurrency
+):
+    window = read_window(
+        f"s3://{bucket}/{prefix.rstrip('/')}",
+        reference_cutoff,
+        max_concurrency=max_concurrency,
     )
-    df_ref = pd.concat(
-        [
-            pd.read_parquet(f"s3://{f}", storage_options={"anon": False})
-            for f in reference_files
-        ]
+    if window is None:
+        return None
+
+    df, _ = window
+    fecha = pd.to_datetime(df["Fecha"])
+    df_cur = df[fecha >= current_cutoff]
+    df_ref = df[fecha < current_cutoff]
+
+    if df_cur.empty or df_ref.empty:
+        raise ValueError("❌ Not enough files to compute drift report.")
+
+    print(f"📁 Current days: {df_cur['Fecha'].nunique()}")
+    print(f"📁 Reference days: {df_ref['Fecha'].nunique()}")
+    return df_cur.copy(), df_ref.copy()
+
+
+def _load_days(fs, bucket, prefix, start, end, max_concurrency) -> pd.DataFrame:
+    """
+    Rows with start <= Fecha <= end: from the partition index if the
+    datalake is compacted, else from the daily keys in that range.
+    """
+    window = read_window(
+        f"s3://{bucket}/{prefix.rstrip('/')}",
+        start,
+        end,
+        max_concurrency=max_concurrency,
+    )
+    if window is not None:
+        return window[0]
+    files = [f for f, d in _dated_files(fs, bucket, prefix) if start <= d <= end]
+    if not files:
+        return pd.DataFrame(columns=["Fecha", "Precio"])
+    return read_partitions_df(files, fs=fs, max_concurrency=max_concurrency)
+
+
+def _date_range(start: datetime, end: datetime) -> list:
+    return [d.strftime("%Y-%m-%d") for d in pd.date_range(start, end, freq="D")]
+
+
+def _render_report(
+    fs, bucket, prefix, current_cutoff, reference_cutoff, base_date, max_concurrency
+) -> str:
+    """
+    Full Evidently DataDriftPreset report over the raw windows, as HTML.
+    """
+    from evidently import Report
+    from evidently.presets import DataDriftPreset
+
+    # --- Load windows: partition index if compacted, else list daily keys ---
+    windows = _load_windows_from_index(
+        bucket, prefix, current_cutoff, reference_cutoff, max_concurrency
     )
+    if windows is None:
+        windows = _load_windows_from_listing(
+            fs, bucket, prefix, current_cutoff, reference_cutoff, max_concurrency
+        )
+    df_cur, df_ref = windows
 
     df_cur["Fecha"] = pd.to_datetime(df_cur["Fecha"])
     df_ref["Fecha"] = pd.to_datetime(df_ref["Fecha"])
@@ -87,5 +137,87 @@ def monitor_data_drift_from_s3(
     output.save_html(str(output_path))
 
     print(f"📊 Drift report saved: {output_path}")
+    return str(output_path)
+
+
+@task(name="monitor_data_drift_from_s3")
+def monitor_data_drift_from_s3(
+    bucket: str = "mlops-milk-datalake",
+    prefix: str = "daily/",
+    current_days: int = 30,
+    reference_days: int = 180,
+    execution_date: datetime = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    cache_path: str = PROFILE_CACHE,
+    render_report: bool = False,
+) -> dict:
+    """
+    Data drift of the last `current_days` against the `reference_days`
+    before them, computed on cached profiles (see `drift_profiles.py`):
+    only the days not profiled yet are read from S3, and both windows are
+    slid by adding / subtracting daily profiles.
+
+    The Evidently HTML report over the raw windows is only rendered when
+    drift is detected or `render_report` is set.
+
+    Returns:
+        dict: `drift_detected`, `drift_share`, `drifted_columns`, per-column
+        statistics and `report_path` (None if no report was rendered)
+    """
+    # --- Set up S3 FS (shared, pooled) ---
+    fs = get_filesystem("s3", max_concurrency)
+
+    # --- Determine date anchors ---
+    base_date = execution_date or datetime.today()
+    base_date = base_date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    current_cutoff = base_date - timedelta(days=current_days)
+    reference_cutoff = current_cutoff - timedelta(days=reference_days)
+    reference = _date_range(reference_cutoff, current_cutoff - timedelta(days=1))
+    current = _date_range(current_cutoff, base_date)
+
+    # --- Profile only the days the cache hasn't seen ---
+    cache = ProfileCache.load(cache_path)
+    missing = [d for d in reference + current if d not in cache.days]
+    if missing:
+        df = _load_days(
+            fs,
+            bucket,
+            prefix,
+            datetime.fromisoformat(missing[0]),
+            datetime.fromisoformat(missing[-1]),
+            max_concurrency,
+        )
+        if cache.edges is None and df.empty:
+            raise ValueError("❌ Not enough files to compute drift report.")
+        present = set(pd.to_datetime(df["Fecha"]).dt.strftime("%Y-%m-%d"))
+        # El día de la ejecución sin datos se vuelve a buscar en la siguiente corrida
+        cache.add_days(df, [d for d in missing if d in present or d != current[-1]])
+        print(f"🧮 Profiled {len(missing)} new day(s), {len(df)} rows read.")
+
+    ref_profile = cache.slide("reference", [d for d in reference if d in cache.days])
+    cur_profile = cache.slide("current", [d for d in current if d in cache.days])
+    if not ref_profile["rows"] or not cur_profile["rows"]:
+        raise ValueError("❌ Not enough files to compute drift report.")
+
+    result = compare(ref_profile, cur_profile, cache.edges)
+    # Los días que ya salieron de la referencia no se vuelven a usar
+    cache.forget_before(reference[0])
+    cache.save(cache_path)
+    print(
+        f"📈 Drifted columns: {result['drifted_columns'] or 'none'} "
+        f"(share {result['drift_share']:.2f})"
+    )
 
-    return output.dump_dict()
+    result["report_path"] = None
+    if render_report or result["drift_detected"]:
+        result["report_path"] = _render_report(
+            fs,
+            bucket,
+            prefix,
+            current_cutoff,
+            reference_cutoff,
+            base_date,
+            max_concurrency,
+        )
+    return result
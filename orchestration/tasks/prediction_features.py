@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+DIM_COLS = ["Estado", "Ciudad", "Tipo", "Canal"]
+WINDOW = 7
+
+
+def _date_features(target_date: datetime) -> dict:
+    return {
+        "día": target_date.day,
+        "mes": target_date.month,
+        "año": target_date.year,
+        "dia_semana": str(target_date.weekday()),
+    }
+
+
+def build_prediction_features(df: pd.DataFrame, target_date: datetime) -> pd.DataFrame:
+    """
+    Builds the next-day feature table for every series in a single pass.
+
+    For each (Estado, Ciudad, Tipo, Canal) series with history before
+    `target_date`, computes:
+    - Precio_lag1: last observed price
+    - Precio_mean7: mean of the last 7 observed prices
+
+    Series are returned in order of first appearance in `df`, matching
+    `build_prediction_features_loop`.
+
+    Args:
+        df (pd.DataFrame): full dataset with Fecha, Precio and the dimension columns
+        target_date (datetime): date being predicted
+
+    Returns:
+        pd.DataFrame: one row per series, ready for `model.predict`
+    """
+    fecha = pd.to_datetime(df["Fecha"])
+    cutoff = pd.Timestamp(target_date.date())
+
+    # --- Id de serie en orden de aparición (igual que drop_duplicates) ---
+    series_id = (
+        df.groupby(DIM_COLS, sort=False, dropna=True).ngroup().fillna(-1).to_numpy()
+    ).astype("int64")
+    mask = (fecha < cutoff).to_numpy() & (series_id >= 0)
+
+    sid = series_id[mask]
+    hist_fecha = fecha.to_numpy()[mask]
+    precio = df["Precio"].to_numpy(dtype="float64")[mask]
+
+    if len(sid) == 0:
+        return pd.DataFrame(
+            columns=DIM_COLS
+            + ["día", "mes", "año", "dia_semana", "Precio_lag1", "Precio_mean7"]
+        )
+
+    # --- Ordenar por serie y fecha (estable) ---
+    order = np.lexsort((hist_fecha, sid))
+    sid = sid[order]
+    precio = precio[order]
+
+    # --- Limites de cada grupo ---
+    starts = np.flatnonzero(np.r_[True, sid[1:] != sid[:-1]])
+    ends = np.r_[starts[1:], len(sid)]
+    sizes = ends - starts
+
+    # --- Ventana de los últimos 7 precios por serie ---
+    # Los huecos se rellenan con 0 al final para que la suma conserve el
+    # mismo orden de acumulación que `tail(7).mean()`.
+    n_series = len(starts)
+    take = np.minimum(sizes, WINDOW)
+    rows = np.repeat(np.arange(n_series), take)
+    cols = np.arange(take.sum()) - np.repeat(np.cumsum(take) - take, take)
+    src = np.repeat(ends - take, take) + cols
+
+    window = np.zeros((n_series, WINDOW), dtype="float64")
+    valid = np.zeros((n_series, WINDOW), dtype=bool)
+    values = precio[src]
+    window[rows, cols] = np.where(np.isnan(values), 0.0, values)
+    valid[rows, cols] = ~np.isnan(values)
+
+    counts = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean7 = window.sum(axis=1) / counts
+
+    lag1 = precio[ends - 1]
+
+    # --- Dimensiones de cada serie ---
+    first_pos = np.flatnonzero(mask)[order[starts]]
+    df_pred = df[DIM_COLS].iloc[first_pos].reset_index(drop=True)
+    for col, value in _date_features(target_date).items():
+        df_pred[col] = value
+    df_pred["Precio_lag1"] = lag1
+    df_pred["Precio_mean7"] = mean7
+
+    return df_pred
+
+
+def build_prediction_features_loop(
+    df: pd.DataFrame, target_date: datetime
+) -> pd.DataFrame:
+    """
+    Reference implementation: one boolean mask per series over the full frame.
+
+    Kept for equivalence tests and benchmarks of `build_prediction_features`.
+    """
+    df = df.copy()
+    df["Fecha"] = pd.to_datetime(df["Fecha"])
+    fecha_pred = target_date.date()
+    combinations = df[DIM_COLS].drop_duplicates()
+
+    records = []
+    for _, row in combinations.iterrows():
+        mask = (
+            (df["Estado"] == row["Estado"])
+            & (df["Ciudad"] == row["Ciudad"])
+            & (df["Tipo"] == row["Tipo"])
+            & (df["Canal"] == row["Canal"])
+        )
+        df_sub = df[mask].sort_values("Fecha")
+        df_sub = df_sub[df_sub["Fecha"] < pd.Timestamp(fecha_pred)]
+
+        if len(df_sub) == 0:
+            continue
+
+        precio_lag1 = df_sub.iloc[-1]["Precio"]
+        precio_mean7 = df_sub.tail(7)["Precio"].mean()
+
+        record = {
+            "Estado": row["Estado"],
+            "Ciudad": row["Ciudad"],
+            "Tipo": row["Tipo"],
+            "Canal": row["Canal"],
+            **_date_features(target_date),
+            "Precio_lag1": precio_lag1,
+            "Precio_mean7": precio_mean7,
+        }
+        records.append(record)
+
+    return pd.DataFrame(records)
@@ -1,8 +1,208 @@
 from prefect import task
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 from pathlib import Path
-import fsspec
+import json
+from orchestration.tasks.datalake_reader import (
+    DEFAULT_MAX_CONCURRENCY,
+    read_partitions_df,
+    resolve,
+)
+from orchestration.tasks.compact_datalake import read_window, window_keys
+from orchestration.tasks.dataset_store import feather_path, write_feather
+from orchestration.tasks.series_state import SeriesState, series_state_path
+
+GROUP_COLS = ["Estado", "Ciudad", "Tipo", "Canal"]
+FEATURE_WINDOW = 7
+FEATURE_COLS = ["Precio_lag1", "Precio_mean7"]
+
+
+def _partition_date(path: str):
+    """
+    Extracts the date from a `YYYY-MM-DD-data.parquet` key. Returns None if
+    the filename doesn't follow the convention.
+    """
+    filename = path.split("/")[-1]
+    try:
+        return datetime.strptime(filename.split("-data.parquet")[0], "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _load_partitions(paths: list, fs, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    df = read_partitions_df(sorted(paths), fs=fs, max_concurrency=max_concurrency)
+    return _clean(df)
+
+
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.dropna(subset=["Fecha", "Precio"])
+    df["Fecha"] = pd.to_datetime(df["Fecha"])
+    return df
+
+
+def _add_date_features(df: pd.DataFrame) -> pd.DataFrame:
+    df["año"] = df["Fecha"].dt.year
+    df["mes"] = df["Fecha"].dt.month
+    df["dia"] = df["Fecha"].dt.day
+    df["dia_semana"] = df["Fecha"].dt.day_name()
+    return df
+
+
+def _add_lag_features(df: pd.DataFrame) -> pd.DataFrame:
+    df["Precio_lag1"] = df.groupby(GROUP_COLS)["Precio"].shift(1)
+    df["Precio_mean7"] = (
+        df.groupby(GROUP_COLS)["Precio"]
+        .rolling(window=FEATURE_WINDOW, min_periods=1)
+        .mean()
+        .reset_index(level=GROUP_COLS, drop=True)
+    )
+    return df
+
+
+def _list_window_partitions(fs, root: str, since: datetime, until: datetime):
+    """
+    Lists only the monthly prefixes between `since` and `until` instead of
+    globbing the whole `daily/` tree. The caller compares the keys against
+    the manifest, so partitions that land late in an earlier month of the
+    window are detected too.
+    """
+    paths = []
+    month = datetime(since.year, since.month, 1)
+    while month <= until:
+        paths.extend(fs.glob(f"{root}/{month.year}/{month.month:02d}/*-data.parquet"))
+        month = (month + timedelta(days=32)).replace(day=1)
+    return paths
+
+
+def _read_state(state_path: Path):
+    if not state_path.exists():
+        return None
+    with open(state_path) as f:
+        return json.load(f)
+
+
+def _write_state(state_path: Path, s3_root: str, lookback_days: int, partitions):
+    dates = [_partition_date(p) for p in partitions]
+    state = {
+        "s3_root": s3_root,
+        "lookback_days": lookback_days,
+        "last_date": max(dates).strftime("%Y-%m-%d"),
+        "partitions": sorted(partitions),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def _build_full(fs, root, s3_root, start_date, reference_date, max_concurrency):
+    # 1-3. Fast path: plan the reads from the compacted partition index
+    window = read_window(s3_root, start_date, reference_date, max_concurrency)
+    if window is not None:
+        df, valid_files = window
+        df = _clean(df)
+    else:
+        # 1. List all existing Parquet files
+        all_paths = fs.glob(f"{root}/**/*-data.parquet")
+
+        # 2. Filter valid files within window
+        valid_files = []
+        for path in all_paths:
+            file_date = _partition_date(path)
+            if file_date and start_date <= file_date <= reference_date:
+                valid_files.append(path)
+
+        if not valid_files:
+            raise FileNotFoundError("No valid files found within date window.")
+
+        # 3. Load data
+        df = _load_partitions(valid_files, fs, max_concurrency)
+
+    # 4. Preprocessing
+    df = df.sort_values(GROUP_COLS + ["Fecha"])
+    df = _add_date_features(df)
+    df = _add_lag_features(df)
+    return df, valid_files
+
+
+def _build_incremental(
+    fs, root, start_date, reference_date, output_path, state, series, max_concurrency
+):
+    """
+    Appends only the partitions newer than the watermark to the existing
+    dataset. Any unknown partition dated on or before the watermark (a late
+    arrival) forces a full rebuild. Lag/rolling features of the new rows
+    come from the per-series state (`series_state.py`), which is updated in
+    place. When the lookback window slides, the first rows of each series
+    are recomputed.
+
+    Returns None when the state can't be reused and a full rebuild is needed.
+    """
+    last_date = datetime.strptime(state["last_date"], "%Y-%m-%d")
+    if reference_date < last_date:
+        return None
+
+    known = set(state["partitions"])
+    new_files = []
+    # Plan from the compaction index; list the monthly prefixes only without it
+    window = window_keys(fs, root, start_date, reference_date)
+    if window is None:
+        window = _list_window_partitions(fs, root, start_date, reference_date)
+    for path in window:
+        file_date = _partition_date(path)
+        if not file_date or path in known:
+            continue
+        if not start_date <= file_date <= reference_date:
+            continue
+        if file_date <= last_date:
+            # Partición atrasada: ya no se puede anexar al final
+            print(f"⚠️ Late partition {path}, falling back to full rebuild.")
+            return None
+        new_files.append(path)
+
+    df_old = pd.read_parquet(output_path)
+
+    frames = [df_old]
+    if new_files:
+        df_new = _load_partitions(new_files, fs, max_concurrency)
+        df_new = _add_date_features(df_new.reset_index(drop=True))
+        # Lag y media de 7 desde los buffers de cada serie, sin releer contexto
+        df_new[FEATURE_COLS] = series.append(df_new, since=start_date)[FEATURE_COLS]
+        frames.append(df_new[df_old.columns])
+
+    df = pd.concat(frames, ignore_index=True)
+    df = df.sort_values(GROUP_COLS + ["Fecha"])
+
+    # --- Deslizar la ventana de lookback ---
+    trimmed = df["Fecha"] < start_date
+    df = df[~trimmed]
+
+    # --- Las primeras filas de cada serie pierden historia al recortar ---
+    if trimmed.any():
+        head = df.groupby(GROUP_COLS).cumcount() < FEATURE_WINDOW
+        df_ctx = _add_lag_features(df.loc[head, GROUP_COLS + ["Fecha", "Precio"]])
+        df.loc[head, FEATURE_COLS] = df_ctx[FEATURE_COLS]
+
+    partitions = [p for p in state["partitions"] if _partition_date(p) >= start_date]
+    partitions += new_files
+    if not partitions:
+        return None
+    return df, partitions
+
+
+def _load_series_state(path: Path, state: dict, df_old_path: Path) -> SeriesState:
+    """
+    Per-series state saved with the dataset; rebuilt from the dataset when
+    it's missing or doesn't match the watermark.
+    """
+    if path.exists():
+        series = SeriesState.load(path)
+        if series.meta.get("as_of") == state["last_date"]:
+            return series
+    print("♻️ Rebuilding the per-series feature state from the dataset.")
+    return SeriesState.from_frame(
+        pd.read_parquet(df_old_path, columns=GROUP_COLS + ["Fecha", "Precio"])
+    )
 
 
 @task(name="prepare_full_dataset_s3")
@@ -11,59 +211,76 @@ def prepare_full_dataset_s3(
     lookback_days: int = 548,
     s3_root: str = "s3://mlops-milk-datalake/daily",
     output_path: str = "data/processed/full_dataset.parquet",
+    incremental: bool = False,
+    state_path: str = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
 ) -> str:
+    """
+    Builds the training dataset with lag and rolling features.
+
+    With `incremental=True`, reuses the previous `output_path` and the
+    watermark in `state_path` (last ingested date + manifest of partitions)
+    so only the new daily partitions are read. Falls back to a full rebuild
+    when there's no usable state.
+
+    Besides the parquet, writes an uncompressed Arrow IPC copy
+    (`full_dataset.arrow`) with dictionary-encoded categoricals, which the
+    training and prediction tasks memory-map (see `dataset_store.py`), and
+    the per-series feature state (`full_dataset.series.npz`, see
+    `series_state.py`) read by the incremental update and the next-day
+    predictions.
+    """
     if reference_date is None:
         reference_date = datetime.today()
     else:
         reference_date = datetime.fromisoformat(reference_date)
 
     start_date = reference_date - timedelta(days=lookback_days)
-    fs = fsspec.filesystem("s3")
-
-    # 1. List all existing Parquet files
-    all_paths = fs.glob(f"{s3_root}/**/*-data.parquet")
-
-    # 2. Filter valid files within window
-    valid_files = []
-    for path in all_paths:
-        filename = path.split("/")[-1]
-        try:
-            file_date = datetime.strptime(
-                filename.split("-data.parquet")[0], "%Y-%m-%d"
-            )
-            if start_date <= file_date <= reference_date:
-                valid_files.append(f"s3://{path}")
-        except:
-            continue
+    fs, root = resolve(s3_root, max_concurrency)
 
-    if not valid_files:
-        raise FileNotFoundError("No valid files found within date window.")
+    output_path = Path(output_path)
+    state_path = Path(state_path or output_path.with_suffix(".state.json"))
 
-    # 3. Load data
-    df_list = [pd.read_parquet(fp, filesystem=fs) for fp in sorted(valid_files)]
-    df = pd.concat(df_list, ignore_index=True)
+    result = None
+    if incremental and output_path.exists():
+        state = _read_state(state_path)
+        if (
+            state
+            and state["s3_root"] == s3_root
+            and state["lookback_days"] == lookback_days
+        ):
+            series = _load_series_state(
+                series_state_path(output_path), state, output_path
+            )
+            result = _build_incremental(
+                fs,
+                root,
+                start_date,
+                reference_date,
+                output_path,
+                state,
+                series,
+                max_concurrency,
+            )
 
-    # 4. Preprocessing
-    df = df.dropna(subset=["Fecha", "Precio"])
-    df["Fecha"] = pd.to_datetime(df["Fecha"])
-    group_cols = ["Estado", "Ciudad", "Tipo", "Canal"]
-    df = df.sort_values(group_cols + ["Fecha"])
-    df["año"] = df["Fecha"].dt.year
-    df["mes"] = df["Fecha"].dt.month
-    df["dia"] = df["Fecha"].dt.day
-    df["dia_semana"] = df["Fecha"].dt.day_name()
-    df["Precio_lag1"] = df.groupby(group_cols)["Precio"].shift(1)
-    df["Precio_mean7"] = (
-        df.groupby(group_cols)["Precio"]
-        .rolling(window=7, min_periods=1)
-        .mean()
-        .reset_index(level=group_cols, drop=True)
-    )
+    if result is None:
+        df, partitions = _build_full(
+            fs, root, s3_root, start_date, reference_date, max_concurrency
+        )
+        series = SeriesState.from_frame(df)
+    else:
+        df, partitions = result
+        print(f"➕ Incremental update: {len(df)} rows in window")
 
     # 5. Save
-    output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     df.to_parquet(output_path, index=False)
+    # Copia Arrow sin comprimir para que entrenamiento y predicción la mapeen
+    write_feather(df, feather_path(output_path))
+    # Inicio de la ventana: las predicciones ignoran lo anterior, como el dataset
+    series.meta["since"] = start_date.strftime("%Y-%m-%d")
+    series.save(series_state_path(output_path))
+    _write_state(state_path, s3_root, lookback_days, partitions)
 
     print(f"✅ Saved {len(df)} rows to: {output_path}")
     return str(output_path)
@@ -0,0 +1,275 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from orchestration.tasks.prediction_features import DIM_COLS, _date_features
+
+# Últimos precios guardados por serie: alcanza para cualquier media de
+# hasta CAPACITY observaciones sin volver a leer el histórico
+CAPACITY = 30
+# Medias móviles sobre observaciones (incluyen la fila actual, igual que
+# `rolling(7, min_periods=1)` en prepare_full_dataset_s3). Se pueden agregar
+# ventanas de hasta CAPACITY, p. ej. "Precio_mean14": 14
+WINDOWS = {"Precio_mean7": 7}
+# Medias exponenciales (alpha por nombre), p. ej. "Precio_ewm": 0.3
+EWMS = {}
+NO_DATE = np.iinfo(np.int32).min
+
+
+def series_state_path(parquet_path) -> Path:
+    """
+    Feature state written next to `full_dataset.parquet`.
+    """
+    return Path(parquet_path).with_suffix(".series.npz")
+
+
+def _days(fecha) -> np.ndarray:
+    return pd.to_datetime(fecha).to_numpy().astype("datetime64[D]").astype(np.int32)
+
+
+def _date(days: int) -> str:
+    return str(np.datetime64(int(days), "D"))
+
+
+def _ewm_step(previous: np.ndarray, prices: np.ndarray, alpha: float) -> np.ndarray:
+    # Como `ewm(alpha, adjust=False, ignore_na=True)`: los nulos no cuentan
+    step = np.where(np.isnan(prices), previous, alpha * prices + (1 - alpha) * previous)
+    return np.where(np.isnan(previous), prices, step)
+
+
+def _mean(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(valid, values, 0.0).sum(axis=1) / counts
+
+
+class SeriesState:
+    """
+    Persistent per-series feature state: for each (Estado, Ciudad, Tipo,
+    Canal) series, a ring buffer with the dates and prices of its last
+    `capacity` observations, plus the running value of each EWM.
+
+    A new daily partition is folded in with `append`, in O(series) per day,
+    which also returns the training features of the appended rows;
+    `prediction_features` builds the next-day table from the buffers alone.
+    Windows in `WINDOWS` are computed from the buffer, so adding one (up to
+    `capacity`) or an EWM (`add_ewm`) doesn't need the historical data.
+    """
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self.keys = []
+        self._ids = {}
+        self.prices = np.full((0, capacity), np.nan)
+        self.dates = np.full((0, capacity), NO_DATE, dtype=np.int32)
+        self.head = np.zeros(0, dtype=np.int64)
+        self.ewms = {}
+        self.ewm = {}
+        self.meta = {}
+        for name, alpha in EWMS.items():
+            self.add_ewm(name, alpha)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _series_ids(self, df: pd.DataFrame) -> np.ndarray:
+        # Un id por serie distinta del lote; las nuevas se agregan al final
+        codes = df.groupby(DIM_COLS, sort=False, observed=True).ngroup().to_numpy()
+        uniques = df[DIM_COLS].drop_duplicates().astype(str)
+        mapping = []
+        for key in uniques.itertuples(index=False, name=None):
+            if key not in self._ids:
+                self._ids[key] = len(self.keys)
+                self.keys.append(key)
+            mapping.append(self._ids[key])
+
+        grow = len(self.keys) - len(self.head)
+        if grow:
+            self.prices = np.vstack(
+                [self.prices, np.full((grow, self.capacity), np.nan)]
+            )
+            self.dates = np.vstack(
+                [self.dates, np.full((grow, self.capacity), NO_DATE, dtype=np.int32)]
+            )
+            self.head = np.r_[self.head, np.zeros(grow, dtype=np.int64)]
+            for name in self.ewm:
+                self.ewm[name] = np.r_[self.ewm[name], np.full(grow, np.nan)]
+        return np.asarray(mapping, dtype=np.int64)[codes]
+
+    def _push(self, ids: np.ndarray, prices: np.ndarray, days: np.ndarray):
+        # Cada serie aparece a lo sumo una vez por llamada
+        slot = self.head[ids]
+        self.prices[ids, slot] = prices
+        self.dates[ids, slot] = days
+        self.head[ids] = (slot + 1) % self.capacity
+        for name, alpha in self.ewms.items():
+            self.ewm[name][ids] = _ewm_step(self.ewm[name][ids], prices, alpha)
+
+    def window(
+        self, ids: np.ndarray, n: int, offset: int = 0, since=None
+    ) -> np.ndarray:
+        """
+        Last `n` prices of each series, newest first, skipping the newest
+        `offset` ones. Empty slots and observations before `since` are NaN.
+        """
+        if n + offset > self.capacity:
+            raise ValueError(f"Window of {n + offset} exceeds capacity {self.capacity}")
+        pos = (self.head[ids, None] - 1 - offset - np.arange(n)) % self.capacity
+        values = self.prices[ids[:, None], pos]
+        dates = self.dates[ids[:, None], pos]
+        valid = dates != NO_DATE
+        if since is not None:
+            valid &= dates >= _days([since])[0]
+        return np.where(valid, values, np.nan)
+
+    def _features(self, ids: np.ndarray, lag_offset: int, since) -> dict:
+        features = {"Precio_lag1": self.window(ids, 1, lag_offset, since)[:, 0]}
+        for name, n in WINDOWS.items():
+            features[name] = _mean(self.window(ids, n, 0, since))
+        for name in self.ewms:
+            features[name] = self.ewm[name][ids].copy()
+        return features
+
+    def append(self, df: pd.DataFrame, since=None) -> pd.DataFrame:
+        """
+        Folds new rows (Fecha, Precio and the dimension columns, newer than
+        what the state holds) into the buffers, in date order per series.
+
+        Returns:
+            pd.DataFrame: training features of each row, indexed like `df`:
+            `Precio_lag1` is the previous observation and the windows
+            include the row itself, as in `_add_lag_features`
+        """
+        df = df.dropna(subset=DIM_COLS)
+        ids = self._series_ids(df)
+        days = _days(df["Fecha"])
+        prices = df["Precio"].to_numpy(dtype=np.float64)
+        order = np.lexsort((days, ids))
+        # Ronda k: la k-ésima fila nueva de cada serie (una sola en el día a día)
+        rank = pd.Series(ids[order]).groupby(ids[order]).cumcount().to_numpy()
+
+        out = {}
+        for k in range(rank.max() + 1 if len(rank) else 0):
+            rows = order[rank == k]
+            self._push(ids[rows], prices[rows], days[rows])
+            for name, values in self._features(ids[rows], 1, since).items():
+                out.setdefault(name, np.full(len(df), np.nan))[rows] = values
+
+        if len(df):
+            last = _date(days.max())
+            self.meta["as_of"] = max(self.meta.get("as_of", last), last)
+        empty = np.full(len(df), np.nan)
+        columns = ["Precio_lag1", *WINDOWS, *self.ewms]
+        return pd.DataFrame(
+            {col: out.get(col, empty) for col in columns}, index=df.index
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, capacity: int = CAPACITY) -> "SeriesState":
+        """
+        Builds the state from a full history in one pass: only the last
+        `capacity` rows of each series are kept.
+        """
+        state = cls(capacity)
+        df = df.dropna(subset=DIM_COLS)
+        if state.ewms:
+            # Las EWM dependen de toda la historia: se pliega fila por fila
+            state.append(df)
+            return state
+
+        days = _days(df["Fecha"])
+        order = np.argsort(days, kind="stable")
+        ids = state._series_ids(df)[order]
+        from_end = pd.Series(ids).groupby(ids).cumcount(ascending=False).to_numpy()
+        keep = from_end < capacity
+        rows, ids = order[keep], ids[keep]
+        slot = pd.Series(ids).groupby(ids).cumcount().to_numpy()
+        state.prices[ids, slot] = df["Precio"].to_numpy(dtype=np.float64)[rows]
+        state.dates[ids, slot] = days[rows]
+        state.head = np.bincount(ids, minlength=len(state)) % capacity
+        if len(df):
+            state.meta["as_of"] = _date(days.max())
+        return state
+
+    def add_ewm(self, name: str, alpha: float):
+        """
+        Adds an exponential mean, seeded from the prices in the buffer (the
+        weight of older history is below (1 - alpha) ** capacity) and kept
+        up to date by `append` from then on.
+        """
+        self.ewms[name] = alpha
+        self.ewm[name] = np.full(len(self), np.nan)
+        if not len(self):
+            return
+        ids = np.arange(len(self))
+        # Del más viejo al más nuevo
+        for prices in self.window(ids, self.capacity)[:, ::-1].T:
+            self.ewm[name] = _ewm_step(self.ewm[name], prices, alpha)
+
+    def prediction_features(self, target_date: datetime, since=None) -> pd.DataFrame:
+        """
+        Next-day feature table (same columns as `build_prediction_features`)
+        for every series with an observation since `since`: `Precio_lag1`
+        is the last price and the windows end at it.
+        """
+        if self.meta.get("as_of", "") >= f"{target_date:%Y-%m-%d}":
+            raise ValueError(
+                f"State has observations on or after {target_date:%Y-%m-%d}"
+            )
+        ids = np.arange(len(self))
+        features = self._features(ids, 0, since)
+        newest = self.dates[ids, (self.head - 1) % self.capacity]
+        keep = newest != NO_DATE
+        if since is not None:
+            keep &= newest >= _days([since])[0]
+
+        df_pred = pd.DataFrame(self.keys, columns=DIM_COLS)[keep].reset_index(drop=True)
+        for col, value in _date_features(target_date).items():
+            df_pred[col] = value
+        for name, values in features.items():
+            df_pred[name] = values[keep]
+        return df_pred
+
+    def save(self, path) -> Path:
+        """
+        Writes the state as a single `.npz`, renamed over `path` when
+        complete.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        arrays = {f"ewm_{name}": values for name, values in self.ewm.items()}
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                keys=np.array(self.keys, dtype=str).reshape(-1, len(DIM_COLS)),
+                prices=self.prices,
+                dates=self.dates,
+                head=self.head,
+                meta=json.dumps({**self.meta, "ewms": self.ewms}),
+                **arrays,
+            )
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path) -> "SeriesState":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            state = cls(data["prices"].shape[1])
+            state.keys = [tuple(key) for key in data["keys"].tolist()]
+            state._ids = {key: i for i, key in enumerate(state.keys)}
+            state.prices = data["prices"]
+            state.dates = data["dates"]
+            state.head = data["head"]
+            state.ewms = meta.pop("ewms")
+            state.ewm = {name: data[f"ewm_{name}"] for name in state.ewms}
+            state.meta = meta
+        # EWM nuevas en EWMS: se siembran desde los buffers, sin histórico
+        for name, alpha in EWMS.items():
+            if name not in state.ewms:
+                state.add_ewm(name, alpha)
+        return state
@@ -0,0 +1,307 @@
+import re
+from datetime import date
+import numpy as np
+import pandas as pd
+
+HEADER_TEXT = "Precio promedio al consumidor por litro"
+STOP_WORDS = ("promedio", "fuente", "sniim")
+DATE_PATTERN = re.compile(r"(\d{1,2}) de (\w+) de (\d{4})", re.IGNORECASE)
+OUTPUT_COLUMNS = ["Fecha", "Estado", "Ciudad", "Tipo", "Canal", "Precio"]
+
+# Diccionario de meses en español
+meses_es_a_en = {
+    "enero": "January",
+    "febrero": "February",
+    "marzo": "March",
+    "abril": "April",
+    "mayo": "May",
+    "junio": "June",
+    "julio": "July",
+    "agosto": "August",
+    "septiembre": "September",
+    "octubre": "October",
+    "noviembre": "November",
+    "diciembre": "December",
+}
+
+
+def parse_block_date(row) -> object:
+    """
+    Finds the "25 de julio de 2025" cell in the row below a block header
+    and returns it as a `datetime.date`, or None if there is none.
+    """
+    fecha_raw = next(
+        (str(cell) for cell in row if isinstance(cell, str) and "de" in cell),
+        None,
+    )
+    if not fecha_raw:
+        return None
+
+    match = DATE_PATTERN.search(fecha_raw)
+    if not match:
+        return None
+    dia, mes, año = match.groups()
+    mes_en = meses_es_a_en.get(mes.lower())
+    if not mes_en:
+        return None
+    return date(int(año), list(meses_es_a_en).index(mes.lower()) + 1, int(dia))
+
+
+def _ffill(values: np.ndarray, nulls: np.ndarray, start: int, stop: int):
+    """
+    Forward-fill of values[start:stop] that doesn't look before `start`.
+    """
+    positions = np.where(~nulls[start:stop], np.arange(start, stop), -1)
+    last = np.maximum.accumulate(positions)
+    filled = values[np.maximum(last, 0)].copy()
+    filled[last < 0] = np.nan
+    return filled
+
+
+def _repeat(runs: list) -> np.ndarray:
+    """
+    [(value, count), ...] -> array with each value repeated `count` times.
+    """
+    uniques = np.empty(len(runs), dtype=object)
+    uniques[:] = [value for value, _ in runs]
+    return np.repeat(uniques, [count for _, count in runs])
+
+
+def find_header_rows(df: pd.DataFrame) -> np.ndarray:
+    """
+    Row positions containing the block header text, checked column by
+    column with vectorized string masks.
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        column = df[col]
+        if column.dtype != object and not pd.api.types.is_string_dtype(column):
+            continue
+        mask |= column.str.contains(
+            HEADER_TEXT, case=False, regex=False, na=False
+        ).to_numpy(dtype=bool)
+    return np.flatnonzero(mask)
+
+
+def find_stop_rows(first_col: pd.Series) -> np.ndarray:
+    """
+    Row positions where a block ends: first column mentions promedio,
+    fuente or sniim, or is a repeated "Estado" header.
+    """
+    text = first_col.astype(str).str.strip().str.lower()
+    mask = first_col.notna() & (
+        text.str.contains("|".join(STOP_WORDS), regex=True, na=False)
+        | (text == "estado")
+        | (text == "nan")
+    )
+    return np.flatnonzero(mask.to_numpy(dtype=bool))
+
+
+def parse_sniim_sheet(
+    df: pd.DataFrame, drop_city_averages: bool = True
+) -> pd.DataFrame:
+    """
+    Parses the raw SNIIM milk sheet (read with `header=None`) into long
+    format: Fecha, Estado, Ciudad, Tipo, Canal, Precio.
+
+    Each daily block starts with a "Precio promedio al consumidor por litro"
+    row, followed by the date, two header rows and one row per city, and
+    ends at the national average / source rows.
+
+    Args:
+        df (pd.DataFrame): raw sheet
+        drop_city_averages (bool): drop rows whose Ciudad mentions "promedio"
+
+    Returns:
+        pd.DataFrame: one row per (Fecha, Estado, Ciudad, Tipo, Canal)
+    """
+    values = df.to_numpy(dtype=object)
+    n_rows = len(values)
+    first_col = df.iloc[:, 0]
+
+    header_rows = find_header_rows(df)
+    stop_rows = find_stop_rows(first_col)
+    nulls = pd.isna(values)
+
+    fechas, estados, ciudades, tipos, canales, precios = [], [], [], [], [], []
+    for i in header_rows:
+        if i + 1 >= n_rows:
+            continue
+        fecha = parse_block_date(values[i + 1])
+        if fecha is None:
+            continue
+
+        enc2 = values[i + 3, 2:6]
+        tipos_canales = [
+            ("Pasteurizada" if j < 2 else "Ultrapasteurizada", str(enc2[j]))
+            for j in range(4)
+        ]
+
+        # --- Fin del bloque: primera fila de corte a partir de i + 4 ---
+        start = i + 4
+        if start < n_rows and nulls[start, 0]:
+            stop = start
+        else:
+            k = np.searchsorted(stop_rows, start)
+            stop = stop_rows[k] if k < len(stop_rows) else n_rows
+
+        n = stop - start
+        if n <= 0:
+            continue
+
+        estado = _ffill(values[:, 0], nulls[:, 0], start, stop)
+        ciudad = _ffill(values[:, 1], nulls[:, 1], start, stop)
+
+        # Mismo orden que `melt`: columna por columna
+        fechas.append((fecha, 4 * n))
+        estados.append(np.tile(estado, 4))
+        ciudades.append(np.tile(ciudad, 4))
+        tipos.extend((tipo, n) for tipo, _ in tipos_canales)
+        canales.extend((canal.split("_")[0], n) for _, canal in tipos_canales)
+        precios.append(values[start:stop, 2:6].T.ravel())
+
+    if not fechas:
+        raise ValueError("❌ No price blocks found in workbook.")
+
+    df_final = pd.DataFrame(
+        {
+            "Fecha": _repeat(fechas),
+            "Estado": np.concatenate(estados),
+            "Ciudad": np.concatenate(ciudades),
+            "Tipo": _repeat(tipos),
+            "Canal": _repeat(canales),
+            "Precio": np.concatenate(precios),
+        },
+        columns=OUTPUT_COLUMNS,
+    )
+    df_final["Precio"] = pd.to_numeric(df_final["Precio"], errors="coerce")
+
+    if drop_city_averages:
+        df_final = df_final[
+            ~df_final["Ciudad"].str.lower().str.contains("promedio", na=False)
+        ]
+    return df_final
+
+
+def parse_excel_to_df(path, drop_city_averages: bool = True) -> pd.DataFrame:
+    """
+    Reads a SNIIM workbook and parses every daily block in it.
+    """
+    df = pd.read_excel(path, header=None)
+    return parse_sniim_sheet(df, drop_city_averages=drop_city_averages)
+
+
+# --- Lectura en streaming ---
+
+
+def _iter_rows_openpyxl(path):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in wb.worksheets[0].iter_rows(values_only=True):
+            yield row
+    finally:
+        wb.close()
+
+
+def _iter_rows_calamine(path):
+    from python_calamine import CalamineWorkbook
+
+    sheet = CalamineWorkbook.from_path(str(path)).get_sheet_by_index(0)
+    for row in sheet.iter_rows():
+        # calamine devuelve "" para celdas vacías
+        yield tuple(None if cell == "" else cell for cell in row)
+
+
+def iter_sheet_rows(path, engine: str = "auto"):
+    """
+    Yields the first sheet row by row without loading it into a DataFrame.
+
+    Args:
+        path: workbook path
+        engine (str): "calamine", "openpyxl" (read-only mode) or "auto"
+            to use calamine when it's installed
+    """
+    if engine == "auto":
+        try:
+            import python_calamine  # noqa: F401
+
+            engine = "calamine"
+        except ImportError:
+            engine = "openpyxl"
+
+    if engine == "calamine":
+        return _iter_rows_calamine(path)
+    if engine == "openpyxl":
+        return _iter_rows_openpyxl(path)
+    raise ValueError(f"Unknown engine: {engine}")
+
+
+def _is_stop_cell(cell) -> bool:
+    if cell is None or (isinstance(cell, float) and np.isnan(cell)):
+        return False
+    text = str(cell).strip().lower()
+    return any(w in text for w in STOP_WORDS) or text in ("estado", "nan")
+
+
+def _is_header_row(row) -> bool:
+    return any(
+        isinstance(cell, str) and HEADER_TEXT.lower() in cell.lower() for cell in row
+    )
+
+
+def parse_excel_for_date(
+    path, target_date: date, engine: str = "auto", drop_city_averages: bool = True
+) -> pd.DataFrame:
+    """
+    Streams the workbook and parses only the block for `target_date`,
+    stopping as soon as that block ends. Memory stays at one block and,
+    for workbooks ordered newest first, reading stops at the top of the
+    sheet.
+
+    Returns:
+        pd.DataFrame: same schema as `parse_excel_to_df`, empty if the date
+        is not in the workbook
+    """
+    buffer = None
+    last_date = None
+    descending = None
+
+    for row in iter_sheet_rows(path, engine):
+        row = tuple(row[:6]) + (None,) * (6 - len(row[:6]))
+
+        if buffer is None:
+            if _is_header_row(row):
+                buffer = [row]
+            continue
+
+        buffer.append(row)
+        offset = len(buffer) - 1
+
+        if offset == 1:
+            fecha = parse_block_date(row)
+            if fecha is None or fecha != target_date:
+                if fecha is not None and last_date is not None:
+                    descending = fecha < last_date
+                if fecha is not None:
+                    last_date = fecha
+                buffer = None
+                # Hoja ordenada de más reciente a más antigua: ya pasamos la fecha
+                if descending and fecha is not None and fecha < target_date:
+                    break
+            continue
+
+        if offset >= 4 and ((offset == 4 and row[0] is None) or _is_stop_cell(row[0])):
+            break
+
+    if buffer is None or len(buffer) < 5:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    try:
+        return parse_sniim_sheet(
+            pd.DataFrame(buffer), drop_city_averages=drop_city_averages
+        )
+    except ValueError:
+        # Bloque sin filas de precios
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
@@ -1,6 +1,5 @@
 from prefect import task
 import pandas as pd
-from sklearn.feature_extraction import DictVectorizer
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import root_mean_squared_error
 from sklearn.model_selection import cross_val_score
@@ -9,13 +8,17 @@ from hyperopt import fmin, tpe, hp, STATUS_OK, Trials
 import mlflow
 import mlflow.sklearn
 from datetime import datetime
+from orchestration.tasks.feature_encoder import CategoricalEncoder, log_pipeline
+
+# Columnas que entrega `load_data`
+CATEGORICAL = ["Estado", "Ciudad", "Tipo", "Canal"]
 
 
 @task
 def train_model(
-    X_train_dicts,
+    X_train,
     y_train,
-    X_val_dicts,
+    X_val,
     y_val,
     model_name="milk-price-predictor",
     max_evals=25,
@@ -56,12 +59,15 @@ def train_model(
             )
 
             pipeline = Pipeline(
-                [("vectorizer", DictVectorizer()), ("regressor", model)]
+                [
+                    ("vectorizer", CategoricalEncoder(CATEGORICAL, [])),
+                    ("regressor", model),
+                ]
             )
 
             score = cross_val_score(
                 pipeline,
-                X_train_dicts,
+                X_train,
                 y_train,
                 scoring="neg_root_mean_squared_error",
                 cv=3,
@@ -95,15 +101,18 @@ def train_model(
         )
 
         pipeline = Pipeline(
-            [("vectorizer", DictVectorizer()), ("regressor", best_model)]
+            [
+                ("vectorizer", CategoricalEncoder(CATEGORICAL, [])),
+                ("regressor", best_model),
+            ]
         )
 
-        pipeline.fit(X_train_dicts, y_train)
-        y_pred = pipeline.predict(X_val_dicts)
+        pipeline.fit(X_train, y_train)
+        y_pred = pipeline.predict(X_val)
         rmse = root_mean_squared_error(y_val, y_pred)
 
         mlflow.log_metric("final_val_rmse", rmse)
-        mlflow.sklearn.log_model(pipeline, artifact_path="model")
+        log_pipeline(pipeline, artifact_path="model")
 
         # Register model
         run_id = active_run.info.run_id
@@ -1,72 +1,100 @@
 # milk_price_prediction/training/train_random_forest_model.py
 
-# ✅ Objective: Train a Random Forest model with Hyperopt using a pipeline that includes DictVectorizer.
+# ✅ Objective: Train a Random Forest model with Hyperopt using a pipeline that includes a columnar CategoricalEncoder.
 # The trained model is logged and registered in MLflow.
 
-import pandas as pd
 import numpy as np
-from sklearn.feature_extraction import DictVectorizer
+from functools import partial
 from sklearn.metrics import root_mean_squared_error
-from sklearn.model_selection import cross_val_score
 from sklearn.pipeline import Pipeline
-from sklearn.ensemble import RandomForestRegressor
-from hyperopt import fmin, tpe, hp, STATUS_OK, Trials
+from hyperopt import fmin, tpe, STATUS_OK
 import mlflow
 import mlflow.sklearn
 from datetime import datetime
 from prefect import task
+from orchestration.tasks.dataset_store import read_dataset
+from orchestration.tasks.feature_encoder import (
+    CATEGORICAL,
+    NUMERICAL,
+    CategoricalEncoder,
+    log_pipeline,
+)
+from orchestration.tasks.model_specs import (
+    build_random_forest as build_model,
+    search_space_rf,
+)
+from orchestration.tasks.tuning import (
+    cached_objective,
+    cv_rmse,
+    load_trials,
+    log_trial,
+    make_folds,
+    parallel_fmin,
+)
+from orchestration.tasks.trial_cache import (
+    DEFAULT_CACHE_DIR,
+    TrialCache,
+    dataset_fingerprint,
+)
+from orchestration.tasks.warm_start import (
+    continue_training,
+    has_new_categories,
+    load_previous_model,
+)
+
+MODEL_TYPE = "random_forest"
 
 
 @task(name="train_random_forest_model")
 def train_random_forest_model(
-    path_to_dataset: str = "data/processed/full_dataset.parquet", max_evals: int = 25
+    path_to_dataset: str = "data/processed/full_dataset.parquet",
+    max_evals: int = 25,
+    cpu_budget: int = None,
+    warm_start: bool = False,
+    cache_dir: str = DEFAULT_CACHE_DIR,
 ):
-    df = pd.read_parquet(path_to_dataset)
+    """
+    Tunes a Random Forest with Hyperopt, then fits, logs and registers the
+    best pipeline in MLflow.
+
+    Args:
+        path_to_dataset (str): parquet written by `prepare_full_dataset_s3`
+            (its Arrow copy is memory-mapped when present)
+        max_evals (int): number of hyperopt trials
+        cpu_budget (int): cores this search may use. When set, trials run
+            concurrently on a process pool of that size (one core per
+            trial); when None, trials run one after another using all cores.
+        warm_start (bool): skip the search and keep the hyperparameters and
+            trees of the newest Random Forest version, adding `EXTRA_TREES`
+            trees fitted on the current window (see `warm_start.py`). Falls
+            back to the full search when there is no previous model or the
+            window has categories it has never seen.
+        cache_dir (str): where scored trials are cached, keyed by the
+            dataset contents and the trial parameters (see `TrialCache`).
+            Re-running the search on the same dataset reuses the stored CV
+            scores and resumes the saved `Trials`. None disables it.
+
+    Returns:
+        float: RMSE of the final model on the training data
+    """
+    categorical = CATEGORICAL
+    numerical = NUMERICAL
+    # Solo las columnas que usa el modelo, mapeadas desde la copia Arrow
+    df = read_dataset(path_to_dataset, columns=categorical + numerical + ["Precio"])
     df = df.dropna(subset=["Precio", "Precio_lag1", "Precio_mean7"])
 
-    categorical = ["Estado", "Ciudad", "Tipo", "Canal", "dia_semana"]
-    numerical = ["Precio_lag1", "Precio_mean7", "mes", "dia", "año"]
-    df[categorical] = df[categorical].astype(str)
-
-    feature_dicts = df[categorical + numerical].to_dict(orient="records")
+    X = df[categorical + numerical]
     y = df["Precio"].values
 
     def objective_rf(params):
         with mlflow.start_run(nested=True):
             mlflow.log_params(params)
-            mlflow.set_tags({"model_type": "random_forest"})
-
-            pipeline = Pipeline(
-                [
-                    ("vectorizer", DictVectorizer()),
-                    (
-                        "regressor",
-                        RandomForestRegressor(
-                            n_estimators=int(params["n_estimators"]),
-                            max_depth=int(params["max_depth"]),
-                            min_samples_split=int(params["min_samples_split"]),
-                            min_samples_leaf=int(params["min_samples_leaf"]),
-                            random_state=42,
-                            n_jobs=-1,
-                        ),
-                    ),
-                ]
-            )
+            mlflow.set_tags({"model_type": MODEL_TYPE})
 
-            score = cross_val_score(
-                pipeline, feature_dicts, y, scoring="neg_root_mean_squared_error", cv=3
-            )
-            rmse = -score.mean()
+            rmse = cv_rmse(build_model, params, folds)
             mlflow.log_metric("rmse", rmse)
             return {"loss": rmse, "status": STATUS_OK}
 
-    search_space_rf = {
-        "n_estimators": hp.quniform("n_estimators", 50, 300, 10),
-        "max_depth": hp.quniform("max_depth", 5, 20, 1),
-        "min_samples_split": hp.quniform("min_samples_split", 2, 10, 1),
-        "min_samples_leaf": hp.quniform("min_samples_leaf", 1, 5, 1),
-    }
-
     mlflow.set_tracking_uri("http://127.0.0.1:5000")
     mlflow.set_experiment("milk-price-predictor")
 
@@ -74,36 +102,75 @@ def train_random_forest_model(
     run_name = f"rf-milk-predictor-{run_date.year}-{run_date.month:02d}"
     model_name = "milk-price-predictor-rf"
 
-    with mlflow.start_run(run_name=run_name) as run:
-        trials_rf = Trials()
-        best_rf = fmin(
-            fn=objective_rf,
-            space=search_space_rf,
-            algo=tpe.suggest,
-            max_evals=max_evals,
-            trials=trials_rf,
+    previous = (
+        load_previous_model(model_name, list(search_space_rf)) if warm_start else None
+    )
+    if previous is not None:
+        encoder = previous["pipeline"].named_steps["vectorizer"]
+        if has_new_categories(encoder, X):
+            print("🆕 New categories in the window, running a full search.")
+            previous = None
+
+    if previous is None:
+        # Se codifica una sola vez: todos los trials reutilizan la matriz y los folds
+        encoder = CategoricalEncoder(categorical, numerical).fit(X)
+        cache = (
+            TrialCache(dataset_fingerprint(path_to_dataset, MODEL_TYPE), cache_dir)
+            if cache_dir
+            else None
         )
+        trials_file = cache.trials_file(MODEL_TYPE) if cache else ""
+    M = encoder.transform(X)
 
-        dv = DictVectorizer()
-        X = dv.fit_transform(feature_dicts)
-
-        final_rf = RandomForestRegressor(
-            n_estimators=int(best_rf["n_estimators"]),
-            max_depth=int(best_rf["max_depth"]),
-            min_samples_split=int(best_rf["min_samples_split"]),
-            min_samples_leaf=int(best_rf["min_samples_leaf"]),
-            random_state=42,
-            n_jobs=-1,
-        )
-
-        pipeline = Pipeline([("vectorizer", dv), ("regressor", final_rf)])
-        pipeline.fit(feature_dicts, y)
-        y_pred = pipeline.predict(feature_dicts)
+    with mlflow.start_run(run_name=run_name) as run:
+        if previous is not None:
+            best_rf = previous["params"]
+            model = continue_training(
+                previous["pipeline"].named_steps["regressor"],
+                M,
+                y,
+                n_jobs=cpu_budget or -1,
+            )
+            mlflow.set_tags(
+                {"training_mode": "warm_start", "warm_start_from": previous["run_id"]}
+            )
+        elif cpu_budget:
+            folds = make_folds(M, y)
+            best_rf, trials_rf = parallel_fmin(
+                partial(build_model, n_jobs=1),
+                folds,
+                space=search_space_rf,
+                max_evals=max_evals,
+                n_workers=cpu_budget,
+                on_result=partial(log_trial, model_type=MODEL_TYPE),
+                cache=cache,
+                trials_save_file=trials_file,
+            )
+        else:
+            folds = make_folds(M, y)
+            trials_rf = load_trials(trials_file)
+            best_rf = fmin(
+                fn=cached_objective(objective_rf, cache),
+                space=search_space_rf,
+                algo=tpe.suggest,
+                max_evals=max_evals,
+                trials=trials_rf,
+                rstate=np.random.default_rng(42),
+                trials_save_file=trials_file,
+            )
+        if previous is None:
+            mlflow.set_tags({"training_mode": "full_search"})
+            model = build_model(best_rf, n_jobs=cpu_budget or -1).fit(M, y)
+        # Hiperparámetros del modelo final, para el warm start del día siguiente
+        mlflow.log_params(best_rf)
+        y_pred = model.predict(M)
         rmse = root_mean_squared_error(y, y_pred)
 
         mlflow.log_metric("final_rmse", rmse)
-        mlflow.set_tags({"model_type": "random_forest"})
-        mlflow.sklearn.log_model(pipeline, artifact_path="model")
+        mlflow.set_tags({"model_type": MODEL_TYPE})
+        # El artefacto sigue siendo el pipeline completo para serving
+        pipeline = Pipeline([("vectorizer", encoder), ("regressor", model)])
+        log_pipeline(pipeline, artifact_path="model")
 
         run_id = run.info.run_id
         model_uri = f"runs:/{run_id}/model"
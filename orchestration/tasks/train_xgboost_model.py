@@ -1,78 +1,135 @@
 # milk_price_prediction/training/train_xgboost_model.py
 
-# ✅ Objective: Train an XGBoost model with Hyperopt using a pipeline that includes DictVectorizer.
+# ✅ Objective: Train an XGBoost model with Hyperopt using a pipeline that includes a columnar CategoricalEncoder.
 # The trained model is logged and registered in MLflow.
 
-import pandas as pd
 import numpy as np
-from sklearn.feature_extraction import DictVectorizer
+from functools import partial
 from sklearn.metrics import root_mean_squared_error
-from sklearn.model_selection import cross_val_score
 from sklearn.pipeline import Pipeline
-from xgboost import XGBRegressor
-from hyperopt import fmin, tpe, hp, STATUS_OK, Trials
+from hyperopt import fmin, tpe, STATUS_OK
 import mlflow
 import mlflow.sklearn
+import time
 from datetime import datetime
 from prefect import task
+from orchestration.tasks.dataset_store import read_dataset
+from orchestration.tasks.feature_encoder import (
+    CATEGORICAL,
+    NUMERICAL,
+    CategoricalEncoder,
+    log_pipeline,
+)
+from orchestration.tasks.model_specs import (
+    HALVING_ETA,
+    MAX_ROUNDS,
+    MIN_ROUNDS,
+    build_xgboost as build_model,
+    early_stopping_rmse,
+    search_space_xgb,
+)
+from orchestration.tasks.tuning import (
+    cached_objective,
+    cv_rmse,
+    load_trials,
+    log_trial,
+    make_folds,
+    halving_budgets,
+    halving_fmin,
+    parallel_fmin,
+)
+from orchestration.tasks.trial_cache import (
+    DEFAULT_CACHE_DIR,
+    TrialCache,
+    dataset_fingerprint,
+)
+from orchestration.tasks.warm_start import (
+    continue_training,
+    has_new_categories,
+    load_previous_model,
+)
+
+MODEL_TYPE = "xgboost"
+
+
+def _log_halving_trial(params: dict, rmse: float, record: dict):
+    log_trial(
+        {**params, "n_estimators": record["budget"]},
+        rmse,
+        MODEL_TYPE,
+        metrics={
+            k: float(record[k])
+            for k in ("rung", "budget", "n_rounds", "seconds", "pruned")
+        },
+    )
 
 
 @task(name="train_xgboost_model")
 def train_xgboost_model(
-    path_to_dataset: str = "data/processed/full_dataset.parquet", max_evals: int = 25
+    path_to_dataset: str = "data/processed/full_dataset.parquet",
+    max_evals: int = 25,
+    cpu_budget: int = None,
+    strategy: str = "tpe",
+    native: bool = False,
+    warm_start: bool = False,
+    cache_dir: str = DEFAULT_CACHE_DIR,
 ):
-    df = pd.read_parquet(path_to_dataset)
-    df = df.dropna(subset=["Precio", "Precio_lag1", "Precio_mean7"])
+    """
+    Tunes XGBoost with Hyperopt, then fits, logs and registers the best
+    pipeline in MLflow.
+
+    Args:
+        path_to_dataset (str): parquet written by `prepare_full_dataset_s3`
+            (its Arrow copy is memory-mapped when present)
+        max_evals (int): number of hyperopt trials
+        cpu_budget (int): cores this search may use. When set, trials run
+            concurrently on a process pool of that size (one core per
+            trial); when None, trials run one after another using all cores.
+        strategy (str): "tpe" runs the full Hyperopt search. "halving"
+            climbs each TPE trial through MIN_ROUNDS..MAX_ROUNDS boosting
+            rounds and drops it as soon as it falls out of the best third
+            of its rung (asynchronous successive halving). Every fit stops
+            early on its validation fold, and the final model keeps the
+            number of rounds at which the best trial stopped. Trials run
+            one at a time with `cpu_budget` threads each.
+        native (bool): encode the categorical columns as pandas categoricals
+            and train with `xgb.train` on a QuantileDMatrix
+            (`enable_categorical`, `tree_method="hist"`) instead of one-hot
+            encoding them for `XGBRegressor`. The logged pipeline accepts
+            the same dict payloads either way.
+        warm_start (bool): skip the search and keep boosting the newest
+            XGBoost model for `EXTRA_ROUNDS` more rounds on the current
+            window, with its hyperparameters (see `warm_start.py`). Falls
+            back to the full search when there is no previous model or the
+            window has categories it has never seen.
+        cache_dir (str): where scored trials are cached, keyed by the
+            dataset contents and the trial parameters (see `TrialCache`).
+            Re-running the search on the same dataset reuses the stored CV
+            scores and resumes the saved `Trials`. None disables it.
 
-    categorical = ["Estado", "Ciudad", "Tipo", "Canal", "dia_semana"]
-    numerical = ["Precio_lag1", "Precio_mean7", "mes", "dia", "año"]
-    df[categorical] = df[categorical].astype(str)
+    Returns:
+        float: RMSE of the final model on the training data
+    """
+    categorical = CATEGORICAL
+    numerical = NUMERICAL
+    # Solo las columnas que usa el modelo, mapeadas desde la copia Arrow
+    df = read_dataset(path_to_dataset, columns=categorical + numerical + ["Precio"])
+    df = df.dropna(subset=["Precio", "Precio_lag1", "Precio_mean7"])
 
-    feature_dicts = df[categorical + numerical].to_dict(orient="records")
+    X = df[categorical + numerical]
     y = df["Precio"].values
 
+    build = partial(build_model, native=native)
+
     def objective_xgb(params):
         with mlflow.start_run(nested=True):
             mlflow.log_params(params)
-            mlflow.set_tags({"model_type": "xgboost"})
-
-            pipeline = Pipeline(
-                [
-                    ("vectorizer", DictVectorizer()),
-                    (
-                        "regressor",
-                        XGBRegressor(
-                            max_depth=int(params["max_depth"]),
-                            learning_rate=params["learning_rate"],
-                            n_estimators=int(params["n_estimators"]),
-                            min_child_weight=params["min_child_weight"],
-                            gamma=params["gamma"],
-                            subsample=params["subsample"],
-                            colsample_bytree=params["colsample_bytree"],
-                            random_state=42,
-                            n_jobs=-1,
-                        ),
-                    ),
-                ]
-            )
+            mlflow.set_tags({"model_type": MODEL_TYPE})
 
-            score = cross_val_score(
-                pipeline, feature_dicts, y, scoring="neg_root_mean_squared_error", cv=3
-            )
-            rmse = -score.mean()
+            rmse = cv_rmse(build, params, folds)
             mlflow.log_metric("rmse", rmse)
             return {"loss": rmse, "status": STATUS_OK}
 
-    search_space_xgb = {
-        "max_depth": hp.quniform("max_depth", 3, 10, 1),
-        "learning_rate": hp.loguniform("learning_rate", -4, 0),
-        "n_estimators": hp.quniform("n_estimators", 50, 300, 10),
-        "min_child_weight": hp.quniform("min_child_weight", 1, 10, 1),
-        "gamma": hp.uniform("gamma", 0, 1),
-        "subsample": hp.uniform("subsample", 0.5, 1.0),
-        "colsample_bytree": hp.uniform("colsample_bytree", 0.5, 1.0),
-    }
-
     mlflow.set_tracking_uri("http://127.0.0.1:5000")
     mlflow.set_experiment("milk-price-predictor")
 
@@ -80,39 +137,118 @@ def train_xgboost_model(
     run_name = f"xgb-milk-predictor-{run_date.year}-{run_date.month:02d}"
     model_name = "milk-price-predictor-xgb"
 
-    with mlflow.start_run(run_name=run_name) as run:
-        trials_xgb = Trials()
-        best_xgb = fmin(
-            fn=objective_xgb,
-            space=search_space_xgb,
-            algo=tpe.suggest,
-            max_evals=max_evals,
-            trials=trials_xgb,
-        )
+    previous = (
+        load_previous_model(model_name, list(search_space_xgb)) if warm_start else None
+    )
+    if previous is not None:
+        encoder = previous["pipeline"].named_steps["vectorizer"]
+        if has_new_categories(encoder, X):
+            print("🆕 New categories in the window, running a full search.")
+            previous = None
 
-        dv = DictVectorizer()
-        X = dv.fit_transform(feature_dicts)
-
-        final_xgb = XGBRegressor(
-            max_depth=int(best_xgb["max_depth"]),
-            learning_rate=best_xgb["learning_rate"],
-            n_estimators=int(best_xgb["n_estimators"]),
-            min_child_weight=best_xgb["min_child_weight"],
-            gamma=best_xgb["gamma"],
-            subsample=best_xgb["subsample"],
-            colsample_bytree=best_xgb["colsample_bytree"],
-            random_state=42,
-            n_jobs=-1,
+    if previous is None:
+        # Se codifica una sola vez: todos los trials reutilizan la matriz y los folds
+        encoding = "category" if native else "onehot"
+        encoder = CategoricalEncoder(categorical, numerical, encoding).fit(X)
+        cache = (
+            TrialCache(
+                dataset_fingerprint(path_to_dataset, MODEL_TYPE, encoding, strategy),
+                cache_dir,
+            )
+            if cache_dir
+            else None
         )
+        trials_file = cache.trials_file(MODEL_TYPE) if cache else ""
+    M = encoder.transform(X)
 
-        pipeline = Pipeline([("vectorizer", dv), ("regressor", final_xgb)])
-        pipeline.fit(feature_dicts, y)
-        y_pred = pipeline.predict(feature_dicts)
+    with mlflow.start_run(run_name=run_name) as run:
+        if previous is not None:
+            best_xgb = previous["params"]
+            model = continue_training(
+                previous["pipeline"].named_steps["regressor"],
+                M,
+                y,
+                n_jobs=cpu_budget or -1,
+            )
+            mlflow.set_tags(
+                {"training_mode": "warm_start", "warm_start_from": previous["run_id"]}
+            )
+        else:
+            folds = make_folds(M, y)
+            search_start = time.perf_counter()
+            if strategy == "halving":
+                best_xgb, trials_xgb, history = halving_fmin(
+                    # DMatrix de los folds solo durante esta búsqueda
+                    partial(early_stopping_rmse, n_jobs=cpu_budget or -1, dmatrices={}),
+                    folds,
+                    space=search_space_xgb,
+                    max_evals=max_evals,
+                    budgets=halving_budgets(MIN_ROUNDS, MAX_ROUNDS, HALVING_ETA),
+                    eta=HALVING_ETA,
+                    on_result=_log_halving_trial,
+                    cache=cache,
+                    trials_save_file=trials_file,
+                )
+                best_result = trials_xgb.best_trial["result"]
+                best_xgb = {**best_xgb, "n_estimators": best_result["info"]["n_rounds"]}
+                best_cv_rmse = best_result["loss"]
+                mlflow.log_metrics(
+                    {
+                        "search_boosting_rounds": sum(r["budget"] for r in history),
+                        "pruned_trials": sum(r["pruned"] for r in history),
+                    }
+                )
+            elif cpu_budget:
+                best_xgb, trials_xgb = parallel_fmin(
+                    partial(build, n_jobs=1),
+                    folds,
+                    space=search_space_xgb,
+                    max_evals=max_evals,
+                    n_workers=cpu_budget,
+                    on_result=partial(log_trial, model_type=MODEL_TYPE),
+                    cache=cache,
+                    trials_save_file=trials_file,
+                )
+                best_cv_rmse = trials_xgb.best_trial["result"]["loss"]
+            else:
+                trials_xgb = load_trials(trials_file)
+                best_xgb = fmin(
+                    fn=cached_objective(objective_xgb, cache),
+                    space=search_space_xgb,
+                    algo=tpe.suggest,
+                    max_evals=max_evals,
+                    trials=trials_xgb,
+                    rstate=np.random.default_rng(42),
+                    trials_save_file=trials_file,
+                )
+                best_cv_rmse = trials_xgb.best_trial["result"]["loss"]
+            search_seconds = time.perf_counter() - search_start
+            mlflow.set_tags(
+                {
+                    "training_mode": "full_search",
+                    "tuning_strategy": strategy,
+                    "native_xgboost": native,
+                }
+            )
+            # Compromiso tiempo / RMSE de cada estrategia
+            mlflow.log_metrics(
+                {"search_seconds": search_seconds, "best_cv_rmse": best_cv_rmse}
+            )
+            print(
+                f"⏱️ {strategy} search took {search_seconds:.1f}s "
+                f"(best CV RMSE {best_cv_rmse:.4f})"
+            )
+            model = build(best_xgb, n_jobs=cpu_budget or -1).fit(M, y)
+        # Hiperparámetros del modelo final, para el warm start del día siguiente
+        mlflow.log_params(best_xgb)
+        y_pred = model.predict(M)
         rmse = root_mean_squared_error(y, y_pred)
 
         mlflow.log_metric("final_rmse", rmse)
-        mlflow.set_tags({"model_type": "xgboost"})
-        mlflow.sklearn.log_model(pipeline, artifact_path="model")
+        mlflow.set_tags({"model_type": MODEL_TYPE})
+        # El artefacto sigue siendo el pipeline completo para serving
+        pipeline = Pipeline([("vectorizer", encoder), ("regressor", model)])
+        log_pipeline(pipeline, artifact_path="model")
 
         run_id = run.info.run_id
         model_uri = f"runs:/{run_id}/model"
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = "data/cache"
+# Cada día hay un dataset nuevo (y una huella por familia de modelo):
+# solo se conservan las últimas para que la cache no crezca sin límite
+KEEP_FINGERPRINTS = 8
+
+
+def dataset_fingerprint(path: str, *extra) -> str:
+    """
+    sha256 of the training parquet, plus anything else that changes the
+    scores of a trial (encoding, strategy, ...).
+    """
+    with open(path, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256")
+    for value in extra:
+        digest.update(f"|{value}".encode())
+    return digest.hexdigest()
+
+
+def _params_key(params: dict) -> str:
+    # hyperopt entrega floats; se normalizan para que 120 y 120.0 coincidan
+    return json.dumps({k: float(v) for k, v in params.items()}, sort_keys=True)
+
+
+def _file_tag(fingerprint: str) -> str:
+    return fingerprint[:16]
+
+
+class TrialCache:
+    """
+    CV results of hyperopt trials, stored in SQLite and keyed by the
+    dataset fingerprint plus the trial parameters, so re-running a search
+    on the same data (a retry, a re-run of the same execution date, or a
+    search with more evals) reuses the scores instead of recomputing them.
+
+    Also keeps the path of the `Trials` pickle of each search, so `fmin`
+    can resume where an interrupted search stopped (`trials_save_file`).
+
+    Only the `keep` most recently saved fingerprints are kept: when a new
+    one is saved, the rows and `Trials` pickles of older ones are deleted.
+    """
+
+    def __init__(
+        self,
+        fingerprint: str,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        keep: int = KEEP_FINGERPRINTS,
+    ):
+        self.fingerprint = fingerprint
+        self.keep = keep
+        self._saved = False
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.cache_dir / "trials.sqlite")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS trials ("
+            " fingerprint TEXT, params TEXT, result TEXT,"
+            " PRIMARY KEY (fingerprint, params))"
+        )
+        # Orden de uso: REPLACE vuelve a insertar la huella con un seq nuevo
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, fingerprint TEXT UNIQUE)"
+        )
+
+    def get(self, params: dict):
+        row = self._conn.execute(
+            "SELECT result FROM trials WHERE fingerprint = ? AND params = ?",
+            (self.fingerprint, _params_key(params)),
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, params: dict, result: dict):
+        self._save_fingerprint()
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?)",
+                (self.fingerprint, _params_key(params), json.dumps(result)),
+            )
+
+    def trials_file(self, name: str) -> str:
+        """
+        Where the `Trials` of search `name` on this dataset are saved.
+        """
+        self._save_fingerprint()
+        return str(self.cache_dir / f"{name}-{_file_tag(self.fingerprint)}.hyperopt")
+
+    def _save_fingerprint(self):
+        """
+        Mark this fingerprint as the most recent one and drop the trials
+        and `Trials` pickles of those beyond the last `keep`.
+        """
+        if self._saved:
+            return
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (fingerprint) VALUES (?)",
+                (self.fingerprint,),
+            )
+            self._conn.execute(
+                "DELETE FROM fingerprints WHERE seq NOT IN ("
+                " SELECT seq FROM fingerprints ORDER BY seq DESC LIMIT ?)",
+                (self.keep,),
+            )
+            # También borra las filas de huellas anteriores a esta tabla
+            self._conn.execute(
+                "DELETE FROM trials WHERE fingerprint NOT IN"
+                " (SELECT fingerprint FROM fingerprints)"
+            )
+            kept = {
+                _file_tag(row[0])
+                for row in self._conn.execute("SELECT fingerprint FROM fingerprints")
+            }
+        for path in self.cache_dir.glob("*.hyperopt"):
+            if path.stem.rsplit("-", 1)[-1] not in kept:
+                path.unlink(missing_ok=True)
+        self._saved = True
+
+    def close(self):
+        self._conn.close()
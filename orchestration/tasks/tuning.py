@@ -0,0 +1,315 @@
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from hyperopt import STATUS_OK, Trials, fmin, space_eval, tpe
+from hyperopt.base import Domain, JOB_STATE_DONE, spec_from_misc
+from sklearn.metrics import root_mean_squared_error
+from sklearn.model_selection import KFold
+
+CV_FOLDS = 3
+
+# Folds de cada proceso del pool (se copian una sola vez)
+_WORKER_DATA = {}
+
+
+def split_cpu_budget(cpu_budget: int = None, n_families: int = 2) -> int:
+    """
+    Cores for each model family when `n_families` searches run at once.
+    """
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    return max(1, cpu_budget // n_families)
+
+
+def make_folds(M, y, n_splits: int = CV_FOLDS) -> list:
+    """
+    Slices an already-encoded feature matrix into the same folds
+    `cross_val_score(cv=n_splits)` uses for regressors (unshuffled KFold),
+    so every trial reuses them instead of re-encoding.
+
+    Returns:
+        list: (X_train, y_train, X_test, y_test) per fold
+    """
+    y = np.asarray(y)
+    # Las matrices "category" son DataFrames: se indexan por posición
+    rows = M.iloc if hasattr(M, "iloc") else M
+    return [
+        (rows[train], y[train], rows[test], y[test])
+        for train, test in KFold(n_splits=n_splits).split(y)
+    ]
+
+
+def cv_rmse(build_model, params: dict, folds: list) -> float:
+    """
+    Mean RMSE of `build_model(params)` over precomputed folds.
+    """
+    scores = []
+    for X_train, y_train, X_test, y_test in folds:
+        model = build_model(params).fit(X_train, y_train)
+        scores.append(root_mean_squared_error(y_test, model.predict(X_test)))
+    return float(np.mean(scores))
+
+
+def load_trials(trials_save_file: str = "") -> Trials:
+    """
+    Trials saved by a previous run of the same search (`trials_save_file`),
+    so it resumes where it stopped, or empty Trials.
+    """
+    if trials_save_file and os.path.exists(trials_save_file):
+        with open(trials_save_file, "rb") as f:
+            return pickle.load(f)
+    return Trials()
+
+
+def cached_objective(objective, cache=None):
+    """
+    Wraps a hyperopt objective so trials already scored on the same data
+    (see `TrialCache`) are not evaluated again.
+    """
+    if cache is None:
+        return objective
+
+    def wrapper(params):
+        result = cache.get(params)
+        if result is None:
+            result = objective(params)
+            cache.put(params, result)
+        return result
+
+    return wrapper
+
+
+def _init_worker(folds):
+    _WORKER_DATA["folds"] = folds
+
+
+def _worker_cv_rmse(build_model, params) -> float:
+    return cv_rmse(build_model, params, _WORKER_DATA["folds"])
+
+
+def halving_budgets(min_budget: int, max_budget: int, eta: int = 3) -> list:
+    """
+    Budgets of each rung: min_budget * eta**k, capped at max_budget.
+    """
+    budgets = []
+    budget = min_budget
+    while budget < max_budget:
+        budgets.append(budget)
+        budget *= eta
+    return budgets + [max_budget]
+
+
+def _is_promoted(loss: float, rung_losses: list, eta: int) -> bool:
+    """
+    Asynchronous successive halving rule: a trial moves to the next rung
+    only if its loss is in the best 1/eta of the losses seen at this rung.
+    """
+    if len(rung_losses) < eta:
+        return True
+    return loss <= np.quantile(rung_losses, 1 / eta)
+
+
+def halving_fmin(
+    score_fn,
+    folds: list,
+    space: dict,
+    max_evals: int,
+    budgets: list,
+    eta: int = 3,
+    on_result=None,
+    trials: Trials = None,
+    seed: int = 42,
+    cache=None,
+    trials_save_file: str = "",
+):
+    """
+    TPE search where each trial climbs a ladder of budgets (e.g. boosting
+    rounds) and is stopped as soon as it falls out of the best 1/eta of
+    the trials scored at the same rung (asynchronous successive halving).
+    Weak configurations only pay for the smallest budget, while TPE still
+    chooses every point.
+
+    Args:
+        score_fn: `(params, budget, folds, state) -> (loss, info)`. `state`
+            is a dict kept across the rungs of one trial so models can
+            continue training instead of starting over. `info` may set
+            "converged" to stop climbing (e.g. early stopping fired).
+        folds (list): output of `make_folds`
+        space (dict): hyperopt search space
+        max_evals (int): number of trials
+        budgets (list): budget of each rung, see `halving_budgets`
+        eta (int): keep 1/eta of the trials at each rung
+        on_result: optional `(params, loss, record)` callback per rung
+        cache (TrialCache): optional store of finished trials. Cached
+            trials are not scored again (nor added to `history`), but
+            their losses still count for the pruning of later trials.
+        trials_save_file (str): optional pickle to save `trials` to after
+            every trial and to resume from
+
+    Returns:
+        tuple: (best, trials, history) where history has one record per
+        rung evaluation with rung, budget, loss, seconds and pruned
+    """
+    trials = trials if trials is not None else load_trials(trials_save_file)
+    rung_losses = [[] for _ in budgets]
+    history = []
+
+    def replay(result):
+        for rung, loss in enumerate(result.get("losses", [])):
+            rung_losses[rung].append(loss)
+
+    # Trials reanudados: sus pérdidas por peldaño siguen contando para la poda
+    for trial in trials.trials:
+        replay(trial["result"])
+
+    def objective(params):
+        cached = cache.get(params) if cache is not None else None
+        if cached is not None:
+            replay(cached)
+            return cached
+
+        state = {}
+        losses = []
+        for rung, budget in enumerate(budgets):
+            start = time.perf_counter()
+            loss, info = score_fn(params, budget, folds, state)
+            rung_losses[rung].append(loss)
+            losses.append(loss)
+
+            last = rung == len(budgets) - 1 or info.get("converged", False)
+            pruned = not last and not _is_promoted(loss, rung_losses[rung], eta)
+            record = {
+                "rung": rung,
+                "budget": budget,
+                "loss": loss,
+                "seconds": time.perf_counter() - start,
+                "pruned": pruned,
+                **{k: v for k, v in info.items() if k != "converged"},
+            }
+            history.append(record)
+            if on_result is not None:
+                on_result(params, loss, record)
+            if last or pruned:
+                break
+        result = {
+            "loss": loss,
+            "status": STATUS_OK,
+            "rung": rung,
+            "info": info,
+            "losses": losses,
+        }
+        if cache is not None:
+            cache.put(params, result)
+        return result
+
+    best = fmin(
+        fn=objective,
+        space=space,
+        algo=tpe.suggest,
+        max_evals=max_evals,
+        trials=trials,
+        rstate=np.random.default_rng(seed),
+        show_progressbar=False,
+        trials_save_file=trials_save_file,
+    )
+    return best, trials, history
+
+
+def log_trial(params: dict, rmse: float, model_type: str, metrics: dict = None):
+    """
+    Logs one hyperopt trial as a nested MLflow run of the active run.
+    """
+    import mlflow
+
+    with mlflow.start_run(nested=True):
+        mlflow.log_params(params)
+        mlflow.set_tags({"model_type": model_type})
+        mlflow.log_metric("rmse", rmse)
+        if metrics:
+            mlflow.log_metrics(metrics)
+
+
+def parallel_fmin(
+    build_model,
+    folds: list,
+    space: dict,
+    max_evals: int,
+    n_workers: int,
+    on_result=None,
+    trials: Trials = None,
+    seed: int = 42,
+    cache=None,
+    trials_save_file: str = "",
+):
+    """
+    Batched TPE search with the cross-validation of each trial running on a
+    local process pool. Workers are spawned, not forked, so they are safe to
+    start while other threads of this process hold OpenMP or logging locks.
+
+    Every round asks TPE for `n_workers` points using the finished trials
+    so far, scores them concurrently and feeds the losses back into
+    `trials`, so the result is a regular hyperopt `Trials` object.
+
+    Args:
+        build_model: picklable `params -> estimator` factory
+        folds (list): output of `make_folds`, sent once to each worker process
+        space (dict): hyperopt search space
+        max_evals (int): total number of trials, including those in `trials`
+        n_workers (int): concurrent trials (processes)
+        on_result: optional `(params, rmse)` callback, run in this process
+            so MLflow nested runs stay attached to the active parent run
+        trials (Trials): optional trials to resume from
+        cache (TrialCache): optional store of CV scores; cached points are
+            not scored again (nor passed to `on_result`)
+        trials_save_file (str): optional pickle to save `trials` to after
+            every round and to resume from
+
+    Returns:
+        tuple: (best, trials) where `best` has the same format as `fmin`
+    """
+    trials = trials if trials is not None else load_trials(trials_save_file)
+    domain = Domain(lambda params: None, space)
+    rng = np.random.default_rng(seed)
+
+    # spawn, no fork: se llama desde un hilo de Prefect mientras otra tarea
+    # entrena con hilos de XGBoost/OpenMP, y un fork heredaría sus locks
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(folds,),
+    ) as pool:
+        while len(trials.trials) < max_evals:
+            batch = min(n_workers, max_evals - len(trials.trials))
+            trials.refresh()
+
+            docs = []
+            for new_id in trials.new_trial_ids(batch):
+                docs.extend(
+                    tpe.suggest([new_id], domain, trials, rng.integers(2**31 - 1))
+                )
+            params = [space_eval(space, spec_from_misc(doc["misc"])) for doc in docs]
+
+            cached = [cache.get(p) if cache is not None else None for p in params]
+            todo = [p for p, hit in zip(params, cached) if hit is None]
+            scored = iter(pool.map(_worker_cv_rmse, [build_model] * len(todo), todo))
+
+            for doc, trial_params, hit in zip(docs, params, cached):
+                doc["state"] = JOB_STATE_DONE
+                if hit is not None:
+                    doc["result"] = hit
+                    continue
+                doc["result"] = {"loss": next(scored), "status": STATUS_OK}
+                if cache is not None:
+                    cache.put(trial_params, doc["result"])
+                if on_result is not None:
+                    on_result(trial_params, doc["result"]["loss"])
+            trials.insert_trial_docs(docs)
+            trials.refresh()
+            if trials_save_file:
+                with open(trials_save_file, "wb") as f:
+                    pickle.dump(trials, f)
+
+    return trials.argmin, trials
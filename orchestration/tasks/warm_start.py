@@ -0,0 +1,86 @@
+# Warm-start daily retraining: instead of a full hyperopt search, reuse the
+# hyperparameters and the fitted model of the previous run and keep
+# training it on the current window.
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from xgboost import XGBRegressor
+from orchestration.tasks.model_specs import NativeXGBRegressor
+
+# Árboles / rondas que se agregan en cada reentrenamiento diario
+EXTRA_TREES = 10
+EXTRA_ROUNDS = 10
+
+
+def load_previous_model(model_name: str, param_names: list):
+    """
+    Finds the run to warm-start from: the newest registered version (the
+    highest version number) of `model_name`, whether or not it was
+    promoted. The family that lost the promotion keeps warm-starting from
+    its own latest model.
+
+    Returns:
+        dict: run_id, params (best hyperparameters logged on the run) and
+        pipeline (encoder + regressor), or None when there is nothing to
+        warm-start from
+    """
+    import mlflow
+    import mlflow.sklearn
+
+    client = mlflow.MlflowClient()
+    versions = client.search_model_versions(f"name='{model_name}'")
+    if not versions:
+        return None
+
+    run_id = max(versions, key=lambda v: int(v.version)).run_id
+    logged = client.get_run(run_id).data.params
+    if not set(param_names) <= set(logged):
+        # Corridas anteriores a este cambio no registran sus hiperparámetros
+        return None
+
+    return {
+        "run_id": run_id,
+        "params": {name: float(logged[name]) for name in param_names},
+        "pipeline": mlflow.sklearn.load_model(f"runs:/{run_id}/model"),
+    }
+
+
+def has_new_categories(encoder, X) -> bool:
+    """
+    True if `X` has categories the fitted encoder has never seen. The warm
+    started model can't learn them, so a full retrain is needed instead.
+    """
+    for col in encoder.categorical:
+        values = pd.Series(X[col].dropna().unique()).astype(str)
+        if not np.isin(values, encoder.categories_[col]).all():
+            return True
+    return False
+
+
+def continue_training(model, M, y, n_jobs: int = -1):
+    """
+    Keeps training a fitted model on (M, y) instead of fitting a new one:
+
+    - RandomForestRegressor: `warm_start` adds EXTRA_TREES trees fitted on
+      the new window, the existing trees are kept
+    - XGBoost: boosts EXTRA_ROUNDS more rounds on top of the previous
+      booster (`xgb_model=`)
+
+    `M` must be encoded with the same encoder the model was trained with.
+    """
+    if isinstance(model, RandomForestRegressor):
+        return model.set_params(
+            warm_start=True,
+            n_estimators=model.n_estimators + EXTRA_TREES,
+            n_jobs=n_jobs,
+        ).fit(M, y)
+    if isinstance(model, NativeXGBRegressor):
+        extra = NativeXGBRegressor(model.params, EXTRA_ROUNDS, n_jobs)
+        return extra.fit(M, y, xgb_model=model.booster_)
+    if isinstance(model, XGBRegressor):
+        extra = XGBRegressor(
+            **{**model.get_params(), "n_estimators": EXTRA_ROUNDS, "n_jobs": n_jobs}
+        )
+        return extra.fit(M, y, xgb_model=model.get_booster())
+    raise TypeError(f"Can't warm-start a {type(model).__name__}")
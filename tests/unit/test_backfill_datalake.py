@@ -0,0 +1,56 @@
+from datetime import date
+import pandas as pd
+from orchestration.tasks.backfill_datalake import backfill_datalake_fn
+from test_sniim_parser import make_sheet
+
+
+def write_workbooks(excel_dir):
+    excel_dir.mkdir()
+    sheet = make_sheet()
+    sheet.to_excel(excel_dir / "Leche01082025.xlsx", header=False, index=False)
+
+    # Publicación anterior: solo el 31 de julio, con otro precio
+    older = sheet.iloc[11:].reset_index(drop=True)
+    older.iloc[4, 2] = 99.9
+    older.to_excel(excel_dir / "Leche31072025.xlsx", header=False, index=False)
+
+
+def test_backfill_writes_one_partition_per_day(tmp_path):
+    write_workbooks(tmp_path / "raw")
+    root = tmp_path / "daily"
+
+    result = backfill_datalake_fn(
+        start_date="2025-07-30",
+        end_date="2025-08-01",
+        excel_dir=str(tmp_path / "raw"),
+        daily_root=str(root),
+        max_workers=2,
+    )
+
+    assert result["written"] == ["2025-07-31", "2025-08-01"]
+    assert result["missing"] == ["2025-07-30"]
+
+    july = pd.read_parquet(root / "2025/07/2025-07-31-data.parquet")
+    assert set(july["Fecha"]) == {date(2025, 7, 31)}
+    # El día repetido se toma del libro más reciente
+    assert 99.9 not in july["Precio"].values
+    assert len(pd.read_parquet(root / "2025/08/2025-08-01-data.parquet")) == 12
+
+
+def test_backfill_is_idempotent(tmp_path):
+    write_workbooks(tmp_path / "raw")
+    kwargs = dict(
+        start_date="2025-07-31",
+        end_date="2025-08-01",
+        excel_dir=str(tmp_path / "raw"),
+        daily_root=str(tmp_path / "daily"),
+        max_workers=1,
+    )
+    backfill_datalake_fn(**kwargs)
+
+    # Simula una corrida interrumpida: falta una partición
+    (tmp_path / "daily/2025/08/2025-08-01-data.parquet").unlink()
+    result = backfill_datalake_fn(**kwargs)
+
+    assert result["written"] == ["2025-08-01"]
+    assert result["skipped"] == ["2025-07-31"]
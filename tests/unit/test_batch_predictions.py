@@ -0,0 +1,223 @@
+import importlib
+import io
+import json
+import pickle
+import shutil
+import sys
+import types
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+from orchestration.tasks.export_slim_model import write_slim_model
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+from orchestration.tasks.model_specs import build_xgboost
+
+ROOT = Path(__file__).resolve().parents[2]
+ONDEMAND = ROOT / "deployment" / "ondemand"
+LOCAL = ROOT / "deployment" / "local"
+BATCH_COPIES = [
+    LOCAL / "batch.py",
+    ONDEMAND / "batch.py",
+    ROOT / "iac" / "code" / "batch.py",
+]
+
+XGB_PARAMS = {
+    "max_depth": 3,
+    "learning_rate": 0.3,
+    "n_estimators": 10,
+    "min_child_weight": 1,
+    "gamma": 0,
+    "subsample": 1.0,
+    "colsample_bytree": 1.0,
+}
+
+
+def make_records(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Estado": rng.choice(["Jalisco", "Puebla"], n),
+            "Ciudad": rng.choice(["Guadalajara", "Puebla"], n),
+            "Tipo": rng.choice(["Pasteurizada", "Ultrapasteurizada"], n),
+            "Canal": rng.choice(["Autoservicio", "Tienda"], n),
+            "dia_semana": rng.choice(["Lunes", "Martes"], n),
+            "Precio_lag1": rng.normal(25, 2, n),
+            "Precio_mean7": rng.normal(25, 1, n),
+            "mes": rng.integers(1, 13, n),
+            "dia": rng.integers(1, 29, n),
+            "año": rng.integers(2023, 2026, n),
+        }
+    ).to_dict(orient="records")
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    df = pd.DataFrame(make_records(200))
+    return Pipeline(
+        [
+            ("vectorizer", CategoricalEncoder()),
+            ("regressor", build_xgboost(XGB_PARAMS, n_jobs=1)),
+        ]
+    ).fit(df, df["Precio_lag1"])
+
+
+def _import_fresh(name, directory, monkeypatch):
+    monkeypatch.syspath_prepend(str(directory))
+    for module in (name, "batch", "slim_model", "prediction_index", "feature_store"):
+        sys.modules.pop(module, None)
+    return importlib.import_module(name)
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    return _import_fresh("batch", ONDEMAND, monkeypatch)
+
+
+@pytest.fixture
+def handler(pipeline, tmp_path, monkeypatch):
+    write_slim_model(pipeline, tmp_path / "model")
+    monkeypatch.setenv("MODEL_DIR", str(tmp_path / "model"))
+    monkeypatch.setenv("PRECOMPUTED_PREDICTIONS", "off")
+    monkeypatch.setenv("ONLINE_FEATURES", "off")
+    return _import_fresh("handler", ONDEMAND, monkeypatch)
+
+
+def test_parse_batch_formats(batch):
+    records = make_records(3)
+    columns = {col: [r[col] for r in records] for col in records[0]}
+    lines = "\n".join(json.dumps(r) for r in records) + "\n"
+
+    assert batch.parse_batch(json.dumps(records)) == (records, 3)
+    assert batch.parse_batch({"records": records}) == (records, 3)
+    assert batch.parse_batch(lines, "application/x-ndjson") == (records, 3)
+    assert batch.parse_batch({"columns": columns}) == (columns, 3)
+    assert batch.to_records(columns) == records
+
+
+def test_parse_batch_limits(batch, monkeypatch):
+    monkeypatch.setattr(batch, "MAX_BATCH_RECORDS", 2)
+    monkeypatch.setattr(batch, "MAX_BATCH_BYTES", 100)
+
+    with pytest.raises(batch.BatchTooLarge):
+        batch.parse_batch({"records": [{}, {}, {}]})
+    with pytest.raises(batch.BatchTooLarge):
+        batch.parse_batch(json.dumps(make_records(1)))
+    with pytest.raises(batch.BatchError):
+        batch.parse_batch({"columns": {"mes": [1, 2], "dia": [1]}})
+    with pytest.raises(batch.BatchError):
+        batch.parse_batch("[]")
+
+
+def test_lambda_batch_event_keeps_input_order(handler, pipeline):
+    records = make_records(190, seed=1)
+    event = {"rawPath": "/predict/batch", "body": json.dumps({"records": records})}
+
+    response = handler.handler(event, None)
+
+    body = json.loads(response["body"])
+    assert response["statusCode"] == 200
+    np.testing.assert_allclose(
+        body["predictions"], pipeline.predict(records), rtol=1e-5
+    )
+    assert body["metrics"]["records"] == 190
+
+
+def test_lambda_direct_columnar_invocation(handler, pipeline):
+    records = make_records(5, seed=2)
+    columns = {col: [r[col] for r in records] for col in records[0]}
+
+    response = handler.handler({"columns": columns}, None)
+
+    predictions = json.loads(response["body"])["predictions"]
+    np.testing.assert_allclose(predictions, pipeline.predict(records), rtol=1e-5)
+
+
+def test_lambda_rejects_oversized_batches(handler, monkeypatch):
+    monkeypatch.setattr(sys.modules["batch"], "MAX_BATCH_RECORDS", 10)
+    event = {"path": "/predict/batch", "body": json.dumps(make_records(11))}
+
+    assert handler.handler(event, None)["statusCode"] == 413
+
+
+class FakeS3:
+    def __init__(self, meta, objects):
+        self.meta, self.objects = meta, objects
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(json.dumps(self.meta).encode())}
+
+    def download_file(self, bucket, key, filename):
+        from botocore.exceptions import ClientError
+
+        if (bucket, key) not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        shutil.copy(self.objects[(bucket, key)], filename)
+
+
+def _import_with_promotion(meta, objects, tmp_path, monkeypatch):
+    s3 = FakeS3(meta, objects)
+    monkeypatch.setitem(
+        sys.modules, "boto3", types.SimpleNamespace(client=lambda _: s3)
+    )
+    monkeypatch.setenv("MODEL_DIR", str(tmp_path / "not-baked"))
+    monkeypatch.setenv("PRECOMPUTED_PREDICTIONS", "off")
+    monkeypatch.setenv("ONLINE_FEATURES", "off")
+    return _import_fresh("handler", ONDEMAND, monkeypatch)
+
+
+def test_lambda_loads_slim_model_of_legacy_promotion(pipeline, tmp_path, monkeypatch):
+    # Metadata escrita antes del artefacto ligero: sin slim_uri
+    run_id = f"legacy-{tmp_path.name}"
+    slim_dir = write_slim_model(pipeline, tmp_path / "slim")
+    objects = {
+        ("mlflow-models-milk-price-dev", f"promoted/slim/{run_id}/{path.name}"): path
+        for path in slim_dir.iterdir()
+    }
+
+    handler = _import_with_promotion({"run_id": run_id}, objects, tmp_path, monkeypatch)
+
+    records = make_records(3)
+    np.testing.assert_allclose(
+        handler.model.predict(records), pipeline.predict(records), rtol=1e-5
+    )
+
+
+def test_lambda_explains_missing_slim_model(tmp_path, monkeypatch):
+    meta = {"run_id": f"legacy-{tmp_path.name}"}
+
+    with pytest.raises(RuntimeError, match="re-promote"):
+        _import_with_promotion(meta, {}, tmp_path, monkeypatch)
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_local_app_batch_endpoint(tmp_path, monkeypatch):
+    # El modelo que se despliega: pipeline con DictVectorizer
+    (tmp_path / "model").mkdir()
+    shutil.copy(LOCAL / "model" / "model.pkl", tmp_path / "model" / "model.pkl")
+    with open(tmp_path / "model" / "model.pkl", "rb") as f:
+        shipped = pickle.load(f)
+    monkeypatch.chdir(tmp_path)  # sin reports/: el índice queda vacío
+    app = _import_fresh("app", LOCAL, monkeypatch).app
+    records = make_records(50, seed=3)
+    lines = "\n".join(json.dumps(r) for r in records)
+
+    with app.test_client() as client:
+        response = client.post(
+            "/predict/batch", data=lines, content_type="application/x-ndjson"
+        )
+        listed = client.post("/predict/batch", json={"records": records})
+        empty = client.post("/predict/batch", json={"records": []})
+
+    expected = shipped.predict(records)
+    assert response.status_code == listed.status_code == 200
+    np.testing.assert_allclose(response.get_json()["predictions"], expected, rtol=1e-6)
+    np.testing.assert_allclose(listed.get_json()["predictions"], expected, rtol=1e-6)
+    assert empty.status_code == 400
+    sys.modules.pop("app", None)
+
+
+def test_batch_copies_are_identical():
+    first, *others = (path.read_text() for path in BATCH_COPIES)
+    assert all(other == first for other in others)
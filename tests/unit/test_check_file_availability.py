@@ -1,5 +1,15 @@
 from datetime import datetime
-from orchestration.tasks.check_file_availability import _is_file_available_logic
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import fsspec.implementations.local
+from orchestration.tasks.check_file_availability import (
+    _dates_needing_ingestion_logic,
+    _ingested_dates,
+    _is_file_available_logic,
+)
 
 
 def test_future_date_returns_false():
@@ -8,3 +18,79 @@ def test_future_date_returns_false():
 
 def test_past_date_returns_false():
     assert _is_file_available_logic(datetime(2022, 1, 1)) is False
+
+
+# --- Variante por lotes contra un servidor HTTP local ---
+
+PUBLISHED = {"Leche28072025.xlsx", "Leche30072025.xlsx", "Leche01082025.xlsx"}
+SLOW = {"Leche31072025.xlsx"}
+
+
+class FakeSNIIM(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        name = self.path.rsplit("/", 1)[-1]
+        if name in SLOW:
+            time.sleep(1)
+        self.send_response(200 if name in PUBLISHED | SLOW else 404)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sniim_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSNIIM)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/Otros"
+    server.shutdown()
+
+
+def test_batched_check_returns_published_dates_not_ingested(tmp_path, sniim_url):
+    daily = tmp_path / "daily/2025/07"
+    daily.mkdir(parents=True)
+    (daily / "2025-07-28-data.parquet").touch()
+
+    dates = _dates_needing_ingestion_logic(
+        datetime(2025, 7, 27),
+        datetime(2025, 8, 1),
+        daily_root=str(tmp_path / "daily"),
+        base_url=sniim_url,
+        timeout=0.5,
+    )
+
+    # 28: ya ingerido; 31: el HEAD excede el timeout
+    assert dates == [datetime(2025, 7, 30), datetime(2025, 8, 1)]
+
+
+def test_ingested_dates_come_from_the_index_without_listing_the_datalake(
+    tmp_path, monkeypatch
+):
+    compacted = tmp_path / "compacted"
+    compacted.mkdir()
+    dates = ["2025-07-27T00:00:00", "2025-07-28T00:00:00"]
+    entry = {
+        "year": 2025,
+        "month": 7,
+        "min_date": dates[0],
+        "max_date": dates[-1],
+        "dates": dates,
+        "path": str(compacted / "year=2025/month=7/data.parquet"),
+    }
+    (compacted / "_index.json").write_text(json.dumps({"partitions": [entry]}))
+    # Llegó después de la compactación
+    daily = tmp_path / "daily/2025/07"
+    daily.mkdir(parents=True)
+    (daily / "2025-07-30-data.parquet").touch()
+
+    def no_find(*args, **kwargs):
+        raise AssertionError("listed the whole datalake")
+
+    monkeypatch.setattr(fsspec.implementations.local.LocalFileSystem, "find", no_find)
+
+    ingested = _ingested_dates(
+        str(tmp_path / "daily"), datetime(2025, 7, 28, 13), datetime(2025, 7, 31)
+    )
+
+    assert ingested == {datetime(2025, 7, 28).date(), datetime(2025, 7, 30).date()}
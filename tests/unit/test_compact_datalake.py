@@ -0,0 +1,96 @@
+import json
+import pandas as pd
+import pytest
+import orchestration.tasks.prepare_full_dataset_s3 as prepare_module
+from orchestration.tasks.compact_datalake import compact_datalake_fn, read_window
+from orchestration.tasks.prepare_full_dataset_s3 import prepare_full_dataset_s3
+from test_prepare_full_dataset_incremental import write_daily_partitions
+
+
+def test_compaction_writes_hive_months_and_index(tmp_path):
+    root = tmp_path / "daily"
+    write_daily_partitions(root, pd.date_range("2025-06-25", "2025-07-05"))
+
+    result = compact_datalake_fn(daily_root=str(root))
+
+    assert result["compacted"] == ["2025-06", "2025-07"]
+    assert (tmp_path / "compacted/year=2025/month=07/data.parquet").exists()
+
+    index = json.loads((tmp_path / "compacted/_index.json").read_text())
+    june = index["partitions"][0]
+    assert (june["min_date"], june["max_date"]) == ("2025-06-25", "2025-06-30")
+    assert june["num_rows"] == 6 * 3
+
+    # Una segunda corrida sin días nuevos no reescribe nada
+    assert compact_datalake_fn(daily_root=str(root))["compacted"] == []
+
+
+def test_index_reads_match_daily_listing(tmp_path):
+    root = tmp_path / "daily"
+    write_daily_partitions(root, pd.date_range("2025-06-20", "2025-07-31"))
+    kwargs = dict(reference_date="2025-07-31", lookback_days=30, s3_root=str(root))
+
+    listed = tmp_path / "listed.parquet"
+    prepare_full_dataset_s3.fn(output_path=str(listed), **kwargs)
+
+    compact_datalake_fn(daily_root=str(root), months=[(2025, 6)])
+    # Julio sigue sin compactar: se lee como cola diaria
+    indexed = tmp_path / "indexed.parquet"
+    prepare_full_dataset_s3.fn(output_path=str(indexed), **kwargs)
+
+    pd.testing.assert_frame_equal(pd.read_parquet(indexed), pd.read_parquet(listed))
+
+
+def test_read_window_returns_none_without_index(tmp_path):
+    assert read_window(str(tmp_path / "daily"), pd.Timestamp("2025-01-01")) is None
+
+
+def test_incremental_plans_new_partitions_from_index(tmp_path, monkeypatch):
+    root = tmp_path / "daily"
+    fechas = pd.date_range("2025-06-20", "2025-08-03", freq="D")
+    write_daily_partitions(root, fechas[:-2])
+    compact_datalake_fn(daily_root=str(root))
+
+    kwargs = dict(lookback_days=30, s3_root=str(root))
+    inc_path = tmp_path / "inc.parquet"
+    prepare_full_dataset_s3.fn(
+        reference_date="2025-08-01", output_path=str(inc_path), **kwargs
+    )
+
+    # Con índice no se listan prefijos: los días nuevos salen de la cola diaria
+    monkeypatch.setattr(
+        prepare_module,
+        "_list_window_partitions",
+        lambda *args: pytest.fail("listed the datalake despite the index"),
+    )
+    write_daily_partitions(root, fechas[-2:])
+    for day in ["2025-08-02", "2025-08-03"]:
+        prepare_full_dataset_s3.fn(
+            reference_date=day, output_path=str(inc_path), incremental=True, **kwargs
+        )
+
+    full_path = tmp_path / "full.parquet"
+    prepare_full_dataset_s3.fn(
+        reference_date="2025-08-03", output_path=str(full_path), **kwargs
+    )
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(inc_path), pd.read_parquet(full_path), check_exact=False
+    )
+
+
+def test_months_missing_from_the_index_are_read_from_daily_keys(tmp_path):
+    root = tmp_path / "daily"
+    write_daily_partitions(root, pd.date_range("2025-06-20", "2025-08-05"))
+    kwargs = dict(reference_date="2025-08-05", lookback_days=40, s3_root=str(root))
+
+    listed = tmp_path / "listed.parquet"
+    prepare_full_dataset_s3.fn(output_path=str(listed), **kwargs)
+
+    # Julio nunca se compactó (p. ej. una caída): hueco en el índice
+    compact_datalake_fn(daily_root=str(root), months=[(2025, 6), (2025, 8)])
+    indexed = tmp_path / "indexed.parquet"
+    prepare_full_dataset_s3.fn(output_path=str(indexed), **kwargs)
+
+    df = pd.read_parquet(indexed)
+    assert df["Fecha"].dt.month.eq(7).any()
+    pd.testing.assert_frame_equal(df, pd.read_parquet(listed))
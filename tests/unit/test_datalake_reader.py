@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+from orchestration.tasks.datalake_reader import read_partitions, read_partitions_df
+
+
+def write_partitions(root, n=5):
+    paths = []
+    for i in range(n):
+        df = pd.DataFrame(
+            {
+                "Fecha": pd.to_datetime([f"2025-07-{i + 1:02d}"] * 2),
+                "Estado": ["Jalisco", "Sonora"],
+                "Precio": [25.0 + i, None if i == 2 else 30.0 + i],
+            }
+        )
+        path = root / f"2025-07-{i + 1:02d}-data.parquet"
+        df.to_parquet(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def test_reads_all_partitions_in_order(tmp_path):
+    paths = write_partitions(tmp_path)
+
+    table = read_partitions(paths, max_concurrency=2)
+    expected = pd.concat([pd.read_parquet(p) for p in paths], ignore_index=True)
+
+    assert table.num_rows == 10
+    pd.testing.assert_frame_equal(table.to_pandas(), expected)
+
+
+def test_reads_column_subset(tmp_path):
+    paths = write_partitions(tmp_path)
+
+    df = read_partitions_df(paths, columns=["Precio"], max_concurrency=1)
+
+    assert list(df.columns) == ["Precio"]
+
+
+def test_empty_paths_raise():
+    with pytest.raises(FileNotFoundError):
+        read_partitions([])
+
+
+def test_mixed_date_and_timestamp_partitions(tmp_path):
+    ingested = pd.DataFrame({"Fecha": [pd.Timestamp("2025-08-01").date()]})
+    simulated = pd.DataFrame({"Fecha": pd.to_datetime(["2025-08-02"])})
+    ingested.to_parquet(tmp_path / "a.parquet", index=False)
+    simulated.to_parquet(tmp_path / "b.parquet", index=False)
+
+    df = read_partitions_df([str(tmp_path / "a.parquet"), str(tmp_path / "b.parquet")])
+
+    assert pd.api.types.is_datetime64_any_dtype(df["Fecha"])
+    assert df["Fecha"].dt.day.tolist() == [1, 2]
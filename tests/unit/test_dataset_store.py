@@ -0,0 +1,70 @@
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from orchestration.tasks.dataset_store import feather_path, read_dataset
+from orchestration.tasks.prediction_features import build_prediction_features
+from test_prediction_features import make_history
+from test_prepare_full_dataset_incremental import prepare_fn, write_daily_partitions
+
+
+def prepare(tmp_path):
+    root = tmp_path / "daily"
+    write_daily_partitions(root, pd.date_range("2025-07-01", "2025-07-31", freq="D"))
+    output = tmp_path / "full_dataset.parquet"
+    prepare_fn(
+        reference_date="2025-07-31",
+        lookback_days=30,
+        s3_root=str(root),
+        output_path=str(output),
+    )
+    return output
+
+
+def test_arrow_copy_matches_parquet(tmp_path):
+    output = prepare(tmp_path)
+    assert feather_path(output).exists()
+
+    columns = ["Estado", "dia_semana", "Precio", "Precio_lag1", "año"]
+    mapped = read_dataset(output, columns=columns)
+
+    assert list(mapped.columns) == columns
+    assert isinstance(mapped["Estado"].dtype, pd.CategoricalDtype)
+    expected = pd.read_parquet(output, columns=columns)
+    pd.testing.assert_frame_equal(
+        mapped.astype({"Estado": str, "dia_semana": str}),
+        expected,
+        check_dtype=False,
+    )
+    # Columnas numéricas: vistas sobre el archivo mapeado, sin copia
+    assert not mapped["Precio_lag1"].to_numpy().flags.owndata
+    assert np.isnan(mapped["Precio_lag1"]).sum() == expected["Precio_lag1"].isna().sum()
+
+
+def test_stale_arrow_copy_falls_back_to_parquet(tmp_path):
+    output = prepare(tmp_path)
+    df = pd.read_parquet(output)
+    df["Precio"] = 1.0
+    df.to_parquet(output, index=False)
+    arrow_mtime = feather_path(output).stat().st_mtime
+    os.utime(output, (arrow_mtime + 10, arrow_mtime + 10))
+
+    result = read_dataset(output, columns=["Ciudad", "Precio"])
+
+    assert (result["Precio"] == 1.0).all()
+    assert isinstance(result["Ciudad"].dtype, pd.CategoricalDtype)
+
+
+def test_prediction_features_accept_categorical_dimensions():
+    df = make_history()
+    dims = ["Estado", "Ciudad", "Tipo", "Canal"]
+    as_categories = df.astype({col: "category" for col in dims})
+    target = datetime(2025, 7, 31)
+
+    pd.testing.assert_frame_equal(
+        build_prediction_features(as_categories, target).astype(
+            {col: str for col in dims}
+        ),
+        build_prediction_features(df, target),
+        check_dtype=False,
+    )
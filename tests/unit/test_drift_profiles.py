@@ -0,0 +1,164 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from orchestration.tasks import monitor_data_drift_from_s3 as monitor
+from orchestration.tasks.drift_profiles import (
+    CATEGORICAL,
+    ProfileCache,
+    compare,
+    day_profile,
+    empty_profile,
+    merge,
+)
+
+
+def make_days(start, end, rows_per_day=50, shift=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for day in pd.date_range(start, end):
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Fecha": day,
+                    "Estado": rng.choice(["Jalisco", "Puebla"], rows_per_day),
+                    "Ciudad": rng.choice(["Guadalajara", "Puebla"], rows_per_day),
+                    "Tipo": rng.choice(
+                        ["Pasteurizada", "Ultrapasteurizada"], rows_per_day
+                    ),
+                    "Canal": rng.choice(["Tiendas", "Autoservicio"], rows_per_day),
+                    "Precio": rng.normal(25.0 + shift, 2.0, rows_per_day),
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def days(start, end):
+    return [d.strftime("%Y-%m-%d") for d in pd.date_range(start, end)]
+
+
+def test_sliding_matches_a_full_recompute():
+    df = make_days("2025-06-01", "2025-07-15")
+    cache = ProfileCache()
+    cache.add_days(df, days("2025-06-01", "2025-07-15"))
+
+    cache.slide("reference", days("2025-06-01", "2025-06-30"))
+    slid = cache.slide("reference", days("2025-06-16", "2025-07-15"))
+
+    window = df[df["Fecha"] >= "2025-06-16"]
+    full = day_profile(window, cache.edges)
+    assert slid["rows"] == full["rows"] == len(window)
+    assert slid["hist"] == full["hist"] and slid["freq"] == full["freq"]
+    np.testing.assert_allclose(slid["moments"]["Precio"], full["moments"]["Precio"])
+
+
+def test_drift_is_flagged_only_on_shifted_data():
+    reference = make_days("2025-01-01", "2025-06-30")
+    same = make_days("2025-07-01", "2025-07-30", seed=1)
+    shifted = make_days("2025-07-01", "2025-07-30", shift=3.0, seed=1)
+    shifted.loc[shifted.index % 3 == 0, ["Ciudad", "Estado"]] = "Monterrey"
+    cache = ProfileCache()
+    cache.add_days(reference, [])
+    ref = day_profile(reference, cache.edges)
+
+    assert (
+        compare(ref, day_profile(same, cache.edges), cache.edges)["drifted_columns"]
+        == []
+    )
+
+    result = compare(ref, day_profile(shifted, cache.edges), cache.edges)
+    assert result["drift_detected"] is True
+    assert result["drifted_columns"] == ["Precio", "Estado", "Ciudad"]
+    assert result["columns"]["Ciudad"]["new_categories"] == ["Monterrey"]
+    median = result["columns"]["Precio"]["current_quantiles"][1]
+    assert median == pytest.approx(28.0, abs=0.3)
+
+
+def test_small_samples_use_ks_and_chi_square():
+    df = make_days("2025-07-01", "2025-07-10", rows_per_day=40, seed=2)
+    cur = make_days("2025-07-11", "2025-07-20", rows_per_day=40, shift=1.0, seed=3)
+    cache = ProfileCache()
+    cache.add_days(df, [])
+    result = compare(
+        day_profile(df, cache.edges), day_profile(cur, cache.edges), cache.edges
+    )
+
+    precio = result["columns"]["Precio"]
+    exact = stats.ks_2samp(df["Precio"], cur["Precio"])
+    assert precio["method"] == "ks"
+    # El histograma de 200 cubetas aproxima el KS exacto
+    assert precio["ks"] == pytest.approx(exact.statistic, abs=0.02)
+    assert precio["drift"] is True
+    assert {result["columns"][col]["method"] for col in CATEGORICAL} == {"chisquare"}
+
+
+def test_cache_round_trip_and_forget(tmp_path):
+    df = make_days("2025-07-01", "2025-07-05")
+    cache = ProfileCache()
+    cache.add_days(df, days("2025-07-01", "2025-07-06"))
+    cache.slide("current", days("2025-07-01", "2025-07-05"))
+
+    loaded = ProfileCache.load(cache.save(tmp_path / "profiles.json"))
+    loaded.forget_before("2025-07-03")
+
+    assert loaded.edges == cache.edges and loaded.windows == cache.windows
+    assert sorted(loaded.days) == days("2025-07-03", "2025-07-06")
+    assert loaded.days["2025-07-06"] == empty_profile(cache.edges)
+
+
+def test_merge_removes_what_it_added():
+    df = make_days("2025-07-01", "2025-07-02")
+    cache = ProfileCache()
+    cache.add_days(df, days("2025-07-01", "2025-07-02"))
+    total = empty_profile(cache.edges)
+
+    merge(total, cache.days["2025-07-01"])
+    merge(total, cache.days["2025-07-02"])
+    merge(total, cache.days["2025-07-01"], -1)
+
+    assert total["hist"] == cache.days["2025-07-02"]["hist"]
+    assert total["freq"] == cache.days["2025-07-02"]["freq"]
+
+
+@pytest.fixture
+def fake_datalake(monkeypatch):
+    datalake = make_days("2025-01-01", "2025-08-01")
+    reads = []
+
+    def load_days(fs, bucket, prefix, start, end, max_concurrency):
+        reads.append((start, end))
+        return datalake[(datalake["Fecha"] >= start) & (datalake["Fecha"] <= end)]
+
+    monkeypatch.setattr(monitor, "get_filesystem", lambda *args: None)
+    monkeypatch.setattr(monitor, "_load_days", load_days)
+    monkeypatch.setattr(monitor, "_render_report", lambda *args: "report.html")
+    return reads
+
+
+def test_task_reads_only_the_days_it_has_not_profiled(fake_datalake, tmp_path):
+    kwargs = dict(cache_path=str(tmp_path / "profiles.json"))
+
+    first = monitor.monitor_data_drift_from_s3.fn(
+        execution_date=datetime(2025, 7, 31), **kwargs
+    )
+    second = monitor.monitor_data_drift_from_s3.fn(
+        execution_date=datetime(2025, 8, 1), render_report=True, **kwargs
+    )
+
+    assert fake_datalake == [
+        (datetime(2025, 1, 2), datetime(2025, 7, 31)),
+        (datetime(2025, 8, 1), datetime(2025, 8, 1)),
+    ]
+    assert first["drift_detected"] is False and first["report_path"] is None
+    assert second["report_path"] == "report.html"
+    assert second["current_rows"] == 31 * 50 and second["reference_rows"] == 180 * 50
+
+
+def test_task_needs_both_windows(fake_datalake, tmp_path):
+    with pytest.raises(ValueError):
+        monitor.monitor_data_drift_from_s3.fn(
+            execution_date=datetime(2025, 12, 31),
+            cache_path=str(tmp_path / "profiles.json"),
+        )
@@ -0,0 +1,114 @@
+import importlib.util
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+from orchestration.tasks.export_slim_model import write_slim_model
+from orchestration.tasks.feature_encoder import (
+    CATEGORICAL,
+    NUMERICAL,
+    CategoricalEncoder,
+)
+from orchestration.tasks.model_specs import build_random_forest, build_xgboost
+
+ROOT = Path(__file__).resolve().parents[2]
+SERVING_COPIES = [
+    ROOT / "deployment" / "ondemand" / "slim_model.py",
+    ROOT / "iac" / "code" / "slim_model.py",
+]
+
+spec = importlib.util.spec_from_file_location("slim_model", SERVING_COPIES[0])
+slim_model = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(slim_model)
+
+XGB_PARAMS = {
+    "max_depth": 4,
+    "learning_rate": 0.3,
+    "n_estimators": 20,
+    "min_child_weight": 1,
+    "gamma": 0,
+    "subsample": 1.0,
+    "colsample_bytree": 1.0,
+}
+RF_PARAMS = {
+    "n_estimators": 10,
+    "max_depth": 6,
+    "min_samples_split": 2,
+    "min_samples_leaf": 1,
+}
+
+
+def make_frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "Estado": rng.choice(["Jalisco", "Puebla", "Sonora"], n),
+            "Ciudad": rng.choice(["Guadalajara", "Puebla", "Hermosillo", "León"], n),
+            "Tipo": rng.choice(["Pasteurizada", "Ultrapasteurizada"], n),
+            "Canal": rng.choice(["Autoservicio", "Tienda"], n),
+            "dia_semana": rng.choice(["Lunes", "Martes", "Viernes"], n),
+            "Precio_lag1": rng.normal(25, 2, n),
+            "Precio_mean7": rng.normal(25, 1, n),
+            "mes": rng.integers(1, 13, n),
+            "dia": rng.integers(1, 29, n),
+            "año": rng.integers(2023, 2026, n),
+        }
+    )
+    y = df["Precio_lag1"] + (df["Tipo"] == "Ultrapasteurizada") * 3.0
+    return df, y.to_numpy()
+
+
+def fit_pipeline(kind):
+    df, y = make_frame()
+    if kind == "rf":
+        encoder = CategoricalEncoder()
+        model = build_random_forest(RF_PARAMS, n_jobs=1)
+    else:
+        native = kind == "xgb-native"
+        encoder = CategoricalEncoder(encoding="category" if native else "onehot")
+        model = build_xgboost(XGB_PARAMS, n_jobs=1, native=native)
+    return Pipeline([("vectorizer", encoder), ("regressor", model)]).fit(df, y)
+
+
+@pytest.mark.parametrize("kind", ["rf", "xgb", "xgb-native"])
+def test_slim_model_matches_the_pipeline(tmp_path, kind):
+    pipeline = fit_pipeline(kind)
+    write_slim_model(pipeline, tmp_path)
+    model = slim_model.SlimModel(tmp_path)
+
+    rows = make_frame(n=50, seed=1)[0].to_dict(orient="records")
+    # Categoría no vista, columna faltante y valor nulo
+    rows[0]["Ciudad"] = "Mérida"
+    del rows[1]["Canal"]
+    rows[2]["Estado"] = None
+
+    expected = pipeline.predict(pd.DataFrame(rows))
+    np.testing.assert_allclose(model.predict(rows), expected, rtol=1e-5)
+
+
+def test_single_dict_payload(tmp_path):
+    pipeline = fit_pipeline("xgb")
+    write_slim_model(pipeline, tmp_path)
+    row = make_frame(n=1, seed=2)[0].to_dict(orient="records")[0]
+
+    prediction = slim_model.SlimModel(tmp_path).predict(row)
+
+    assert prediction.shape == (1,)
+    np.testing.assert_allclose(prediction, pipeline.predict([row]), rtol=1e-5)
+
+
+def test_manifest_keeps_the_encoder_vocabulary(tmp_path):
+    pipeline = fit_pipeline("rf")
+    write_slim_model(pipeline, tmp_path)
+
+    manifest = slim_model.SlimModel(tmp_path).manifest
+
+    assert manifest["categorical"] == CATEGORICAL
+    assert manifest["numerical"] == NUMERICAL
+    assert manifest["categories"]["Tipo"] == ["Pasteurizada", "Ultrapasteurizada"]
+
+
+def test_serving_copies_are_identical():
+    first, second = (path.read_text() for path in SERVING_COPIES)
+    assert first == second
@@ -0,0 +1,129 @@
+import pickle
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction import DictVectorizer
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+
+CATEGORICAL = ["Estado", "Ciudad", "Tipo", "Canal", "dia_semana"]
+NUMERICAL = ["Precio_lag1", "Precio_mean7", "mes"]
+
+
+def make_features():
+    return pd.DataFrame(
+        {
+            "Estado": ["Jalisco", "Jalisco", "Sonora", "Yucatán"],
+            "Ciudad": ["Guadalajara", "Puerto Vallarta", "Hermosillo", "Mérida"],
+            "Tipo": ["Pasteurizada", "Ultrapasteurizada"] * 2,
+            "Canal": ["Tiendas", "Tiendas", "Autoservicios", "Tiendas"],
+            "dia_semana": ["Monday", "Tuesday", "Monday", "Friday"],
+            "Precio_lag1": [27.5, np.nan, 25.0, 0.0],
+            "Precio_mean7": [27.1, 28.0, 25.2, 24.9],
+            "mes": [7, 7, 8, 8],
+        }
+    )
+
+
+def test_onehot_matches_dict_vectorizer():
+    df = make_features()
+    encoder = CategoricalEncoder(CATEGORICAL, NUMERICAL).fit(df)
+    dv = DictVectorizer().fit(df.to_dict(orient="records"))
+
+    ours = pd.DataFrame(
+        encoder.transform(df).toarray(), columns=encoder.get_feature_names_out()
+    )
+    theirs = pd.DataFrame(
+        dv.transform(df.to_dict(orient="records")).toarray(),
+        columns=dv.get_feature_names_out(),
+    )
+    pd.testing.assert_frame_equal(ours, theirs[ours.columns])
+
+
+@pytest.mark.parametrize("encoding", ["onehot", "ordinal"])
+def test_accepts_dict_payloads(encoding):
+    df = make_features()
+    encoder = CategoricalEncoder(CATEGORICAL, NUMERICAL, encoding=encoding).fit(df)
+
+    def dense(X):
+        X = encoder.transform(X)
+        return X.toarray() if hasattr(X, "toarray") else X
+
+    records = df.to_dict(orient="records")
+    np.testing.assert_array_equal(dense(records), dense(df))
+    np.testing.assert_array_equal(dense(records[0]), dense(df.iloc[:1]))
+
+
+def test_unseen_categories_and_missing_columns_encode_as_zeros():
+    encoder = CategoricalEncoder(CATEGORICAL, NUMERICAL).fit(make_features())
+    X = encoder.transform({"Estado": "Oaxaca", "Ciudad": "Guadalajara"}).toarray()
+
+    names = list(encoder.get_feature_names_out())
+    assert X.sum() == 1
+    assert X[0, names.index("Ciudad=Guadalajara")] == 1
+
+
+def test_category_encoding_keeps_training_categories():
+    df = make_features()
+    encoder = CategoricalEncoder(CATEGORICAL, NUMERICAL, encoding="category").fit(df)
+
+    X = encoder.transform([{"Estado": "Oaxaca", "Ciudad": "Mérida", "mes": 8}])
+
+    assert list(X.columns) == CATEGORICAL + NUMERICAL
+    assert list(X["Ciudad"].cat.categories) == sorted(df["Ciudad"])
+    assert X["Ciudad"][0] == "Mérida"
+    assert X[["Estado", "Tipo"]].isna().all(axis=None)
+    assert X["mes"][0] == 8
+
+
+def test_cloudpickled_pipeline_loads_without_the_repo(tmp_path):
+    import cloudpickle
+    import orchestration.tasks.feature_encoder as feature_encoder
+
+    encoder = CategoricalEncoder(CATEGORICAL, NUMERICAL).fit(make_features())
+    cloudpickle.register_pickle_by_value(feature_encoder)
+    try:
+        payload = cloudpickle.dumps(encoder)
+    finally:
+        cloudpickle.unregister_pickle_by_value(feature_encoder)
+
+    path = tmp_path / "model.pkl"
+    path.write_bytes(payload)
+    script = (
+        "import pickle, sys; "
+        f"m = pickle.load(open({str(path)!r}, 'rb')); "
+        "print(m.transform({'Estado': 'Sonora'}).sum())"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PATH": ""},
+    )
+    assert out.stdout.strip() == "1.0"
+
+
+def test_log_pipeline_restores_pickle_registry(monkeypatch):
+    import cloudpickle
+    import mlflow.sklearn
+    from sklearn.pipeline import make_pipeline
+    from orchestration.tasks.feature_encoder import log_pipeline
+
+    seen = []
+    monkeypatch.setattr(
+        mlflow.sklearn,
+        "log_model",
+        lambda *args, **kwargs: seen.append(
+            set(cloudpickle.list_registry_pickle_by_value())
+        ),
+    )
+    encoder = CategoricalEncoder(CATEGORICAL, NUMERICAL).fit(make_features())
+    log_pipeline(make_pipeline(encoder))
+
+    assert "orchestration.tasks.feature_encoder" in seen[0]
+    assert "orchestration.tasks.feature_encoder" not in (
+        cloudpickle.list_registry_pickle_by_value()
+    )
@@ -0,0 +1,184 @@
+import importlib.util
+import json
+import pickle
+import sys
+import types
+from datetime import date, datetime
+from pathlib import Path
+import numpy as np
+import pytest
+from orchestration.tasks.export_online_features import build_online_features
+from orchestration.tasks.export_slim_model import write_slim_model
+from orchestration.tasks.prediction_features import build_prediction_features
+from test_batch_predictions import (
+    LOCAL,
+    ONDEMAND,
+    _import_fresh,
+    pipeline,
+)  # noqa: F401
+from test_prediction_features import make_history
+from test_prediction_index import FakeS3
+
+ROOT = Path(__file__).resolve().parents[2]
+COPIES = [
+    ROOT / "deployment" / "local" / "feature_store.py",
+    ROOT / "deployment" / "ondemand" / "feature_store.py",
+    ROOT / "iac" / "code" / "feature_store.py",
+]
+
+spec = importlib.util.spec_from_file_location("feature_store", COPIES[0])
+feature_store = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(feature_store)
+
+BARE = {
+    "Estado": "Jalisco",
+    "Ciudad": "Guadalajara",
+    "Tipo": "Pasteurizada",
+    "Canal": "Tiendas",
+}
+
+
+@pytest.fixture
+def history():
+    return make_history()
+
+
+@pytest.fixture
+def features_csv(history, tmp_path):
+    path = tmp_path / "online_features_2025-07-31.csv"
+    build_online_features(history).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def store(features_csv):
+    store = feature_store.OnlineFeatureStore()
+    assert store.load_latest_local(features_csv.parent)
+    return store
+
+
+def test_table_matches_the_next_day_prediction_features(history, store):
+    expected = build_prediction_features(history, datetime(2025, 8, 1))
+
+    enriched = store.enrich(expected[list(BARE)].to_dict(orient="records"))
+
+    np.testing.assert_allclose(
+        [r["Precio_lag1"] for r in enriched], expected["Precio_lag1"]
+    )
+    np.testing.assert_allclose(
+        [r["Precio_mean7"] for r in enriched], expected["Precio_mean7"]
+    )
+
+
+def test_bare_request_gets_the_features_of_the_next_day(store):
+    (record,) = store.enrich([BARE])
+
+    assert store.target_date == date(2025, 8, 1)
+    assert {k: record[k] for k in ("año", "mes", "dia", "dia_semana")} == {
+        "año": 2025,
+        "mes": 8,
+        "dia": 1,
+        "dia_semana": "Friday",
+    }
+    assert set(feature_store.FEATURE_COLS) <= set(record)
+
+
+def test_client_fields_win_and_unknown_series_pass_through(store):
+    unknown = {**BARE, "Ciudad": "Zapopan"}
+    complete = {**BARE, **dict.fromkeys(feature_store.FEATURE_COLS, 1)}
+
+    partial, same_unknown, same_complete = store.enrich(
+        [{**BARE, "Precio_lag1": 99.0}, unknown, complete]
+    )
+
+    assert partial["Precio_lag1"] == 99.0
+    assert same_unknown is unknown and same_complete is complete
+    assert store.stats()["enriched"] == 1
+    assert store.stats()["unknown_series"] == 1
+
+
+def test_refresh_from_s3_loads_the_newest_table_once(features_csv):
+    s3 = FakeS3(
+        {
+            "features/online/2025-07-30/online_features_2025-07-30.csv": b"",
+            "features/online/2025-07-31/online_features_2025-07-31.csv": features_csv.read_bytes(),
+        }
+    )
+    store = feature_store.OnlineFeatureStore()
+
+    assert store.refresh_from_s3(s3) is True
+    assert store.refresh_from_s3(s3) is False
+    assert s3.downloads == ["features/online/2025-07-31/online_features_2025-07-31.csv"]
+    assert len(store) == 4
+
+
+def test_local_app_enriches_bare_requests(
+    pipeline, features_csv, tmp_path, monkeypatch
+):  # noqa: F811
+    (tmp_path / "model").mkdir()
+    with open(tmp_path / "model" / "model.pkl", "wb") as f:
+        pickle.dump(pipeline, f)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ONLINE_FEATURES_DIR", str(features_csv.parent))
+    app = _import_fresh("app", LOCAL, monkeypatch)
+
+    with app.app.test_client() as client:
+        response = client.post("/predict", json=BARE)
+        stats = client.get("/predict/stats").get_json()
+
+    (enriched,) = app.feature_store.enrich([BARE])
+    np.testing.assert_allclose(
+        response.get_json()["predicted_price"],
+        pipeline.predict([enriched])[0],
+        rtol=1e-6,
+    )
+    assert stats["online_features"]["enriched"] == 1
+    sys.modules.pop("app", None)
+
+
+def test_lambda_enriches_bare_requests(
+    pipeline, features_csv, tmp_path, monkeypatch
+):  # noqa: F811
+    write_slim_model(pipeline, tmp_path / "model")
+    monkeypatch.setenv("MODEL_DIR", str(tmp_path / "model"))
+    monkeypatch.setenv("PRECOMPUTED_PREDICTIONS", "off")
+    monkeypatch.setenv("ONLINE_FEATURES", str(features_csv))
+    handler = _import_fresh("handler", ONDEMAND, monkeypatch)
+
+    response = handler.handler({"body": json.dumps(BARE)}, None)
+
+    (enriched,) = handler.feature_store.enrich([BARE])
+    np.testing.assert_allclose(
+        json.loads(response["body"])["predicted_price"],
+        pipeline.predict([enriched])[0],
+        rtol=1e-5,
+    )
+    sys.modules.pop("handler", None)
+
+
+def test_lambda_loads_online_features_on_the_first_request(
+    pipeline, features_csv, tmp_path, monkeypatch  # noqa: F811
+):
+    write_slim_model(pipeline, tmp_path / "model")
+    s3 = FakeS3({"features/online/2025-07-31/f.csv": features_csv.read_bytes()})
+    clients = []
+    boto3 = types.SimpleNamespace(client=lambda name: clients.append(name) or s3)
+    monkeypatch.setitem(sys.modules, "boto3", boto3)
+    monkeypatch.setenv("MODEL_DIR", str(tmp_path / "model"))
+    monkeypatch.setenv("PRECOMPUTED_PREDICTIONS", "off")
+    monkeypatch.setenv("ONLINE_FEATURES", "s3")
+
+    handler = _import_fresh("handler", ONDEMAND, monkeypatch)
+    # El arranque en frío no lista ni descarga la tabla
+    assert clients == [] and len(handler.feature_store) == 0
+
+    handler.handler({"body": json.dumps(BARE)}, None)
+
+    assert clients == ["s3"] and len(handler.feature_store) == 4
+    assert handler.feature_store.stats()["enriched"] == 1
+    sys.modules.pop("handler", None)
+
+
+def test_copies_are_identical():
+    first, *others = (path.read_text() for path in COPIES)
+    assert all(other == first for other in others)
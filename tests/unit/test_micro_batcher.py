@@ -0,0 +1,156 @@
+import asyncio
+import importlib.util
+import json
+import pickle
+import sys
+import threading
+from pathlib import Path
+import numpy as np
+from starlette.testclient import TestClient
+from test_batch_predictions import (
+    LOCAL,
+    _import_fresh,
+    make_records,
+    pipeline,
+)  # noqa: F401
+
+ROOT = Path(__file__).resolve().parents[2]
+COPIES = [
+    ROOT / "deployment" / "local" / "micro_batcher.py",
+    ROOT / "deployment" / "ondemand" / "micro_batcher.py",
+]
+
+spec = importlib.util.spec_from_file_location("micro_batcher", COPIES[0])
+micro_batcher = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(micro_batcher)
+
+
+def run_concurrently(batcher, records):
+    async def main():
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                *(batcher.predict(record) for record in records),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.stop()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_predict():
+    calls = []
+
+    def predict_fn(records):
+        calls.append(len(records))
+        return [record["x"] * 2 for record in records]
+
+    batcher = micro_batcher.MicroBatcher(predict_fn, max_batch_size=64, max_wait_ms=50)
+
+    results = run_concurrently(batcher, [{"x": i} for i in range(20)])
+
+    assert results == [i * 2.0 for i in range(20)]
+    assert calls == [20]
+    assert batcher.stats()["mean_batch_size"] == 20
+
+
+def test_batches_are_capped_at_max_size():
+    calls = []
+
+    def predict_fn(records):
+        calls.append(len(records))
+        return [0.0] * len(records)
+
+    batcher = micro_batcher.MicroBatcher(predict_fn, max_batch_size=8, max_wait_ms=50)
+
+    run_concurrently(batcher, [{"x": i} for i in range(20)])
+
+    assert calls == [8, 8, 4]
+
+
+def test_a_bad_record_only_fails_its_own_request():
+    def predict_fn(records):
+        if any(record["x"] is None for record in records):
+            raise ValueError("bad record")
+        return [record["x"] for record in records]
+
+    batcher = micro_batcher.MicroBatcher(predict_fn, max_wait_ms=50)
+
+    results = run_concurrently(batcher, [{"x": 1}, {"x": None}, {"x": 3}])
+
+    assert results[0] == 1.0 and results[2] == 3.0
+    assert isinstance(results[1], ValueError)
+
+
+def test_a_short_result_fails_the_whole_batch():
+    batcher = micro_batcher.MicroBatcher(lambda records: [1.0], max_wait_ms=50)
+
+    results = run_concurrently(batcher, [{"x": 1}, {"x": 2}, {"x": 3}])
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert "1 predictions for 3 records" in str(results[0])
+
+
+def test_stop_fails_pending_requests():
+    started = threading.Event()
+    release = threading.Event()
+
+    def predict_fn(records):
+        started.set()
+        release.wait(5)
+        return [0.0] * len(records)
+
+    async def main():
+        batcher = micro_batcher.MicroBatcher(
+            predict_fn, max_batch_size=1, max_wait_ms=0
+        )
+        await batcher.start()
+        pending = [asyncio.create_task(batcher.predict({"x": i})) for i in range(3)]
+        # El primero está en predict_fn; los otros dos siguen en la cola
+        await asyncio.to_thread(started.wait, 5)
+        await batcher.stop()
+        release.set()
+        return await asyncio.wait_for(
+            asyncio.gather(*pending, return_exceptions=True), 1
+        )
+
+    results = asyncio.run(main())
+
+    assert len(results) == 3
+    assert all(isinstance(r, micro_batcher.BatcherStopped) for r in results)
+
+
+def test_local_asgi_app(pipeline, tmp_path, monkeypatch):  # noqa: F811
+    (tmp_path / "model").mkdir()
+    with open(tmp_path / "model" / "model.pkl", "wb") as f:
+        pickle.dump(pipeline, f)
+    monkeypatch.chdir(tmp_path)
+    for module in ("app", "micro_batcher"):
+        sys.modules.pop(module, None)
+    asgi = _import_fresh("asgi", LOCAL, monkeypatch)
+    records = make_records(3, seed=4)
+
+    with TestClient(asgi.app) as client:
+        single = client.post("/predict", json=records[0])
+        batch = client.post("/predict/batch", json={"records": records})
+        bad = client.post("/predict", content=json.dumps("nope"))
+        bad_batch = client.post(
+            "/predict/batch", json={"records": [records[0], {"Estado": 1}]}
+        )
+        stats = client.get("/predict/stats")
+
+    expected = pipeline.predict(records)
+    np.testing.assert_allclose(single.json()["predicted_price"], expected[0], rtol=1e-6)
+    np.testing.assert_allclose(batch.json()["predictions"], expected, rtol=1e-6)
+    assert bad.status_code == 400
+    assert bad_batch.status_code == 400
+    assert bad_batch.json()["error"].startswith("Record 1: Estado")
+    assert stats.json()["microbatching"]["records"] == 1
+    for module in ("app", "asgi", "micro_batcher"):
+        sys.modules.pop(module, None)
+
+
+def test_copies_are_identical():
+    first, second = (path.read_text() for path in COPIES)
+    assert first == second
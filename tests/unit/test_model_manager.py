@@ -0,0 +1,148 @@
+import importlib.util
+import io
+import json
+from pathlib import Path
+import pytest
+
+MODULE = (
+    Path(__file__).resolve().parents[2] / "deployment" / "ondemand" / "model_manager.py"
+)
+spec = importlib.util.spec_from_file_location("model_manager", MODULE)
+model_manager = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(model_manager)
+
+
+class NotModified(Exception):
+    response = {"Error": {"Code": "304"}}
+
+
+class FakeS3:
+    """
+    `get_object` of a single promotion record, honoring If-None-Match.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.promote(1, "run-1")
+
+    def promote(self, version, run_id):
+        self.record = {
+            "model_name": "milk-price-predictor-xgb",
+            "version": str(version),
+            "run_id": run_id,
+            "artifact_uri": f"s3://bucket/2/models/m-{run_id}",
+        }
+        self.etag = f'"{run_id}"'
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        self.calls.append(IfNoneMatch)
+        if IfNoneMatch == self.etag:
+            raise NotModified()
+        body = io.BytesIO(json.dumps(self.record).encode())
+        return {"ETag": self.etag, "Body": body}
+
+
+@pytest.fixture
+def downloads():
+    return []
+
+
+def make_manager(s3, cache_dir, downloads):
+    def download(uri, dst):
+        downloads.append(uri)
+        (Path(dst) / "model.txt").write_text(uri)
+        return dst
+
+    def load(path):
+        return (Path(path) / "model.txt").read_text()
+
+    return model_manager.ModelManager(
+        s3=s3, cache_dir=cache_dir, download=download, load=load
+    )
+
+
+def test_unchanged_record_is_not_reloaded(tmp_path, downloads):
+    s3 = FakeS3()
+    manager = make_manager(s3, tmp_path, downloads)
+
+    assert manager.refresh() is True
+    assert manager.refresh() is False
+
+    assert s3.calls == [None, '"run-1"']
+    assert downloads == [
+        "s3://mlflow-models-milk-price-dev/2/models/m-run-1/artifacts/"
+    ]
+
+
+def test_new_promotion_is_swapped_in(tmp_path, downloads):
+    s3 = FakeS3()
+    manager = make_manager(s3, tmp_path, downloads)
+    in_flight = manager.model
+
+    s3.promote(2, "run-2")
+
+    assert manager.refresh() is True
+    assert manager.meta["version"] == "2"
+    assert manager.model.endswith("m-run-2/artifacts/")
+    # La referencia que ya tenía un request sigue siendo el modelo anterior
+    assert in_flight.endswith("m-run-1/artifacts/")
+
+
+def test_workers_share_the_disk_cache(tmp_path, downloads):
+    s3 = FakeS3()
+    workers = [make_manager(s3, tmp_path, downloads) for _ in range(3)]
+
+    models = [worker.model for worker in workers]
+
+    assert len(downloads) == 1
+    assert len(set(models)) == 1
+    assert [p.name for p in tmp_path.iterdir() if p.is_dir()] == ["1-run-1"]
+
+
+def test_failed_download_leaves_no_partial_copy(tmp_path):
+    def download(uri, dst):
+        (Path(dst) / "partial").write_text("")
+        raise OSError("connection reset")
+
+    manager = model_manager.ModelManager(
+        s3=FakeS3(), cache_dir=tmp_path, download=download, load=str
+    )
+
+    with pytest.raises(OSError):
+        manager.refresh()
+
+    assert [p for p in tmp_path.iterdir() if p.is_dir()] == []
+    # Sin modelo cargado no se guarda la ETag: el siguiente intento descarga
+    assert manager._etag is None
+
+
+def test_swap_keeps_only_the_current_and_previous_versions(tmp_path, downloads):
+    s3 = FakeS3()
+    manager = make_manager(s3, tmp_path, downloads)
+    manager.refresh()
+
+    for version in (2, 3):
+        s3.promote(version, f"run-{version}")
+        manager.refresh()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "2-run-2",
+        "2-run-2.lock",
+        "3-run-3",
+        "3-run-3.lock",
+    ]
+
+
+def test_versions_locked_by_another_worker_are_not_deleted(tmp_path, downloads):
+    s3 = FakeS3()
+    manager = make_manager(s3, tmp_path, downloads)
+    manager.refresh()
+    s3.promote(2, "run-2")
+    manager.refresh()
+
+    with open(tmp_path / "1-run-1.lock") as busy:
+        model_manager.fcntl.flock(busy, model_manager.fcntl.LOCK_EX)
+        s3.promote(3, "run-3")
+        manager.refresh()
+
+    assert (tmp_path / "1-run-1").exists()
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+from orchestration.tasks.model_specs import build_xgboost, early_stopping_rmse
+from orchestration.tasks.tuning import make_folds
+
+PARAMS = {
+    "max_depth": 3,
+    "learning_rate": 0.3,
+    "min_child_weight": 1,
+    "gamma": 0,
+    "subsample": 1.0,
+    "colsample_bytree": 1.0,
+}
+
+
+def make_folds_data(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4))
+    y = 2 * X[:, 0] - X[:, 1] + rng.normal(0, 0.1, size=n)
+    return make_folds(X, y)
+
+
+def test_early_stopping_continues_boosters_between_budgets():
+    folds = make_folds_data()
+    state = {}
+
+    rmse_small, info_small = early_stopping_rmse(PARAMS, 5, folds, state)
+    rmse_large, info_large = early_stopping_rmse(PARAMS, 40, folds, state)
+
+    assert all(state[i][0].num_boosted_rounds() > 5 for i in range(len(folds)))
+    assert info_small["n_rounds"] <= 5 < info_large["n_rounds"] <= 40
+    assert rmse_large < rmse_small
+
+
+def test_early_stopping_marks_converged_folds():
+    folds = make_folds_data()
+
+    _, info = early_stopping_rmse(PARAMS, 1000, folds)
+
+    assert info["converged"]
+    assert info["n_rounds"] < 1000
+
+
+def test_fold_matrices_are_cached_per_search_only():
+    folds = make_folds_data()
+    dmatrices = {}
+
+    early_stopping_rmse(PARAMS, 5, folds, dmatrices=dmatrices)
+    first = dict(dmatrices)
+    early_stopping_rmse(PARAMS, 10, folds, dmatrices=dmatrices)
+    assert all(dmatrices[i] is first[i] for i in first)
+
+    # Otros folds con el mismo dict: se reconstruyen, no se reutilizan
+    other = make_folds_data(seed=1)
+    early_stopping_rmse(PARAMS, 5, other, dmatrices=dmatrices)
+    assert all(dmatrices[i][0] is other[i] for i in range(len(other)))
+
+
+def test_native_xgboost_pipeline_predicts_dict_payloads():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "Ciudad": rng.choice(["Mérida", "Hermosillo", "Toluca"], size=300),
+            "Precio_lag1": rng.uniform(20, 30, size=300),
+        }
+    )
+    offset = df["Ciudad"].map({"Mérida": 0.0, "Hermosillo": 5.0, "Toluca": -5.0})
+    y = df["Precio_lag1"] + offset
+
+    encoder = CategoricalEncoder(["Ciudad"], ["Precio_lag1"], encoding="category")
+    model = build_xgboost({**PARAMS, "n_estimators": 50}, native=True)
+    pipeline = Pipeline([("vectorizer", encoder), ("regressor", model)]).fit(df, y)
+
+    pred = pipeline.predict(
+        [
+            {"Ciudad": "Hermosillo", "Precio_lag1": 25.0},
+            {"Ciudad": "Toluca", "Precio_lag1": 25.0},
+        ]
+    )
+    assert abs(pred[0] - 30.0) < 1.0
+    assert abs(pred[1] - 20.0) < 1.0
+    np.testing.assert_allclose(
+        pipeline.predict(df.iloc[:5]),
+        pipeline.predict(df.iloc[:5].to_dict(orient="records")),
+    )
+
+
+def test_early_stopping_accepts_category_frames():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        {
+            "Ciudad": pd.Categorical(rng.choice(["a", "b", "c"], size=300)),
+            "x": rng.normal(size=300),
+        }
+    )
+    y = frame["x"] * 2 + frame["Ciudad"].cat.codes
+
+    rmse, info = early_stopping_rmse(PARAMS, 40, make_folds(frame, y))
+
+    assert rmse < 0.5
+    assert info["n_rounds"] <= 40
@@ -0,0 +1,47 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from orchestration.tasks.prediction_features import (
+    build_prediction_features,
+    build_prediction_features_loop,
+)
+
+
+def make_history(n_days=12):
+    rng = np.random.default_rng(0)
+    fechas = pd.date_range("2025-07-20", periods=n_days, freq="D")
+    series = [
+        ("Jalisco", "Guadalajara", "Pasteurizada", "Tiendas"),
+        ("Jalisco", "Guadalajara", "Pasteurizada", "Autoservicios"),
+        ("Sonora", "Hermosillo", "Ultrapasteurizada", "Tiendas"),
+    ]
+    rows = []
+    for fecha in fechas:
+        for estado, ciudad, tipo, canal in series:
+            rows.append((fecha, estado, ciudad, tipo, canal, rng.uniform(20, 35)))
+    df = pd.DataFrame(
+        rows, columns=["Fecha", "Estado", "Ciudad", "Tipo", "Canal", "Precio"]
+    )
+    # Serie que sólo aparece después de la fecha objetivo
+    df.loc[len(df)] = [fechas[-1], "Yucatán", "Mérida", "Pasteurizada", "Tiendas", 30]
+    df.loc[df.sample(frac=0.2, random_state=1).index, "Precio"] = np.nan
+    return df.sample(frac=1.0, random_state=2).reset_index(drop=True)
+
+
+def test_vectorized_matches_loop():
+    df = make_history()
+    target = datetime(2025, 7, 31, 13, 0)
+
+    expected = build_prediction_features_loop(df, target)
+    result = build_prediction_features(df, target)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert result.to_csv(index=False) == expected.to_csv(index=False)
+
+
+def test_series_without_history_are_skipped():
+    df = make_history()
+    result = build_prediction_features(df, datetime(2025, 7, 31))
+
+    assert "Mérida" not in result["Ciudad"].values
+    assert len(result) == 3
@@ -0,0 +1,237 @@
+import importlib.util
+import io
+import json
+import sys
+import types
+from datetime import date, timedelta
+from pathlib import Path
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+from orchestration.tasks.export_slim_model import write_slim_model
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+from orchestration.tasks.model_specs import build_xgboost
+from test_batch_predictions import ONDEMAND, XGB_PARAMS, _import_fresh, make_records
+
+ROOT = Path(__file__).resolve().parents[2]
+COPIES = [
+    ROOT / "deployment" / "local" / "prediction_index.py",
+    ROOT / "deployment" / "ondemand" / "prediction_index.py",
+    ROOT / "iac" / "code" / "prediction_index.py",
+]
+
+spec = importlib.util.spec_from_file_location("prediction_index", COPIES[1])
+prediction_index = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(prediction_index)
+
+SERIES = [
+    ("Jalisco", "Guadalajara", "Pasteurizada", "Autoservicio", 25.5, 25.1, 26.0),
+    ("Puebla", "Puebla", "Ultrapasteurizada", "Tienda", 27.0, 26.8, 27.3),
+]
+
+
+def write_predictions(path, target=None, run_id="run-1"):
+    # Mismas columnas que escribe generate_daily_predictions
+    target = target or date.today()
+    df = pd.DataFrame(
+        [
+            {
+                "Estado": estado,
+                "Ciudad": ciudad,
+                "Tipo": tipo,
+                "Canal": canal,
+                "día": target.day,
+                "mes": target.month,
+                "año": target.year,
+                "dia_semana": str(target.weekday()),
+                "Precio_lag1": lag1,
+                "Precio_mean7": mean7,
+                "Precio_sugerido": pred,
+                "run_id": run_id,
+            }
+            for estado, ciudad, tipo, canal, lag1, mean7, pred in SERIES
+        ]
+    )
+    df.to_csv(path, index=False)
+    return df
+
+
+@pytest.fixture
+def index(tmp_path):
+    write_predictions(tmp_path / "predicciones_2025-08-02.csv")
+    index = prediction_index.PredictionIndex()
+    assert index.load_latest_local(tmp_path)
+    return index
+
+
+def dims(series):
+    return dict(zip(prediction_index.DIM_COLS, series[:4]))
+
+
+def test_bare_series_request_is_a_hit(index):
+    assert index.lookup(dims(SERIES[0])) == 26.0
+    assert (
+        index.lookup(
+            {**dims(SERIES[1]), "Precio_lag1": 27, "mes": str(date.today().month)}
+        )
+        == 27.3
+    )
+
+
+def test_different_features_or_unknown_series_miss(index):
+    assert index.lookup({**dims(SERIES[0]), "Precio_lag1": 30.0}) is None
+    assert index.lookup({**dims(SERIES[0]), "Canal": "Mercado"}) is None
+    # Campo con el que no se calculó la predicción
+    assert index.lookup({**dims(SERIES[0]), "dia": 2}) is None
+
+
+def test_misses_go_to_the_model_in_one_call_and_keep_order(index):
+    calls = []
+
+    def predict_fn(rows):
+        calls.append(rows)
+        return [float(i) for i in range(len(rows))]
+
+    records = [
+        {
+            "Estado": "Sonora",
+            "Ciudad": "Hermosillo",
+            "Tipo": "Pasteurizada",
+            "Canal": "Tienda",
+        },
+        dims(SERIES[1]),
+        {**dims(SERIES[0]), "Precio_lag1": 30.0},
+    ]
+
+    assert index.predict(records, predict_fn) == [0.0, 27.3, 1.0]
+    assert calls == [[records[0], records[2]]]
+    assert index.stats()["hits"] == 1
+    assert index.stats()["misses"] == 2
+
+
+def test_all_hits_skip_the_model(index):
+    def predict_fn(rows):
+        raise AssertionError("the model must not be called")
+
+    assert index.predict([dims(s) for s in SERIES], predict_fn) == [26.0, 27.3]
+    assert index.stats()["hit_rate"] == 1.0
+
+
+def test_stale_index_sends_every_record_to_the_model(tmp_path):
+    calls = []
+
+    def predict_fn(rows):
+        calls.append(rows)
+        return [0.0] * len(rows)
+
+    records = [dims(s) for s in SERIES]
+    index = prediction_index.PredictionIndex()
+    write_predictions(tmp_path / "p.csv")
+    index.load_csv(tmp_path / "p.csv")
+
+    # Otro modelo: se ignora el índice
+    assert index.predict(records, predict_fn, run_id="run-2") == [0.0, 0.0]
+    assert index.predict(records, predict_fn, run_id="run-1") == [26.0, 27.3]
+
+    # Archivo de ayer: se ignora aunque el modelo coincida
+    yesterday = date.today() - timedelta(days=1)
+    write_predictions(tmp_path / "old.csv", target=yesterday)
+    index.load_csv(tmp_path / "old.csv")
+    assert index.predict(records, predict_fn, run_id="run-1") == [0.0, 0.0]
+
+    assert calls == [records, records]
+    assert index.stats()["stale"] == 4
+
+
+class FakeS3:
+    def __init__(self, files):
+        self.files = files
+        self.downloads = []
+
+    def get_paginator(self, name):
+        files = self.files
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                yield {"Contents": [{"Key": key} for key in files]}
+
+        return Paginator()
+
+    def get_object(self, Bucket, Key):
+        self.downloads.append(Key)
+        return {"Body": io.BytesIO(self.files[Key])}
+
+
+def test_refresh_from_s3_loads_the_newest_file_once(tmp_path):
+    write_predictions(tmp_path / "p.csv")
+    body = (tmp_path / "p.csv").read_bytes()
+    s3 = FakeS3(
+        {
+            "predicciones/2025-08-01/predicciones_2025-08-01.csv": b"",
+            "predicciones/2025-08-02/predicciones_2025-08-02.csv": body,
+        }
+    )
+    index = prediction_index.PredictionIndex()
+
+    assert index.refresh_from_s3(s3) is True
+    assert index.refresh_from_s3(s3) is False
+
+    assert s3.downloads == ["predicciones/2025-08-02/predicciones_2025-08-02.csv"]
+    assert len(index) == 2
+
+
+def _fit_model():
+    df = pd.DataFrame(make_records(100))
+    return Pipeline(
+        [
+            ("vectorizer", CategoricalEncoder()),
+            ("regressor", build_xgboost(XGB_PARAMS, n_jobs=1)),
+        ]
+    ).fit(df, df["Precio_lag1"])
+
+
+@pytest.mark.parametrize("run_id, hits", [("run-1", 1), ("run-2", 0)])
+def test_lambda_answers_precomputed_series_from_the_index(
+    run_id, hits, tmp_path, monkeypatch
+):
+    # El índice solo se usa con el modelo que generó el archivo
+    write_slim_model(_fit_model(), tmp_path / "model", run_id=run_id)
+    write_predictions(tmp_path / "predicciones.csv", run_id="run-1")
+    monkeypatch.setenv("MODEL_DIR", str(tmp_path / "model"))
+    monkeypatch.setenv("PRECOMPUTED_PREDICTIONS", str(tmp_path / "predicciones.csv"))
+    monkeypatch.setenv("ONLINE_FEATURES", "off")
+    handler = _import_fresh("handler", ONDEMAND, monkeypatch)
+
+    response = handler.handler({"body": json.dumps(dims(SERIES[0]))}, None)
+    stats = handler.handler({"rawPath": "/predict/stats"}, None)
+
+    assert (json.loads(response["body"])["predicted_price"] == 26.0) == bool(hits)
+    assert json.loads(stats["body"])["hits"] == hits
+    sys.modules.pop("handler", None)
+
+
+def test_lambda_loads_the_index_on_the_first_request(tmp_path, monkeypatch):
+    write_slim_model(_fit_model(), tmp_path / "model")
+    write_predictions(tmp_path / "p.csv")
+    s3 = FakeS3({"predicciones/2025-08-02/p.csv": (tmp_path / "p.csv").read_bytes()})
+    clients = []
+    boto3 = types.SimpleNamespace(client=lambda name: clients.append(name) or s3)
+    monkeypatch.setitem(sys.modules, "boto3", boto3)
+    monkeypatch.setenv("MODEL_DIR", str(tmp_path / "model"))
+    monkeypatch.setenv("PRECOMPUTED_PREDICTIONS", "s3")
+    monkeypatch.setenv("ONLINE_FEATURES", "off")
+
+    handler = _import_fresh("handler", ONDEMAND, monkeypatch)
+    # El arranque en frío no toca S3
+    assert clients == [] and len(handler.index) == 0
+
+    response = handler.handler({"body": json.dumps(dims(SERIES[0]))}, None)
+
+    assert json.loads(response["body"]) == {"predicted_price": 26.0}
+    assert clients == ["s3"]
+    sys.modules.pop("handler", None)
+
+
+def test_copies_are_identical():
+    first, *others = (path.read_text() for path in COPIES)
+    assert all(other == first for other in others)
@@ -0,0 +1,77 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from orchestration.tasks.prepare_full_dataset_s3 import prepare_full_dataset_s3
+
+prepare_fn = prepare_full_dataset_s3.fn
+
+
+def write_daily_partitions(root: Path, fechas):
+    rng = np.random.default_rng(7)
+    series = [
+        ("Jalisco", "Guadalajara", "Pasteurizada", "Tiendas"),
+        ("Jalisco", "Guadalajara", "Ultrapasteurizada", "Autoservicios"),
+        ("Sonora", "Hermosillo", "Pasteurizada", "Tiendas"),
+    ]
+    for fecha in fechas:
+        df = pd.DataFrame(series, columns=["Estado", "Ciudad", "Tipo", "Canal"])
+        df.insert(0, "Fecha", fecha)
+        df["Precio"] = rng.uniform(20, 35, size=len(df)).round(2)
+        df.loc[rng.random(len(df)) < 0.2, "Precio"] = np.nan
+        path = root / f"{fecha:%Y/%m}/{fecha:%Y-%m-%d}-data.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path, index=False)
+
+
+def test_incremental_matches_full_rebuild(tmp_path):
+    root = tmp_path / "daily"
+    fechas = pd.date_range("2025-06-20", "2025-08-03", freq="D")
+    write_daily_partitions(root, fechas[:-3])
+
+    kwargs = dict(lookback_days=30, s3_root=str(root))
+    inc_path = tmp_path / "inc.parquet"
+    prepare_fn(reference_date="2025-07-31", output_path=str(inc_path), **kwargs)
+
+    # Llegan tres días nuevos, uno por corrida
+    write_daily_partitions(root, fechas[-3:])
+    for day in ["2025-08-01", "2025-08-02", "2025-08-03"]:
+        prepare_fn(
+            reference_date=day,
+            output_path=str(inc_path),
+            incremental=True,
+            **kwargs,
+        )
+
+    full_path = tmp_path / "full.parquet"
+    prepare_fn(reference_date="2025-08-03", output_path=str(full_path), **kwargs)
+
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(inc_path), pd.read_parquet(full_path), check_exact=False
+    )
+
+
+def test_late_partition_in_earlier_month_triggers_rebuild(tmp_path):
+    root = tmp_path / "daily"
+    fechas = pd.date_range("2025-06-20", "2025-08-02", freq="D")
+    late = pd.Timestamp("2025-07-28")
+    write_daily_partitions(root, [f for f in fechas if f != late])
+
+    kwargs = dict(lookback_days=30, s3_root=str(root))
+    inc_path = tmp_path / "inc.parquet"
+    prepare_fn(reference_date="2025-08-02", output_path=str(inc_path), **kwargs)
+
+    # Llega tarde un día de julio, ya con el watermark en agosto
+    write_daily_partitions(root, [late])
+    prepare_fn(
+        reference_date="2025-08-02",
+        output_path=str(inc_path),
+        incremental=True,
+        **kwargs,
+    )
+
+    full_path = tmp_path / "full.parquet"
+    prepare_fn(reference_date="2025-08-02", output_path=str(full_path), **kwargs)
+
+    df_inc = pd.read_parquet(inc_path)
+    assert (df_inc["Fecha"] == late).any()
+    pd.testing.assert_frame_equal(df_inc, pd.read_parquet(full_path), check_exact=False)
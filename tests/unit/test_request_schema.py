@@ -0,0 +1,156 @@
+import importlib.util
+import json
+import pickle
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+from orchestration.tasks.model_specs import build_random_forest, build_xgboost
+from test_batch_predictions import LOCAL, XGB_PARAMS, _import_fresh, make_records
+
+ROOT = Path(__file__).resolve().parents[2]
+COPIES = [
+    ROOT / "deployment" / "local" / "request_schema.py",
+    ROOT / "deployment" / "ondemand" / "request_schema.py",
+]
+
+spec = importlib.util.spec_from_file_location("request_schema", COPIES[0])
+request_schema = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(request_schema)
+
+RF_PARAMS = {
+    "n_estimators": 5,
+    "max_depth": 4,
+    "min_samples_split": 2,
+    "min_samples_leaf": 1,
+}
+
+
+def fit(kind):
+    df = pd.DataFrame(make_records(200))
+    if kind == "rf":
+        encoder, model = CategoricalEncoder(), build_random_forest(RF_PARAMS, n_jobs=1)
+    else:
+        native = kind == "xgb-native"
+        encoder = CategoricalEncoder(encoding="category" if native else "onehot")
+        model = build_xgboost(XGB_PARAMS, n_jobs=1, native=native)
+    return Pipeline([("vectorizer", encoder), ("regressor", model)]).fit(
+        df, df["Precio_lag1"]
+    )
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        (b"{", "Invalid JSON"),
+        (b"[]", "non-empty list"),
+        (b'{"Estado": "Jalisco"}', "Ciudad"),
+        (b'[{"Estado": "Jalisco", "Ciudad": "X", "Tipo": "Y", "Canal": 3}]', "Canal"),
+        (
+            b'{"Estado": "J", "Ciudad": "X", "Tipo": "Y", "Canal": "Z", "Precio_lag1": "25"}',
+            "Precio_lag1",
+        ),
+        (
+            b'{"Estado": "J", "Ciudad": "X", "Tipo": "Y", "Canal": "Z", "mes": true}',
+            "mes",
+        ),
+    ],
+)
+def test_invalid_payloads_are_rejected(body, message):
+    with pytest.raises(request_schema.SchemaError, match=message):
+        request_schema.parse_records(body)
+
+
+def test_valid_record_is_returned_untouched():
+    body = b'{"Estado": "J", "Ciudad": "X", "Tipo": "Y", "Canal": "Z", "extra": 1}'
+
+    assert request_schema.parse_records(body) == [
+        {"Estado": "J", "Ciudad": "X", "Tipo": "Y", "Canal": "Z", "extra": 1}
+    ]
+
+
+def test_batch_records_name_the_invalid_record():
+    records = [
+        {"Estado": "J", "Ciudad": "X", "Tipo": "Y", "Canal": "Z"},
+        {"Estado": "J", "Ciudad": "X", "Tipo": "Y", "Canal": "Z", "mes": "8"},
+    ]
+
+    assert request_schema.validate_records(records[:1]) == records[:1]
+    with pytest.raises(request_schema.SchemaError, match="Record 1: mes"):
+        request_schema.validate_records(records)
+
+
+@pytest.mark.parametrize("kind", ["rf", "xgb"])
+def test_fast_predictor_matches_the_pipeline(kind):
+    pipeline = fit(kind)
+    records = make_records(30, seed=1)
+    records[0]["Ciudad"] = "Mérida"  # categoría no vista
+    for record in records:
+        del record["Precio_mean7"]  # columna ausente en todo el lote -> 0
+    records[2]["mes"] = 0
+
+    fast = request_schema.FastPredictor(pipeline)
+
+    assert fast.regressor is not None
+    expected = pipeline.named_steps["vectorizer"].transform(records)
+    np.testing.assert_array_equal(fast.matrix(records).toarray(), expected.toarray())
+    np.testing.assert_allclose(fast.predict(records), pipeline.predict(records))
+
+
+def test_null_numericals_are_missing_values_for_xgboost():
+    pipeline = fit("xgb")
+    records = make_records(5, seed=2)
+    records[0]["Precio_lag1"] = None
+    del records[1]["Precio_mean7"]  # clave faltante en un registro -> NaN
+
+    fast = request_schema.FastPredictor(pipeline)
+
+    np.testing.assert_allclose(fast.predict(records), pipeline.predict(records))
+
+
+def test_other_inputs_and_encodings_use_the_wrapped_model():
+    native = request_schema.FastPredictor(fit("xgb-native"))
+    records = make_records(5, seed=3)
+
+    assert native.regressor is None
+    np.testing.assert_allclose(native.predict(records), native.model.predict(records))
+    fast = request_schema.FastPredictor(fit("xgb"))
+    df = pd.DataFrame(records)
+    np.testing.assert_allclose(fast.predict(df), fast.model.predict(df))
+
+
+def test_local_app_rejects_invalid_payloads_before_predicting(tmp_path, monkeypatch):
+    pipeline = fit("xgb")
+    (tmp_path / "model").mkdir()
+    with open(tmp_path / "model" / "model.pkl", "wb") as f:
+        pickle.dump(pipeline, f)
+    monkeypatch.chdir(tmp_path)
+    sys.modules.pop("request_schema", None)
+    app = _import_fresh("app", LOCAL, monkeypatch).app
+    record = make_records(1, seed=4)[0]
+
+    with app.test_client() as client:
+        ok = client.post("/predict", json=record)
+        bad = client.post("/predict", json={**record, "Precio_lag1": "caro"})
+        lines = "\n".join(json.dumps(r) for r in [record, {**record, "Tipo": None}])
+        bad_batch = client.post(
+            "/predict/batch", data=lines, content_type="application/x-ndjson"
+        )
+
+    np.testing.assert_allclose(
+        ok.get_json()["predicted_price"], pipeline.predict([record])[0]
+    )
+    assert bad.status_code == 400
+    assert "Precio_lag1" in bad.get_json()["error"]
+    assert bad_batch.status_code == 400
+    assert bad_batch.get_json()["error"].startswith("Record 1: Tipo")
+    for module in ("app", "request_schema"):
+        sys.modules.pop(module, None)
+
+
+def test_copies_are_identical():
+    first, second = (path.read_text() for path in COPIES)
+    assert first == second
@@ -0,0 +1,93 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from orchestration.tasks import series_state
+from orchestration.tasks.prediction_features import build_prediction_features
+from orchestration.tasks.prepare_full_dataset_s3 import GROUP_COLS, _add_lag_features
+from orchestration.tasks.series_state import SeriesState
+from test_prediction_features import make_history
+
+
+def history(n_days=40):
+    df = make_history(n_days).dropna(subset=["Precio"])
+    df["Fecha"] = pd.to_datetime(df["Fecha"])
+    return df.sort_values(GROUP_COLS + ["Fecha"]).reset_index(drop=True)
+
+
+def test_appended_rows_get_the_same_features_as_a_full_recompute():
+    df = history()
+    cut = pd.Timestamp("2025-08-20")
+    series = SeriesState.from_frame(df[df["Fecha"] < cut])
+
+    new = df[df["Fecha"] >= cut]
+    got = series.append(new)
+    expected = _add_lag_features(df.copy()).loc[new.index]
+
+    pd.testing.assert_frame_equal(got, expected[["Precio_lag1", "Precio_mean7"]])
+
+
+def test_appending_day_by_day_matches_from_frame():
+    df = history()
+    series = SeriesState.from_frame(df[df["Fecha"] < "2025-08-01"])
+    for _, day in df[df["Fecha"] >= "2025-08-01"].groupby("Fecha"):
+        series.append(day)
+
+    full = SeriesState.from_frame(df)
+
+    assert series.keys == full.keys and series.meta == full.meta
+    ids = np.arange(len(full))
+    np.testing.assert_array_equal(
+        series.window(ids, full.capacity), full.window(ids, full.capacity)
+    )
+
+
+def test_prediction_features_match_the_dataset_scan():
+    df = make_history()
+    target = datetime(2025, 8, 1)
+
+    result = SeriesState.from_frame(df).prediction_features(target)
+
+    pd.testing.assert_frame_equal(result, build_prediction_features(df, target))
+
+
+def test_since_hides_observations_before_the_window():
+    df = history()
+    since = "2025-08-25"
+    series = SeriesState.from_frame(df)
+
+    result = series.prediction_features(datetime(2025, 9, 1), since=since)
+    expected = build_prediction_features(df[df["Fecha"] >= since], datetime(2025, 9, 1))
+
+    pd.testing.assert_frame_equal(result, expected)
+    with pytest.raises(ValueError):
+        series.prediction_features(datetime(2025, 8, 28))
+
+
+def test_save_and_load_round_trip(tmp_path):
+    series = SeriesState.from_frame(history())
+    series.meta["since"] = "2025-07-01"
+
+    loaded = SeriesState.load(series.save(tmp_path / "state.series.npz"))
+
+    assert loaded.keys == series.keys and loaded.meta == series.meta
+    np.testing.assert_array_equal(loaded.prices, series.prices)
+    np.testing.assert_array_equal(loaded.head, series.head)
+
+
+def test_new_windows_and_ewms_come_from_the_saved_buffers(tmp_path, monkeypatch):
+    df = history(n_days=25)
+    path = SeriesState.from_frame(df).save(tmp_path / "state.series.npz")
+    monkeypatch.setitem(series_state.WINDOWS, "Precio_mean14", 14)
+    monkeypatch.setitem(series_state.EWMS, "Precio_ewm", 0.3)
+
+    # Sin releer el histórico: la ventana y la EWM salen de los buffers
+    result = SeriesState.load(path).prediction_features(datetime(2025, 8, 14))
+
+    grouped = df.groupby(GROUP_COLS, sort=False)["Precio"]
+    mean14 = grouped.apply(lambda s: s.tail(14).mean()).to_numpy()
+    ewm = grouped.apply(lambda s: s.ewm(alpha=0.3, adjust=False).mean().iloc[-1])
+    np.testing.assert_allclose(result["Precio_mean14"], mean14)
+    np.testing.assert_allclose(result["Precio_ewm"], ewm.to_numpy())
+    with pytest.raises(ValueError):
+        SeriesState.load(path).window(np.arange(2), 31)
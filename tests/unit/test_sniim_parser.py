@@ -0,0 +1,81 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+from orchestration.tasks.sniim_parser import (
+    parse_excel_for_date,
+    parse_excel_to_df,
+    parse_sniim_sheet,
+)
+
+HEADER = ["Precio promedio al consumidor por litro", None, None, None, None, None]
+CANALES = [None, None, "Tiendas", "Autoservicios", "Tiendas", "Autoservicios"]
+
+
+def make_sheet():
+    rows = [
+        HEADER,
+        [None, None, "Viernes 1 de agosto de 2025", None, None, None],
+        ["Estado", "Ciudad", "Pasteurizada", None, "Ultrapasteurizada", None],
+        CANALES,
+        ["Jalisco", "Guadalajara", 27.5, 26.0, 30.1, 29.0],
+        [None, "Puerto Vallarta", 28.0, "n.d.", 31.0, 30.5],
+        [None, "Promedio estatal", 27.7, 26.0, 30.5, 29.7],
+        ["Sonora", "Hermosillo", 25.0, 24.5, 29.0, 28.5],
+        ["Promedio Nacional", None, 26.8, 25.5, 30.0, 29.3],
+        ["Fuente: SNIIM", None, None, None, None, None],
+        [None] * 6,
+        HEADER,
+        [None, None, "Jueves 31 de julio de 2025", None, None, None],
+        ["Estado", "Ciudad", "Pasteurizada", None, "Ultrapasteurizada", None],
+        CANALES,
+        ["Jalisco", "Guadalajara", 27.4, 26.1, 30.0, 29.1],
+        ["Promedio Nacional", None, 27.4, 26.1, 30.0, 29.1],
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_parses_every_block_in_long_format():
+    df = parse_sniim_sheet(make_sheet())
+
+    assert list(df.columns) == ["Fecha", "Estado", "Ciudad", "Tipo", "Canal", "Precio"]
+    assert set(df["Fecha"]) == {date(2025, 8, 1), date(2025, 7, 31)}
+    # 3 ciudades x 4 columnas + 1 ciudad x 4 columnas
+    assert len(df) == 16
+
+
+def test_forward_fills_estado_and_coerces_prices():
+    df = parse_sniim_sheet(make_sheet())
+    row = df[
+        (df["Ciudad"] == "Puerto Vallarta")
+        & (df["Tipo"] == "Pasteurizada")
+        & (df["Canal"] == "Autoservicios")
+    ]
+
+    assert row["Estado"].item() == "Jalisco"
+    assert np.isnan(row["Precio"].item())
+
+
+def test_city_averages_are_optional():
+    kept = parse_sniim_sheet(make_sheet(), drop_city_averages=False)
+
+    assert "Promedio estatal" in kept["Ciudad"].values
+    assert len(kept) == 20
+
+
+@pytest.mark.parametrize("engine", ["openpyxl", "calamine"])
+def test_streaming_parser_matches_full_parse(tmp_path, engine):
+    if engine == "calamine":
+        pytest.importorskip("python_calamine")
+    path = tmp_path / "Leche01082025.xlsx"
+    make_sheet().to_excel(path, header=False, index=False)
+
+    full = parse_excel_to_df(path)
+    for target in [date(2025, 8, 1), date(2025, 7, 31)]:
+        streamed = parse_excel_for_date(path, target, engine=engine)
+        expected = full[full["Fecha"] == target].reset_index(drop=True)
+        pd.testing.assert_frame_equal(
+            streamed.reset_index(drop=True), expected, check_dtype=False
+        )
+
+    assert parse_excel_for_date(path, date(2025, 1, 1), engine=engine).empty
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+from hyperopt import hp
+from orchestration.tasks.trial_cache import TrialCache, dataset_fingerprint
+from orchestration.tasks.tuning import halving_fmin, make_folds, parallel_fmin
+from test_tuning import SPACE, build_ridge, make_data
+
+
+def test_fingerprint_depends_on_contents_and_extras(tmp_path):
+    path = tmp_path / "full_dataset.parquet"
+    path.write_bytes(b"day 1")
+    first = dataset_fingerprint(path, "xgboost")
+
+    assert dataset_fingerprint(path, "xgboost") == first
+    assert dataset_fingerprint(path, "random_forest") != first
+    path.write_bytes(b"day 2")
+    assert dataset_fingerprint(path, "xgboost") != first
+
+
+def test_cache_round_trip_is_keyed_by_fingerprint(tmp_path):
+    cache = TrialCache("abc", tmp_path)
+    cache.put({"n_estimators": 120.0, "max_depth": 5}, {"loss": 0.3})
+
+    assert cache.get({"max_depth": 5.0, "n_estimators": 120}) == {"loss": 0.3}
+    assert cache.get({"max_depth": 6.0, "n_estimators": 120}) is None
+    # Persistente: otra conexión sobre el mismo archivo la encuentra
+    assert TrialCache("abc", tmp_path).get({"n_estimators": 120, "max_depth": 5})
+    assert (
+        TrialCache("other", tmp_path).get({"n_estimators": 120, "max_depth": 5}) is None
+    )
+
+
+def test_rerun_reuses_cached_scores(tmp_path):
+    folds = make_folds(*make_data())
+    cache = TrialCache("abc", tmp_path)
+    scored = []
+
+    def run():
+        return parallel_fmin(
+            build_ridge,
+            folds,
+            SPACE,
+            max_evals=4,
+            n_workers=1,
+            on_result=lambda params, rmse: scored.append(rmse),
+            cache=cache,
+        )
+
+    best, trials = run()
+    best_again, trials_again = run()
+
+    assert len(scored) == 4
+    assert best_again == best
+    assert [t["result"] for t in trials_again.trials] == [
+        t["result"] for t in trials.trials
+    ]
+
+
+def test_interrupted_search_resumes_from_saved_trials(tmp_path):
+    space = {"x": hp.uniform("x", 0, 1)}
+    trials_file = str(tmp_path / "search.hyperopt")
+    calls = []
+
+    def score(params, budget, folds, state):
+        calls.append(params["x"])
+        return params["x"], {}
+
+    halving_fmin(score, [], space, 3, [1], trials_save_file=trials_file)
+    _, trials, _ = halving_fmin(score, [], space, 5, [1], trials_save_file=trials_file)
+
+    assert len(trials.trials) == 5
+    assert len(calls) == 5
+
+
+def test_only_the_last_fingerprints_are_kept(tmp_path):
+    params = {"n_estimators": 120}
+    for day in range(4):
+        cache = TrialCache(f"day{day}", tmp_path, keep=2)
+        Path(cache.trials_file("xgboost")).write_bytes(b"trials")
+        cache.put(params, {"loss": day})
+
+    assert TrialCache("day3", tmp_path).get(params) == {"loss": 3}
+    assert TrialCache("day2", tmp_path).get(params) == {"loss": 2}
+    assert TrialCache("day1", tmp_path).get(params) is None
+    assert TrialCache("day0", tmp_path).get(params) is None
+    assert sorted(p.name for p in tmp_path.glob("*.hyperopt")) == [
+        "xgboost-day2.hyperopt",
+        "xgboost-day3.hyperopt",
+    ]
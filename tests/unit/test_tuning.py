@@ -0,0 +1,115 @@
+from functools import partial
+import numpy as np
+from hyperopt import Trials, hp
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import cross_val_score
+from orchestration.tasks.tuning import (
+    cv_rmse,
+    halving_budgets,
+    halving_fmin,
+    make_folds,
+    parallel_fmin,
+    split_cpu_budget,
+)
+
+SPACE = {"alpha": hp.loguniform("alpha", -5, 5)}
+
+
+def build_ridge(params, fit_intercept=True):
+    return Ridge(alpha=params["alpha"], fit_intercept=fit_intercept)
+
+
+def make_data(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 3))
+    y = X @ np.array([1.0, -2.0, 0.5]) + rng.normal(0, 0.1, size=n)
+    return X, y
+
+
+def test_parallel_fmin_runs_every_trial_and_reports_results():
+    X, y = make_data()
+    logged = []
+
+    best, trials = parallel_fmin(
+        partial(build_ridge, fit_intercept=True),
+        make_folds(X, y),
+        space=SPACE,
+        max_evals=6,
+        n_workers=2,
+        on_result=lambda params, rmse: logged.append((params, rmse)),
+    )
+
+    assert len(trials.trials) == 6
+    assert len(logged) == 6
+    assert best == {"alpha": min(logged, key=lambda r: r[1])[0]["alpha"]}
+    assert trials.best_trial["result"]["loss"] == min(rmse for _, rmse in logged)
+
+
+def test_parallel_fmin_spawns_its_workers(monkeypatch):
+    import orchestration.tasks.tuning as tuning
+
+    contexts = []
+    executor = tuning.ProcessPoolExecutor
+
+    def recording_executor(*args, **kwargs):
+        contexts.append(kwargs["mp_context"].get_start_method())
+        return executor(*args, **kwargs)
+
+    monkeypatch.setattr(tuning, "ProcessPoolExecutor", recording_executor)
+    X, y = make_data()
+    parallel_fmin(build_ridge, make_folds(X, y), SPACE, max_evals=2, n_workers=2)
+
+    assert contexts == ["spawn"]
+
+
+def test_parallel_fmin_resumes_from_existing_trials():
+    folds = make_folds(*make_data())
+    _, trials = parallel_fmin(build_ridge, folds, SPACE, max_evals=3, n_workers=2)
+
+    _, resumed = parallel_fmin(
+        build_ridge, folds, SPACE, max_evals=5, n_workers=2, trials=trials
+    )
+
+    assert len(resumed.trials) == 5
+    assert len({t["tid"] for t in resumed.trials}) == 5
+
+
+def test_split_cpu_budget():
+    assert split_cpu_budget(8, 2) == 4
+    assert split_cpu_budget(1, 2) == 1
+
+
+def test_cached_folds_match_cross_val_score():
+    X, y = make_data()
+    params = {"alpha": 0.5}
+
+    expected = -cross_val_score(
+        build_ridge(params), X, y, scoring="neg_root_mean_squared_error", cv=3
+    ).mean()
+
+    assert np.isclose(cv_rmse(build_ridge, params, make_folds(X, y)), expected)
+
+
+def test_halving_prunes_weak_trials_after_the_first_rung():
+    space = {"x": hp.uniform("x", 0, 1)}
+
+    def score(params, budget, folds, state):
+        state["calls"] = state.get("calls", 0) + 1
+        return params["x"] + 1 / budget, {"calls": state["calls"]}
+
+    best, trials, history = halving_fmin(
+        score, folds=[], space=space, max_evals=12, budgets=[1, 3, 9], eta=3
+    )
+
+    assert len(trials.trials) == 12
+    assert any(r["pruned"] for r in history)
+    # Los trials que suben de peldaño reutilizan su estado
+    assert max(r["calls"] for r in history) == 3
+    assert trials.best_trial["result"]["rung"] == 2
+    assert best["x"] == min(
+        t["misc"]["vals"]["x"][0] for t in trials.trials if t["result"]["rung"] == 2
+    )
+
+
+def test_halving_budgets():
+    assert halving_budgets(25, 300, 3) == [25, 75, 225, 300]
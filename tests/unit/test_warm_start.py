@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from orchestration.tasks.feature_encoder import CategoricalEncoder
+from orchestration.tasks.model_specs import build_random_forest, build_xgboost
+from orchestration.tasks.warm_start import (
+    EXTRA_ROUNDS,
+    EXTRA_TREES,
+    continue_training,
+    has_new_categories,
+    load_previous_model,
+)
+
+XGB_PARAMS = {
+    "max_depth": 3,
+    "learning_rate": 0.3,
+    "n_estimators": 20,
+    "min_child_weight": 1,
+    "gamma": 0,
+    "subsample": 1.0,
+    "colsample_bytree": 1.0,
+}
+
+
+def make_data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 3))
+    return X, X[:, 0] * 2 + rng.normal(0, 0.1, size=n)
+
+
+def test_random_forest_keeps_its_trees_and_adds_new_ones():
+    X, y = make_data()
+    params = {
+        "n_estimators": 20,
+        "max_depth": 5,
+        "min_samples_split": 2,
+        "min_samples_leaf": 1,
+    }
+    model = build_random_forest(params, n_jobs=1).fit(X, y)
+    old_trees = list(model.estimators_)
+
+    model = continue_training(model, *make_data(seed=1), n_jobs=1)
+
+    assert len(model.estimators_) == 20 + EXTRA_TREES
+    assert model.estimators_[:20] == old_trees
+
+
+@pytest.mark.parametrize("native", [False, True])
+def test_xgboost_boosts_on_top_of_the_previous_booster(native):
+    X, y = make_data()
+    model = build_xgboost(XGB_PARAMS, n_jobs=1, native=native).fit(X, y)
+
+    new_X, new_y = make_data(seed=1)
+    warm = continue_training(model, new_X, new_y, n_jobs=1)
+
+    booster = warm.booster_ if native else warm.get_booster()
+    assert booster.num_boosted_rounds() == 20 + EXTRA_ROUNDS
+    rmse = lambda m: np.sqrt(np.mean((m.predict(new_X) - new_y) ** 2))
+    assert rmse(warm) <= rmse(model)
+
+
+def test_unknown_models_cannot_be_warm_started():
+    X, y = make_data()
+    with pytest.raises(TypeError):
+        continue_training(LinearRegression().fit(X, y), X, y)
+
+
+def test_has_new_categories():
+    df = pd.DataFrame({"Ciudad": ["Mérida", "Toluca"], "Precio_lag1": [1.0, 2.0]})
+    encoder = CategoricalEncoder(["Ciudad"], ["Precio_lag1"]).fit(df)
+
+    assert not has_new_categories(encoder, df.iloc[:1])
+    assert has_new_categories(encoder, pd.DataFrame({"Ciudad": ["Colima"]}))
+
+
+class FakeRegistry:
+    def __init__(self, versions):
+        self.versions = versions
+
+    def search_model_versions(self, filter_string):
+        return [
+            SimpleNamespace(version=version, run_id=run_id)
+            for name, version, run_id in self.versions
+            if filter_string == f"name='{name}'"
+        ]
+
+    def get_run(self, run_id):
+        return SimpleNamespace(data=SimpleNamespace(params={"max_depth": "4"}))
+
+
+def test_previous_model_is_the_newest_version_of_the_family(monkeypatch):
+    import mlflow
+    import mlflow.sklearn
+
+    registry = FakeRegistry(
+        [("xgb", "2", "run-2"), ("xgb", "10", "run-10"), ("rf", "11", "rf-11")]
+    )
+    monkeypatch.setattr(mlflow, "MlflowClient", lambda: registry)
+    monkeypatch.setattr(mlflow.sklearn, "load_model", lambda uri: uri)
+
+    previous = load_previous_model("xgb", ["max_depth"])
+
+    assert previous["run_id"] == "run-10"
+    assert previous["params"] == {"max_depth": 4.0}
+    assert previous["pipeline"] == "runs:/run-10/model"
+    assert load_previous_model("lgbm", ["max_depth"]) is None